@@ -0,0 +1,99 @@
+"""
+Helpers shared by the example scripts.
+"""
+
+import multiprocessing
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+
+from pycsp3_explain import Session
+
+# MUS algorithms of the portfolio by name, and the constraint tracker. Filled
+# in before the workers are forked, so each worker inherits the model, the
+# algorithms to run and the tracker to report its MUS with.
+_PORTFOLIO = {}
+_PORTFOLIO_TRACKER = []
+
+
+def _run_portfolio_member(name):
+    """Run one MUS algorithm in its own session; executed in a worker process."""
+    start = time.perf_counter()
+    with Session("ace") as session:
+        result = _PORTFOLIO[name]()
+    indices = _PORTFOLIO_TRACKER[0].get_indices(result)
+    return indices, time.perf_counter() - start, session.solver_calls
+
+
+def run_portfolio(algorithms, tracker):
+    """
+    Run MUS algorithms concurrently, as a portfolio.
+
+    Each algorithm runs in a forked worker with its own ACE processes, so the
+    section takes as long as the slowest algorithm rather than the sum of all.
+    Falls back to running them one after the other without fork.
+
+    :param algorithms: Dict mapping names to zero-argument MUS functions
+    :param tracker: ConstraintTracker of the constraints, to report each MUS with
+    :yields: (name, MUS indices, seconds, solver calls) in completion order
+    """
+    _PORTFOLIO.clear()
+    _PORTFOLIO.update(algorithms)
+    _PORTFOLIO_TRACKER[:] = [tracker]
+
+    if "fork" not in multiprocessing.get_all_start_methods():
+        for name in _PORTFOLIO:
+            yield (name,) + _run_portfolio_member(name)
+        return
+
+    # Forked workers inherit unwritten output and write it again on exit
+    sys.stdout.flush()
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=len(_PORTFOLIO), mp_context=context) as executor:
+        futures = {executor.submit(_run_portfolio_member, name): name for name in _PORTFOLIO}
+        for future in as_completed(futures):
+            yield (futures[future],) + future.result()
+
+
+@contextmanager
+def printed_in_background(render, maxsize=16):
+    """
+    Render and print items in a worker thread, through a bounded queue.
+
+    PyCSP3 only solves from the main thread (it installs signal handlers),
+    so the search stays there and the formatting and terminal writes move to
+    the worker, overlapping with the next solver calls.
+
+    :param render: Function turning a queued item into the line to print
+    :param maxsize: Maximum number of items waiting to be printed
+    :yields: Function queuing an item for printing
+    """
+    items = queue.Queue(maxsize)
+
+    def worker():
+        while True:
+            item = items.get()
+            if item is None:
+                return
+            print(render(item))
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    try:
+        yield items.put
+    finally:
+        items.put(None)
+        thread.join()
+
+
+def write_in_blocks():
+    """
+    Write the output of the example in blocks rather than one line at a time.
+
+    Lines then show once a block fills, before the portfolio forks its
+    workers, and when the script ends.
+    """
+    sys.stdout.reconfigure(line_buffering=False)
@@ -12,8 +12,12 @@ MARCO is particularly useful when:
 - You're debugging a complex constraint model with multiple issues
 """
 
+import os
+
 from pycsp3 import *
-from pycsp3_explain import marco, all_mus, all_mcs, is_mus, is_mcs
+from pycsp3_explain import marco, iter_mus, all_mus_and_mcs, is_mus, is_mcs, ConstraintTracker, Session
+
+from common import write_in_blocks
 
 
 def main():
@@ -51,17 +55,23 @@ def main():
     soft_constraints = [c0, c1, c2, c3, c4]
     constraint_names = ["x == 1", "x == 2", "x == 3", "y >= 5", "y <= 3"]
 
+    # Constraints tagged with their index, and formatted labels, for O(1) labelling
+    tracker = ConstraintTracker(soft_constraints)
+    labels = [f"c{i}: {name}" for i, name in enumerate(constraint_names)]
+
     def constraint_name(c):
-        for i, orig in enumerate(soft_constraints):
-            if c is orig:
-                return f"c{i}: {constraint_names[i]}"
-        return str(c)
+        i = tracker.get_index(c)
+        return labels[i] if i is not None else str(c)
 
     print("\nAnalysis:")
     print("   - c0, c1, c2 all assign different values to x (three-way conflict)")
     print("   - c3 and c4 conflict on y (y >= 5 AND y <= 3 is impossible)")
     print("   - Expected MUSes: {c0,c1}, {c0,c2}, {c1,c2}, {c3,c4}")
 
+    # All methods run on the same constraints and share one session: checks
+    # already made by an earlier method are not sent to the solver again
+    session = Session("ace")
+
     # =========================================================================
     # Method 1: Using marco() generator to iterate over results
     # =========================================================================
@@ -69,81 +79,56 @@ def main():
     print("Method 1: Using marco() generator")
     print("-" * 70)
 
-    clear()  # Reset state
-    x = Var(dom=range(10), id="x")
-    y = Var(dom=range(10), id="y")
-    c0 = x == 1
-    c1 = x == 2
-    c2 = x == 3
-    c3 = y >= 5
-    c4 = y <= 3
-    soft_constraints = [c0, c1, c2, c3, c4]
-
     mus_count = 0
     mcs_count = 0
 
-    print("\nEnumerating all MUSes and MCSes...")
-    for result_type, subset in marco(soft_constraints, solver="ace", verbose=-1):
-        if result_type == "MUS":
-            mus_count += 1
-            print(f"\n   MUS #{mus_count}: {{{', '.join(constraint_name(c) for c in subset)}}}")
-        else:
-            mcs_count += 1
-            print(f"\n   MCS #{mcs_count}: {{{', '.join(constraint_name(c) for c in subset)}}}")
+    # Seeds are shrunk/grown by a pool of worker processes
+    n_workers = min(4, os.cpu_count() or 1)
+    print(f"\nEnumerating all MUSes and MCSes ({n_workers} workers)...")
+    with session:
+        for result_type, subset in marco(soft_constraints, solver="ace", verbose=-1, n_workers=n_workers):
+            if result_type == "MUS":
+                mus_count += 1
+                print(f"\n   MUS #{mus_count}: {{{', '.join(constraint_name(c) for c in subset)}}}")
+            else:
+                mcs_count += 1
+                print(f"\n   MCS #{mcs_count}: {{{', '.join(constraint_name(c) for c in subset)}}}")
 
     print(f"\n   Total: {mus_count} MUSes, {mcs_count} MCSes")
 
     # =========================================================================
-    # Method 2: Using all_mus() and all_mcs() convenience functions
+    # Method 2: Using the all_mus_and_mcs() convenience function
     # =========================================================================
     print("\n" + "-" * 70)
-    print("Method 2: Using all_mus() and all_mcs() convenience functions")
+    print("Method 2: Using all_mus_and_mcs() (one enumeration for both)")
     print("-" * 70)
 
-    clear()  # Reset state
-    x = Var(dom=range(10), id="x")
-    y = Var(dom=range(10), id="y")
-    c0 = x == 1
-    c1 = x == 2
-    c2 = x == 3
-    c3 = y >= 5
-    c4 = y <= 3
-    soft_constraints = [c0, c1, c2, c3, c4]
-
-    print("\nFinding all MUSes...")
-    muses = all_mus(soft_constraints, solver="ace", verbose=-1)
+    print("\nFinding all MUSes and MCSes...")
+    with session:
+        muses, mcses = all_mus_and_mcs(soft_constraints, solver="ace", verbose=-1)
     print(f"   Found {len(muses)} MUSes:")
     for i, mus in enumerate(muses, 1):
         print(f"      MUS #{i}: {{{', '.join(constraint_name(c) for c in mus)}}}")
-
-    print("\nFinding all MCSes...")
-    mcses = all_mcs(soft_constraints, solver="ace", verbose=-1)
     print(f"   Found {len(mcses)} MCSes:")
     for i, mcs in enumerate(mcses, 1):
         print(f"      MCS #{i}: {{{', '.join(constraint_name(c) for c in mcs)}}}")
 
     # =========================================================================
-    # Method 3: Using max_mus/max_mcs to limit results
+    # Method 3: Streaming a limited number of results with iter_mus()
     # =========================================================================
     print("\n" + "-" * 70)
-    print("Method 3: Limiting the number of results")
+    print("Method 3: Streaming a limited number of results")
     print("-" * 70)
 
-    clear()  # Reset state
-    x = Var(dom=range(10), id="x")
-    y = Var(dom=range(10), id="y")
-    c0 = x == 1
-    c1 = x == 2
-    c2 = x == 3
-    c3 = y >= 5
-    c4 = y <= 3
-    soft_constraints = [c0, c1, c2, c3, c4]
-
+    # Each MUS is printed as soon as it is found; enumeration stops after 2
     print("\nFinding at most 2 MUSes...")
-    limited_muses = all_mus(soft_constraints, max_mus=2, solver="ace", verbose=-1)
-    print(f"   Found {len(limited_muses)} MUSes (limited to 2):")
-    for i, mus in enumerate(limited_muses, 1):
-        print(f"      MUS #{i}: {{{', '.join(constraint_name(c) for c in mus)}}}")
+    n_muses = 0
+    with session:
+        for n_muses, mus in enumerate(iter_mus(soft_constraints, max_mus=2, solver="ace", verbose=-1), 1):
+            print(f"      MUS #{n_muses}: {{{', '.join(constraint_name(c) for c in mus)}}}")
+    print(f"   Found {n_muses} MUSes (limited to 2)")
+
+    print(f"\nSolver calls: {session.solver_calls}, answered by the session: {session.cache_hits}")
 
     # =========================================================================
     # Interpretation
@@ -168,4 +153,5 @@ def main():
 
 
 if __name__ == "__main__":
+    write_in_blocks()
     main()
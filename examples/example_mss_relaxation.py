@@ -11,8 +11,21 @@ These are dual concepts: MCS = Soft \\ MSS
 
 
 from pycsp3 import *
+from pycsp3_explain import ConstraintTracker, Session
 from pycsp3_explain.explain.mss import mss, mss_naive, mcs_naive, is_mss, is_mcs
 
+from common import write_in_blocks
+
+
+# Labels of the soft constraints, in the order they are created
+LABELS = (
+    "x[0] == 5",
+    "x[1] >= 3",
+    "x[0] + x[1] == 10",
+    "x[0] == 7",
+    "x[2] <= 8",
+)
+
 
 def main():
     print("=" * 60)
@@ -31,48 +44,51 @@ def main():
     print("\nCreating constraints...")
 
     c0 = x[0] == 5
-    print(f"   c0: x[0] == 5")
+    print(f"   c0: {LABELS[0]}")
 
     c1 = x[1] >= 3
-    print(f"   c1: x[1] >= 3")
+    print(f"   c1: {LABELS[1]}")
 
     c2 = x[0] + x[1] == 10
-    print(f"   c2: x[0] + x[1] == 10")
+    print(f"   c2: {LABELS[2]}")
 
     c3 = x[0] == 7
-    print(f"   c3: x[0] == 7  (conflicts with c0)")
+    print(f"   c3: {LABELS[3]}  (conflicts with c0)")
 
     c4 = x[2] <= 8
-    print(f"   c4: x[2] <= 8")
+    print(f"   c4: {LABELS[4]}")
 
     soft_constraints = [c0, c1, c2, c3, c4]
-    constraint_labels = [
-        "x[0] == 5",
-        "x[1] >= 3",
-        "x[0] + x[1] == 10",
-        "x[0] == 7",
-        "x[2] <= 8",
-    ]
+
+    tracker = ConstraintTracker(soft_constraints)
+    labels = [f"c{i}: {label}" for i, label in enumerate(LABELS)]
+
+    def mask(constraints):
+        """Encode a subset of the soft constraints as a bitmask of their indices."""
+        bits = 0
+        for i in tracker.get_indices(constraints):
+            bits |= 1 << i
+        return bits
 
     def label_constraints(constraints):
         """Get labels for a set of constraints."""
-        labels = []
-        for c in constraints:
-            for j, orig_c in enumerate(soft_constraints):
-                if c is orig_c:
-                    labels.append(f"c{j}: {constraint_labels[j]}")
-                    break
-        return labels
+        return [labels[i] for i in tracker.get_indices(constraints)]
+
+    # One session for all checks: the verifications below re-check subsets
+    # already solved while computing the MSS/MCS, and is_mcs re-checks
+    # exactly what is_mss checked on the complementary set
+    session = Session("ace")
 
     # Find MSS (naive)
     print("\n" + "-" * 40)
     print("1. Finding MSS with mss_naive...")
-    mss_result = mss_naive(soft_constraints, solver="ace", verbose=-1)
+    with session:
+        mss_result = mss_naive(soft_constraints, solver="ace", verbose=-1)
 
     print(f"\n   MSS contains {len(mss_result)} constraint(s):")
     for label in label_constraints(mss_result):
         print(f"     - {label}")
-    print(f"   Verification: {'valid MSS' if is_mss(mss_result, soft_constraints, solver='ace', verbose=-1) else 'invalid'}")
+    print(f"   Verification: {'valid MSS' if is_mss(mss_result, soft_constraints, solver='ace', verbose=-1, session=session) else 'invalid'}")
 
     # Find MSS (assumption-based)
     print("\n2. Finding MSS with mss (assumption-based)...")
@@ -85,25 +101,27 @@ def main():
     # Find MCS
     print("\n" + "-" * 40)
     print("3. Finding MCS (constraints to remove)...")
-    mcs_result = mcs_naive(soft_constraints, solver="ace", verbose=-1)
+    with session:
+        mcs_result = mcs_naive(soft_constraints, solver="ace", verbose=-1)
 
     print(f"\n   MCS contains {len(mcs_result)} constraint(s) to remove:")
     for label in label_constraints(mcs_result):
         print(f"     - {label}")
-    print(f"   Verification: {'valid MCS' if is_mcs(mcs_result, soft_constraints, solver='ace', verbose=-1) else 'invalid'}")
+    print(f"   Verification: {'valid MCS' if is_mcs(mcs_result, soft_constraints, solver='ace', verbose=-1, session=session) else 'invalid'}")
 
     # Verify MSS + MCS = all soft constraints
     print("\n" + "-" * 40)
     print("4. Verification: MSS + MCS = All Constraints")
-    mss_ids = set(id(c) for c in mss_result)
-    mcs_ids = set(id(c) for c in mcs_result)
-    soft_ids = set(id(c) for c in soft_constraints)
+    mss_mask = mask(mss_result)
+    mcs_mask = mask(mcs_result)
+    soft_mask = (1 << len(soft_constraints)) - 1
 
     print(f"   |MSS| = {len(mss_result)}")
     print(f"   |MCS| = {len(mcs_result)}")
     print(f"   |Soft| = {len(soft_constraints)}")
-    print(f"   MSS + MCS = Soft? {mss_ids | mcs_ids == soft_ids}")
-    print(f"   MSS and MCS disjoint? {len(mss_ids & mcs_ids) == 0}")
+    print(f"   MSS + MCS = Soft? {mss_mask | mcs_mask == soft_mask}")
+    print(f"   MSS and MCS disjoint? {mss_mask & mcs_mask == 0}")
+    print(f"   Solver calls: {session.solver_calls}, answered by the session: {session.cache_hits}")
 
     print("\n" + "=" * 60)
     print("Explanation:")
@@ -114,4 +132,5 @@ def main():
 
 
 if __name__ == "__main__":
+    write_in_blocks()
     main()
@@ -10,14 +10,9 @@ adding impossible constraints to a classic N-Queens problem.
 from pycsp3 import *
 from pycsp3_explain.explain.mus import mus, mus_naive, quickxplain_naive, optimal_mus
 from pycsp3_explain.explain.marco import marco
+from pycsp3_explain import ConstraintTracker, Session, post_with_selectors
 
-
-def find_constraint_index(constraint, constraint_list):
-    """Find index of constraint using identity comparison (avoids PyCSP3 __eq__ issues)."""
-    for i, c in enumerate(constraint_list):
-        if c is constraint:
-            return i
-    return -1
+from common import run_portfolio, write_in_blocks
 
 
 def main():
@@ -51,15 +46,16 @@ def main():
     weights.append(50)
     print(f"   c0: {constraint_names[-1]}")
 
-    # All queens in different diagonals (up)
-    c_diag_up = AllDifferent([q[i] + i for i in range(n)])
+    # All queens in different diagonals (up). The row-0 term is q[0] itself,
+    # so no expression (and no auxiliary variable in the solver) is created for it.
+    c_diag_up = AllDifferent([q[i] + i if i else q[i] for i in range(n)])
     constraints.append(c_diag_up)
     constraint_names.append("All queens in different up-diagonals")
     weights.append(50)
     print(f"   c1: {constraint_names[-1]}")
 
     # All queens in different diagonals (down)
-    c_diag_down = AllDifferent([q[i] - i for i in range(n)])
+    c_diag_down = AllDifferent([q[i] - i if i else q[i] for i in range(n)])
     constraints.append(c_diag_down)
     constraint_names.append("All queens in different down-diagonals")
     weights.append(50)
@@ -98,67 +94,68 @@ def main():
 
     # This forces all queens on the main diagonal, violating c2
 
-    print("\nFinding MUS...")
-    print("\t1 Using mus (assumption-based) to identify conflicting constraints...")
-    mus_fast = mus(constraints, solver="ace", verbose=-1)
-
-    print(f"\n\tResult: Found {len(mus_fast)} conflicting constraint(s)")
-    print("   Minimal Unsatisfiable Subset:")
-    for c in mus_fast:
-        idx = find_constraint_index(c, constraints)
-        print(f"   - c{idx}: {constraint_names[idx]}")
+    # Constraints tagged with their index, and formatted labels, built once
+    # for O(1) lookups when printing results
+    tracker = ConstraintTracker(constraints)
+    labels = [f"c{i}: {name}" for i, name in enumerate(constraint_names)]
 
-    print("\n\t2 Using mus_naive to identify conflicting constraints...")
-    mus_slow = mus_naive(constraints, solver="ace", verbose=-1)
+    # The methods below run back-to-back on the same constraints; one session
+    # lets later methods reuse the checks made by earlier ones
+    session = Session("ace")
 
-    print(f"\n\tResult: Found {len(mus_slow)} conflicting constraint(s)")
-    print("   Minimal Unsatisfiable Subset:")
-    for c in mus_slow:
-        idx = find_constraint_index(c, constraints)
-        print(f"   - c{idx}: {constraint_names[idx]}")
-
-    same = set(id(c) for c in mus_fast) == set(id(c) for c in mus_slow)
+    print("\nFinding MUS...")
+    # Selector literals are declared once; assumption-based algorithms given
+    # this model toggle them instead of declaring new ones on every call
+    sels = post_with_selectors(constraints)
+
+    # QuickXplain needs O(k log(n/k)) checks for a MUS of size k among n
+    # constraints; linear deletion (mus_naive), the baseline, needs O(n)
+    algorithms = {
+        "mus (assumption-based)": lambda: mus(sels, solver="ace", verbose=-1),
+        "quickxplain (divide-and-conquer)": lambda: quickxplain_naive(constraints, solver="ace", verbose=-1),
+        "mus_naive (linear deletion)": lambda: mus_naive(constraints, solver="ace", verbose=-1),
+    }
+    print(f"\t1-3 Running {len(algorithms)} MUS algorithms concurrently...")
+
+    results = {}
+    for rank, (name, indices, elapsed, calls) in enumerate(run_portfolio(algorithms, tracker), 1):
+        results[name] = indices
+        print(f"\n\t#{rank} {name}: {len(indices)} conflicting constraint(s) "
+              f"in {elapsed:.2f}s ({calls} solver calls)")
+        for idx in indices:
+            print(f"   - {labels[idx]}")
+
+    first, second = results["quickxplain (divide-and-conquer)"], results["mus_naive (linear deletion)"]
+    # Differently sized MUSes are told apart without building any set
+    same = len(first) == len(second) and frozenset(first) == frozenset(second)
     print("\nComparison:")
     print("\t   Same constraints:" if same else "\t   Different MUSes (both minimal)")
 
-    print("\n\t3 using the quickxplain naive to identify preferred conflicting constraints...")
-    qx_mus = quickxplain_naive(constraints, solver="ace", verbose=-1)
-    print(f"\n\t Result: Found {len(qx_mus)} conflicting constraint(s)")
-    print("   Preferred Minimal Unsatisfiable Subset:")
-    for c in qx_mus:
-        idx = find_constraint_index(c, constraints)
-        print(f"   - c{idx}: {constraint_names[idx]}")
-
     print("\n\t4 using optimal_mus to prioritize low-weight conflicts...")
-    optimal = optimal_mus(constraints, weights=weights, solver="ace", verbose=-1)
-    total_weight = 0
+    with session:
+        optimal = optimal_mus(constraints, weights=weights, solver="ace", verbose=-1)
+    optimal_indices = tracker.get_indices(optimal)
     print("   Optimal MUS (minimum total weight):")
-    for c in optimal:
-        idx = find_constraint_index(c, constraints)
-        weight = weights[idx]
-        total_weight += weight
-        print(f"   - c{idx}: {constraint_names[idx]} [w={weight}]")
-    print(f"   Total weight: {total_weight}")
+    for idx in optimal_indices:
+        print(f"   - {labels[idx]} [w={weights[idx]}]")
+    print(f"   Total weight: {sum(weights[idx] for idx in optimal_indices)}")
 
     print("\n\t5 using MARCO to enumerate all MUSes and MCSes...")
     def format_subset(subset):
-        parts = []
-        for c in subset:
-            idx = find_constraint_index(c, constraints)
-            if idx >= 0:
-                parts.append(f"c{idx}: {constraint_names[idx]}")
-        return ", ".join(parts)
+        return ", ".join(labels[i] for i in tracker.get_indices(subset))
 
     mus_count = 0
     mcs_count = 0
-    for result_type, subset in marco(constraints, solver="ace", verbose=-1):
-        if result_type == "MUS":
-            mus_count += 1
-            print(f"   MUS #{mus_count}: {{{format_subset(subset)}}}")
-        else:
-            mcs_count += 1
-            print(f"   MCS #{mcs_count}: {{{format_subset(subset)}}}")
+    with session:
+        for result_type, subset in marco(constraints, solver="ace", verbose=-1):
+            if result_type == "MUS":
+                mus_count += 1
+                print(f"   MUS #{mus_count}: {{{format_subset(subset)}}}")
+            else:
+                mcs_count += 1
+                print(f"   MCS #{mcs_count}: {{{format_subset(subset)}}}")
     print(f"   Total: {mus_count} MUSes, {mcs_count} MCSes")
+    print(f"\n   Solver calls: {session.solver_calls}, answered by the session: {session.cache_hits}")
 
     print("\n" + "=" * 60)
     print("Interpretation:")
@@ -174,4 +171,5 @@ def main():
 
 
 if __name__ == "__main__":
+    write_in_blocks()
     main()
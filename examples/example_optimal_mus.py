@@ -13,7 +13,9 @@ These algorithms are useful when:
 """
 
 from pycsp3 import *
-from pycsp3_explain import smus, optimal_mus, ocus, is_mus
+from pycsp3_explain import smus, optimal_mus, ocus, is_mus, ConstraintTracker, Session
+
+from common import write_in_blocks
 
 
 def main():
@@ -81,23 +83,27 @@ When there's a conflict, we want to identify which constraints to review.
     print("   If Alice works max 30 (c3) and Bob works max 25 (c4),")
     print("   total is max 55, but we need at least 70 (c2). Conflict!")
 
+    # The model is built once: every algorithm restores the PyCSP3 state it
+    # found, so all methods below run on these same constraint objects. They
+    # and their validity checks share one session.
+    session = Session("ace")
+
+    # Tags each constraint with its index, for O(1) lookups when printing results
+    tracker = ConstraintTracker(soft_constraints)
+    indices_of = tracker.get_indices
+
     def print_mus(title, mus_result, show_weights=False):
         print(f"\n{title}")
         print(f"   MUS size: {len(mus_result)} constraints")
-        total_weight = 0
-        for c in mus_result:
-            for i, orig in enumerate(soft_constraints):
-                if c is orig:
-                    w = weights[i]
-                    total_weight += w
-                    if show_weights:
-                        print(f"      - c{i}: {constraint_names[i]} [weight: {w}]")
-                    else:
-                        print(f"      - c{i}: {constraint_names[i]}")
-                    break
+        indices = indices_of(mus_result)
+        for i in indices:
+            if show_weights:
+                print(f"      - c{i}: {constraint_names[i]} [weight: {weights[i]}]")
+            else:
+                print(f"      - c{i}: {constraint_names[i]}")
         if show_weights:
-            print(f"   Total weight: {total_weight}")
-        valid = is_mus(mus_result, solver="ace", verbose=-1)
+            print(f"   Total weight: {sum(weights[i] for i in indices)}")
+        valid = is_mus(mus_result, solver="ace", verbose=-1, session=session)
         print(f"   Valid MUS: {valid}")
 
     # =========================================================================
@@ -107,17 +113,8 @@ When there's a conflict, we want to identify which constraints to review.
     print("Method 1: SMUS - Find Smallest MUS")
     print("-" * 70)
 
-    clear()
-    alice_hours = Var(dom=range(0, 50), id="alice_hours")
-    bob_hours = Var(dom=range(0, 50), id="bob_hours")
-    c0 = alice_hours <= 40
-    c1 = bob_hours <= 40
-    c2 = alice_hours + bob_hours >= 70
-    c3 = alice_hours <= 30
-    c4 = bob_hours <= 25
-    soft_constraints = [c0, c1, c2, c3, c4]
-
-    smallest_mus = smus(soft_constraints, solver="ace", verbose=-1)
+    with session:
+        smallest_mus = smus(soft_constraints, solver="ace", verbose=-1)
     print_mus("Smallest MUS (minimum number of constraints):", smallest_mus)
 
     print("\n   Interpretation: This shows the simplest conflict in the model.")
@@ -129,18 +126,10 @@ When there's a conflict, we want to identify which constraints to review.
     print("Method 2: Weighted Optimal MUS")
     print("-" * 70)
 
-    clear()
-    alice_hours = Var(dom=range(0, 50), id="alice_hours")
-    bob_hours = Var(dom=range(0, 50), id="bob_hours")
-    c0 = alice_hours <= 40
-    c1 = bob_hours <= 40
-    c2 = alice_hours + bob_hours >= 70
-    c3 = alice_hours <= 30
-    c4 = bob_hours <= 25
-    soft_constraints = [c0, c1, c2, c3, c4]
     weights = [100, 100, 10, 1, 1]
 
-    weighted_mus = optimal_mus(soft_constraints, weights=weights, solver="ace", verbose=-1)
+    with session:
+        weighted_mus = optimal_mus(soft_constraints, weights=weights, solver="ace", verbose=-1)
     print_mus("Optimal MUS (minimum total weight):", weighted_mus, show_weights=True)
 
     print("\n   Interpretation: This MUS has the lowest total weight,")
@@ -153,31 +142,21 @@ When there's a conflict, we want to identify which constraints to review.
     print("Method 3: OCUS with Required Constraint")
     print("-" * 70)
 
-    clear()
-    alice_hours = Var(dom=range(0, 50), id="alice_hours")
-    bob_hours = Var(dom=range(0, 50), id="bob_hours")
-    c0 = alice_hours <= 40
-    c1 = bob_hours <= 40
-    c2 = alice_hours + bob_hours >= 70
-    c3 = alice_hours <= 30
-    c4 = bob_hours <= 25
-    soft_constraints = [c0, c1, c2, c3, c4]
-    weights = [100, 100, 10, 1, 1]
-
     def require_business(select):
         return [select[2] == 1]
 
     def require_business_pred(indices):
         return 2 in indices
 
-    constrained_mus = ocus(
-        soft_constraints,
-        weights=weights,
-        solver="ace",
-        verbose=-1,
-        subset_constraints=require_business,
-        subset_predicate=require_business_pred,
-    )
+    with session:
+        constrained_mus = ocus(
+            soft_constraints,
+            weights=weights,
+            solver="ace",
+            verbose=-1,
+            subset_constraints=require_business,
+            subset_predicate=require_business_pred,
+        )
     print_mus("OCUS (must include business constraint c2):", constrained_mus, show_weights=True)
 
     print("\n   Interpretation: This keeps the business requirement in the explanation.")
@@ -190,46 +169,20 @@ When there's a conflict, we want to identify which constraints to review.
     print("-" * 70)
 
     # Scheme A: All equal weights (same as SMUS)
-    clear()
-    alice_hours = Var(dom=range(0, 50), id="alice_hours")
-    bob_hours = Var(dom=range(0, 50), id="bob_hours")
-    c0 = alice_hours <= 40
-    c1 = bob_hours <= 40
-    c2 = alice_hours + bob_hours >= 70
-    c3 = alice_hours <= 30
-    c4 = bob_hours <= 25
-    soft_constraints = [c0, c1, c2, c3, c4]
-
     equal_weights = [1, 1, 1, 1, 1]
-    mus_equal = optimal_mus(soft_constraints, weights=equal_weights, solver="ace", verbose=-1)
+    with session:
+        mus_equal = optimal_mus(soft_constraints, weights=equal_weights, solver="ace", verbose=-1)
     print(f"\n   Equal weights [1,1,1,1,1]:")
     print(f"      MUS size: {len(mus_equal)}, constraints: ", end="")
-    for c in mus_equal:
-        for i, orig in enumerate(soft_constraints):
-            if c is orig:
-                print(f"c{i}", end=" ")
-    print()
+    print(" ".join(f"c{i}" for i in indices_of(mus_equal)))
 
     # Scheme B: Prioritize legal requirements
-    clear()
-    alice_hours = Var(dom=range(0, 50), id="alice_hours")
-    bob_hours = Var(dom=range(0, 50), id="bob_hours")
-    c0 = alice_hours <= 40
-    c1 = bob_hours <= 40
-    c2 = alice_hours + bob_hours >= 70
-    c3 = alice_hours <= 30
-    c4 = bob_hours <= 25
-    soft_constraints = [c0, c1, c2, c3, c4]
-
     legal_priority = [100, 100, 10, 1, 1]
-    mus_legal = optimal_mus(soft_constraints, weights=legal_priority, solver="ace", verbose=-1)
+    with session:
+        mus_legal = optimal_mus(soft_constraints, weights=legal_priority, solver="ace", verbose=-1)
     print(f"\n   Legal priority [100,100,10,1,1]:")
     print(f"      MUS size: {len(mus_legal)}, constraints: ", end="")
-    for c in mus_legal:
-        for i, orig in enumerate(soft_constraints):
-            if c is orig:
-                print(f"c{i}", end=" ")
-    print()
+    print(" ".join(f"c{i}" for i in indices_of(mus_legal)))
 
     # =========================================================================
     # Summary
@@ -256,4 +209,5 @@ When there's a conflict, we want to identify which constraints to review.
 
 
 if __name__ == "__main__":
+    write_in_blocks()
     main()
@@ -6,21 +6,35 @@ This example shows how MUS can help debug an infeasible scheduling problem
 where tasks have conflicting time constraints.
 """
 
+import argparse
+import os
 
 from pycsp3 import *
 from pycsp3_explain.explain.mus import mus, mus_naive, quickxplain_naive, optimal_mus
 from pycsp3_explain.explain.marco import marco
+from pycsp3_explain import ConstraintTracker, Session
 
+from common import printed_in_background, run_portfolio, write_in_blocks
 
-def find_constraint_index(constraint, constraint_list):
-    """Find index of constraint using identity comparison (avoids PyCSP3 __eq__ issues)."""
-    for i, c in enumerate(constraint_list):
-        if c is constraint:
-            return i
-    return -1
 
+def build_weights():
+    """
+    Cost of relaxing each scheduling constraint, in constraint order.
 
-def main():
+    Only the weighted MUS (step 4) needs them, so they are built there.
+    """
+    return [
+        5,   # c1: Task A must start by 10am
+        20,  # c2: Task B must start at/after 6pm
+        3,   # c3: Task C must start at/after Task A
+        3,   # c4: Task C must start before Task A ends
+        10,  # c5: Task B must start when Task A ends
+        2,   # c6: Task C must finish before Task B starts
+    ]
+
+
+def main(parallel=False):
+    """Run the example; with parallel, MARCO gets one forked worker per core."""
     print("=" * 60)
     print("Example: Scheduling Conflict Detection")
     print("=" * 60)
@@ -51,20 +65,17 @@ def main():
 
     constraints = []
     constraint_names = []
-    weights = []
 
     # Task A must start before 10am
     c1 = task_a_start <= 10
     constraints.append(c1)
     constraint_names.append("Task A must start by 10am")
-    weights.append(5)
     print(f"   c1: {constraint_names[-1]}")
 
     # Task B must start after 6pm (18:00)
     c2 = task_b_start >= 18
     constraints.append(c2)
     constraint_names.append("Task B must start at/after 6pm")
-    weights.append(20)
     print(f"   c2: {constraint_names[-1]}")
 
     # Task C must overlap with Task A
@@ -72,27 +83,23 @@ def main():
     c3 = task_c_start >= task_a_start
     constraints.append(c3)
     constraint_names.append("Task C must start at/after Task A")
-    weights.append(3)
     print(f"   c3: {constraint_names[-1]}")
 
     c4 = task_c_start <= task_a_start + duration_a
     constraints.append(c4)
     constraint_names.append("Task C must start before Task A ends")
-    weights.append(3)
     print(f"   c4: {constraint_names[-1]}")
 
     # Task B must start right after Task A ends
     c5 = task_b_start == task_a_start + duration_a
     constraints.append(c5)
     constraint_names.append("Task B must start when Task A ends")
-    weights.append(10)
     print(f"   c5: {constraint_names[-1]}")
 
     # Task C must be done before Task B starts
     c6 = task_c_start + duration_c <= task_b_start
     constraints.append(c6)
     constraint_names.append("Task C must finish before Task B starts")
-    weights.append(2)
     print(f"   c6: {constraint_names[-1]}")
 
     # The conflict:
@@ -101,66 +108,70 @@ def main():
     # - But B must start >= 18 (c2)
     # This is the core conflict!
 
-    print("\n1. Finding MUS with mus (assumption-based)...")
-    mus_fast = mus(constraints, solver="ace", verbose=-1)
-
-    print(f"\n\tResult: Found {len(mus_fast)} conflicting constraint(s)")
-    print("   Minimal Unsatisfiable Subset:")
-    for c in mus_fast:
-        idx = find_constraint_index(c, constraints)
-        print(f"   - c{idx+1}: {constraint_names[idx]}")
-
-    print("\n2. Finding MUS with mus_naive...")
-    mus_slow = mus_naive(constraints, solver="ace", verbose=-1)
-
-    print(f"\n\tNaive Result: Found {len(mus_slow)} conflicting constraint(s)")
-    for c in mus_slow:
-        idx = find_constraint_index(c, constraints)
-        print(f"   - c{idx+1}: {constraint_names[idx]}")
-
-    same = set(id(c) for c in mus_fast) == set(id(c) for c in mus_slow)
+    # Tags each constraint with its index, for cheap lookups in the results;
+    # labels are formatted once and shared by every printing site below
+    tracker = ConstraintTracker(constraints)
+    labels = [f"c{i+1}: {name}" for i, name in enumerate(constraint_names)]
+
+    # mus, mus_naive and QuickXplain are independent of each other, so they
+    # run as a portfolio in forked workers. The weighted MUS and MARCO below
+    # share one session, so MARCO reuses the checks made by optimal_mus.
+    session = Session("ace")
+
+    print("\n1-3. Finding MUSes with three algorithms concurrently...")
+    print("   (QuickXplain prefers earlier constraints in case of multiple MUSes)")
+    algorithms = {
+        "mus (assumption-based)": lambda: mus(constraints, solver="ace", verbose=-1),
+        "mus_naive (linear deletion)": lambda: mus_naive(constraints, solver="ace", verbose=-1),
+        "quickxplain (preferred MUS)": lambda: quickxplain_naive(constraints, solver="ace", verbose=-1),
+    }
+
+    results = {}
+    for rank, (name, indices, elapsed, calls) in enumerate(run_portfolio(algorithms, tracker), 1):
+        results[name] = indices
+        print(f"\n\t#{rank} {name}: {len(indices)} conflicting constraint(s) "
+              f"in {elapsed:.2f}s ({calls} solver calls)")
+        for idx in indices:
+            print(f"   - {labels[idx]}")
+
+    first, second = results["mus (assumption-based)"], results["mus_naive (linear deletion)"]
+    # Differently sized MUSes are told apart without building any set
+    same = len(first) == len(second) and frozenset(first) == frozenset(second)
     print("\nComparison:")
     print("   Same constraints:" if same else "   Different MUSes (both minimal)")
 
-    print("\n3. Finding preferred MUS with QuickXplain...")
-    print("   (Prefers earlier constraints in case of multiple MUSes)")
-    qx_mus = quickxplain_naive(constraints, solver="ace", verbose=-1)
-
-    print(f"\n\tQuickXplain Result: {len(qx_mus)} constraint(s)")
-    for c in qx_mus:
-        idx = find_constraint_index(c, constraints)
-        print(f"   - c{idx+1}: {constraint_names[idx]}")
-
     print("\n4. Finding optimal MUS with weights...")
-    optimal = optimal_mus(constraints, weights=weights, solver="ace", verbose=-1)
-    total_weight = 0
+    weights = build_weights()
+    with session:
+        optimal = optimal_mus(constraints, weights=weights, solver="ace", verbose=-1)
+    optimal_indices = tracker.get_indices(optimal)
     print("   Optimal MUS (minimum total weight):")
-    for c in optimal:
-        idx = find_constraint_index(c, constraints)
-        weight = weights[idx]
-        total_weight += weight
-        print(f"   - c{idx+1}: {constraint_names[idx]} [w={weight}]")
-    print(f"   Total weight: {total_weight}")
+    for idx in optimal_indices:
+        print(f"   - {labels[idx]} [w={weights[idx]}]")
+    print(f"   Total weight: {sum(weights[idx] for idx in optimal_indices)}")
 
     print("\n5. Enumerating all MUSes and MCSes with MARCO...")
     def format_subset(subset):
-        parts = []
-        for c in subset:
-            idx = find_constraint_index(c, constraints)
-            if idx >= 0:
-                parts.append(f"c{idx+1}: {constraint_names[idx]}")
-        return ", ".join(parts)
+        return ", ".join(labels[idx] for idx in tracker.get_indices(subset))
 
     mus_count = 0
     mcs_count = 0
-    for result_type, subset in marco(constraints, solver="ace", verbose=-1):
-        if result_type == "MUS":
-            mus_count += 1
-            print(f"   MUS #{mus_count}: {{{format_subset(subset)}}}")
-        else:
-            mcs_count += 1
-            print(f"   MCS #{mcs_count}: {{{format_subset(subset)}}}")
+    def render(item):
+        result_type, number, subset = item
+        return f"   {result_type} #{number}: {{{format_subset(subset)}}}"
+
+    # MARCO searches for the next subset while the previous one is printed
+    n_workers = (os.cpu_count() or 1) if parallel else 1
+    with session, printed_in_background(render) as emit:
+        for result_type, subset in marco(constraints, solver="ace", verbose=-1, n_workers=n_workers):
+            if result_type == "MUS":
+                mus_count += 1
+                emit((result_type, mus_count, subset))
+            else:
+                mcs_count += 1
+                emit((result_type, mcs_count, subset))
     print(f"   Total: {mus_count} MUSes, {mcs_count} MCSes")
+    print(f"\n   Solver calls: {session.solver_calls}, answered by the session: {session.cache_hits}")
 
     print("\n" + "=" * 60)
     print("Interpretation:")
@@ -175,4 +186,8 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    write_in_blocks()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--parallel", action="store_true",
+                        help="enumerate MUSes and MCSes with one MARCO worker per core")
+    main(parallel=parser.parse_args().parallel)
@@ -7,13 +7,29 @@ mus_naive to find the minimal set of conflicting constraints in an
 infeasible model.
 """
 
+import argparse
+import os
 
 from pycsp3 import *
 from pycsp3_explain.explain.mus import mus, mus_naive, is_mus, optimal_mus, ocus
 from pycsp3_explain.explain.marco import marco
+from pycsp3_explain import ConstraintTracker, Session, QUICK_START_JVM_OPTIONS
 
+from common import printed_in_background, write_in_blocks
 
-def main():
+
+# Labels of the soft constraints, in the order they are created
+LABELS = (
+    "x[0] == 5",
+    "x[1] >= 3",
+    "x[0] + x[1] == 10",
+    "x[0] == 7",
+    "x[2] <= 8",
+)
+
+
+def main(parallel=False):
+    """Run the example; with parallel, MARCO gets one forked worker per core."""
     print("=" * 60)
     print("Example: Simple Constraint Conflict Detection")
     print("=" * 60)
@@ -30,72 +46,70 @@ def main():
     print("\nCreating constraints...")
 
     c0 = x[0] == 5
-    print(f"   c0: x[0] == 5")
+    print(f"   c0: {LABELS[0]}")
 
     c1 = x[1] >= 3
-    print(f"   c1: x[1] >= 3")
+    print(f"   c1: {LABELS[1]}")
 
     c2 = x[0] + x[1] == 10
-    print(f"   c2: x[0] + x[1] == 10")
+    print(f"   c2: {LABELS[2]}")
 
     c3 = x[0] == 7
-    print(f"   c3: x[0] == 7")
+    print(f"   c3: {LABELS[3]}")
 
     c4 = x[2] <= 8
-    print(f"   c4: x[2] <= 8")
+    print(f"   c4: {LABELS[4]}")
 
     # The conflict is between c0 (x[0]==5) and c3 (x[0]==7)
     # c1, c2, c4 are independent and not part of the conflict
 
     soft_constraints = [c0, c1, c2, c3, c4]
-    constraint_labels = [
-        "x[0] == 5",
-        "x[1] >= 3",
-        "x[0] + x[1] == 10",
-        "x[0] == 7",
-        "x[2] <= 8",
-    ]
     weights = [10, 5, 5, 1, 5]
 
+    # Tags each constraint with its index; labels are formatted once
+    tracker = ConstraintTracker(soft_constraints)
+    labels = [f"c{i}: {label}" for i, label in enumerate(LABELS)]
+
+    # All methods below run on the same constraints, and each result is
+    # verified with is_mus; one session answers the subsets already checked
+    # without running ACE again. Each remaining check starts a JVM, tuned to
+    # start quickly since these models are tiny
+    session = Session("ace", jvm_options=QUICK_START_JVM_OPTIONS)
+
     def print_mus_result(title, mus_set, weights=None):
         print(f"\n{title}: MUS contains {len(mus_set)} constraint(s)")
         print("   Conflicting constraints:")
-        total_weight = 0
-        for c in mus_set:
-            for j, orig_c in enumerate(soft_constraints):
-                if c is orig_c:
-                    line = f"   - c{j}: {constraint_labels[j]}"
-                    if weights is not None:
-                        line += f" [w={weights[j]}]"
-                        total_weight += weights[j]
-                    print(line)
-                    break
+        indices = tracker.get_indices(mus_set)
+        for j in indices:
+            if weights is not None:
+                print(f"   - {labels[j]} [w={weights[j]}]")
+            else:
+                print(f"   - {labels[j]}")
         if weights is not None:
-            print(f"   Total weight: {total_weight}")
-        print("   Verification:", "valid" if is_mus(mus_set, solver="ace", verbose=-1) else "invalid")
+            print(f"   Total weight: {sum(weights[j] for j in indices)}")
+        print("   Verification:", "valid" if is_mus(mus_set, solver="ace", verbose=-1, session=session) else "invalid")
 
     def format_subset(subset):
-        parts = []
-        for c in subset:
-            for j, orig_c in enumerate(soft_constraints):
-                if c is orig_c:
-                    parts.append(f"c{j}: {constraint_labels[j]}")
-                    break
-        return ", ".join(parts)
+        return ", ".join(labels[j] for j in tracker.get_indices(subset))
 
     print("\n1. Finding MUS with mus (assumption-based)...")
-    mus_assump = mus(soft_constraints, solver="ace", verbose=-1)
+    with session:
+        mus_assump = mus(soft_constraints, solver="ace", verbose=-1)
     print_mus_result("\tAssumption-based result", mus_assump)
 
     print("\n2. Finding MUS with mus_naive...")
-    mus_slow = mus_naive(soft_constraints, solver="ace", verbose=-1)
+    with session:
+        mus_slow = mus_naive(soft_constraints, solver="ace", verbose=-1)
     print_mus_result("\tNaive result", mus_slow)
-    same = set(id(c) for c in mus_assump) == set(id(c) for c in mus_slow)
+    # Differently sized MUSes are told apart without building any set
+    same = (len(mus_assump) == len(mus_slow)
+            and frozenset(map(tracker.tag, mus_assump)) == frozenset(map(tracker.tag, mus_slow)))
     print("\nComparison:")
     print("   Same constraints:" if same else "   Different MUSes (both minimal)")
 
     print("\n3. Finding Optimal MUS with weights...")
-    optimal = optimal_mus(soft_constraints, weights=weights, solver="ace", verbose=-1)
+    with session:
+        optimal = optimal_mus(soft_constraints, weights=weights, solver="ace", verbose=-1)
     print_mus_result("\tOptimal MUS (weighted)", optimal, weights=weights)
 
     print("\n4. Finding OCUS with a required constraint (must include c2)...")
@@ -105,27 +119,36 @@ def main():
     def require_c2_pred(indices):
         return 2 in indices
 
-    ocus_result = ocus(
-        soft_constraints,
-        weights=weights,
-        solver="ace",
-        verbose=-1,
-        subset_constraints=require_c2,
-        subset_predicate=require_c2_pred,
-    )
+    with session:
+        ocus_result = ocus(
+            soft_constraints,
+            weights=weights,
+            solver="ace",
+            verbose=-1,
+            subset_constraints=require_c2,
+            subset_predicate=require_c2_pred,
+        )
     print_mus_result("\tOCUS (must include c2)", ocus_result, weights=weights)
 
     print("\n5. Enumerating all MUSes and MCSes with MARCO...")
     mus_count = 0
     mcs_count = 0
-    for result_type, subset in marco(soft_constraints, solver="ace", verbose=-1):
-        if result_type == "MUS":
-            mus_count += 1
-            print(f"   MUS #{mus_count}: {{{format_subset(subset)}}}")
-        else:
-            mcs_count += 1
-            print(f"   MCS #{mcs_count}: {{{format_subset(subset)}}}")
+    def render(item):
+        result_type, number, subset = item
+        return f"   {result_type} #{number}: {{{format_subset(subset)}}}"
+
+    # MARCO searches for the next subset while the previous one is printed
+    n_workers = (os.cpu_count() or 1) if parallel else 1
+    with session, printed_in_background(render) as emit:
+        for result_type, subset in marco(soft_constraints, solver="ace", verbose=-1, n_workers=n_workers):
+            if result_type == "MUS":
+                mus_count += 1
+                emit((result_type, mus_count, subset))
+            else:
+                mcs_count += 1
+                emit((result_type, mcs_count, subset))
     print(f"   Total: {mus_count} MUSes, {mcs_count} MCSes")
+    print(f"\n   Solver calls: {session.solver_calls}, answered by the session: {session.cache_hits}")
 
     print("\n" + "=" * 60)
     print("Explanation:")
@@ -138,4 +161,8 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    write_in_blocks()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--parallel", action="store_true",
+                        help="enumerate MUSes and MCSes with one MARCO worker per core")
+    main(parallel=parser.parse_args().parallel)
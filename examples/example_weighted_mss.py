@@ -3,15 +3,19 @@
 Example: Weighted MSS/MCS Optimization.
 
 This example demonstrates how to use weighted MSS/MCS algorithms to find:
-- mss_opt: MSS that maximizes total weight of satisfied constraints
-- mcs_opt: MCS that minimizes total weight of removed constraints
+- mss_opt: MSS keeping the heavier constraints first
+- mcs_opt: MCS removing the lighter constraints first
 
 Use case: When constraints have different importance/costs, we want to
-maximize value of kept constraints or minimize cost of removed constraints.
+keep the valuable constraints and remove the cheap ones. Both results are
+maximal/minimal, not guaranteed to have the best total weight.
 """
 
 from pycsp3 import *
 from pycsp3_explain.explain.mss import mss_opt, mcs_opt, mss_naive, mcs_naive
+from pycsp3_explain import ConstraintTracker
+
+from common import write_in_blocks
 
 
 def main():
@@ -85,23 +89,21 @@ def main():
 
     print(f"\nTotal weight of all constraints: {sum(weights)}")
 
+    # Tags each constraint with its index, for O(1) lookups in the results,
+    # and formats every constraint once for all the listings below
+    tracker = ConstraintTracker(constraints)
+    pretty = [f"c{i}: {label} [w={w}]" for i, (label, w) in enumerate(zip(labels, weights, strict=True))]
+
     # Helper to get constraint info
-    def get_constraint_info(subset, all_constraints, all_weights, all_labels):
-        """Get labels and weights for constraints in subset."""
-        info = []
-        total_weight = 0
-        for c in subset:
-            for j, orig_c in enumerate(all_constraints):
-                if c is orig_c:
-                    info.append((j, all_labels[j], all_weights[j]))
-                    total_weight += all_weights[j]
-                    break
-        return info, total_weight
-
-    def complement_constraints(subset, all_constraints):
-        """Return constraints not in subset using identity comparison."""
-        subset_ids = {id(c) for c in subset}
-        return [c for c in all_constraints if id(c) not in subset_ids]
+    def get_constraint_info(subset):
+        """Get the indices and the total weight of the constraints in subset."""
+        indices = tracker.get_indices(subset)
+        return indices, sum(weights[j] for j in indices)
+
+    def complement_constraints(subset):
+        """Return constraints not in subset (by index, not by __eq__)."""
+        kept = set(tracker.get_indices(subset))
+        return [c for j, c in enumerate(constraints) if j not in kept]
 
     # 1. Standard MSS (no weights - maximizes count)
     print("\n" + "=" * 70)
@@ -109,70 +111,65 @@ def main():
     print("=" * 70)
 
     mss_standard = mss_naive(constraints, solver="ace", verbose=-1)
-    info, total = get_constraint_info(mss_standard, constraints, weights, labels)
+    info, total = get_constraint_info(mss_standard)
 
     print(f"\nMSS contains {len(mss_standard)} constraints (total weight: {total}):")
-    for idx, label, w in info:
-        print(f"  c{idx}: {label} [w={w}]")
+    for j in info:
+        print(f"  {pretty[j]}")
 
-    mcs_standard = complement_constraints(mss_standard, constraints)
-    info_mcs, total_mcs = get_constraint_info(mcs_standard, constraints, weights, labels)
+    mcs_standard = complement_constraints(mss_standard)
+    info_mcs, total_mcs = get_constraint_info(mcs_standard)
     print(f"\nMCS (removed): {len(mcs_standard)} constraints (total weight: {total_mcs}):")
-    for idx, label, w in info_mcs:
-        print(f"  c{idx}: {label} [w={w}]")
+    for j in info_mcs:
+        print(f"  {pretty[j]}")
 
-    # 2. Weighted MSS (maximizes total weight)
+    # 2. Weighted MSS (heavier constraints kept first)
     print("\n" + "=" * 70)
-    print("2. Weighted MSS (maximizes total weight of kept constraints)")
+    print("2. Weighted MSS (heavier constraints kept first)")
     print("=" * 70)
 
     mss_weighted = mss_opt(constraints, weights=weights, solver="ace", verbose=-1)
-    info, total = get_constraint_info(mss_weighted, constraints, weights, labels)
+    info, total = get_constraint_info(mss_weighted)
 
     print(f"\nWeighted MSS contains {len(mss_weighted)} constraints (total weight: {total}):")
-    for idx, label, w in info:
-        print(f"  c{idx}: {label} [w={w}]")
+    for j in info:
+        print(f"  {pretty[j]}")
 
-    mcs_weighted = complement_constraints(mss_weighted, constraints)
-    info_mcs, total_mcs = get_constraint_info(mcs_weighted, constraints, weights, labels)
+    mcs_weighted = complement_constraints(mss_weighted)
+    info_mcs, total_mcs = get_constraint_info(mcs_weighted)
     print(f"\nWeighted MCS (removed): {len(mcs_weighted)} constraints (total weight: {total_mcs}):")
-    for idx, label, w in info_mcs:
-        print(f"  c{idx}: {label} [w={w}]")
+    for j in info_mcs:
+        print(f"  {pretty[j]}")
 
-    # 3. Direct MCS optimization (minimizes removal cost)
+    # 3. Direct weighted MCS (lighter constraints removed first)
     print("\n" + "=" * 70)
-    print("3. Weighted MCS (minimizes total weight of removed constraints)")
+    print("3. Weighted MCS (lighter constraints removed first)")
     print("=" * 70)
 
     mcs_opt_result = mcs_opt(constraints, weights=weights, solver="ace", verbose=-1)
-    info_mcs, total_mcs = get_constraint_info(mcs_opt_result, constraints, weights, labels)
+    info_mcs, total_mcs = get_constraint_info(mcs_opt_result)
 
-    print(f"\nOptimal MCS removes {len(mcs_opt_result)} constraints (total weight: {total_mcs}):")
-    for idx, label, w in info_mcs:
-        print(f"  c{idx}: {label} [w={w}]")
+    print(f"\nWeighted MCS removes {len(mcs_opt_result)} constraints (total weight: {total_mcs}):")
+    for j in info_mcs:
+        print(f"  {pretty[j]}")
 
-    remaining = complement_constraints(mcs_opt_result, constraints)
-    info_remaining, total_remaining = get_constraint_info(remaining, constraints, weights, labels)
+    remaining = complement_constraints(mcs_opt_result)
+    info_remaining, total_remaining = get_constraint_info(remaining)
     print(f"\nRemaining constraints: {len(remaining)} (total weight: {total_remaining}):")
-    for idx, label, w in info_remaining:
-        print(f"  c{idx}: {label} [w={w}]")
+    for j in info_remaining:
+        print(f"  {pretty[j]}")
 
     # 4. Comparison summary
     print("\n" + "=" * 70)
     print("Summary: Weighted vs Unweighted Optimization")
     print("=" * 70)
 
-    _, std_kept_weight = get_constraint_info(mss_standard, constraints, weights, labels)
-    _, std_removed_weight = get_constraint_info(
-        complement_constraints(mss_standard, constraints),
-        constraints, weights, labels
-    )
+    # The complements were already computed in sections 1 and 2
+    _, std_kept_weight = get_constraint_info(mss_standard)
+    _, std_removed_weight = get_constraint_info(mcs_standard)
 
-    _, weighted_kept_weight = get_constraint_info(mss_weighted, constraints, weights, labels)
-    _, weighted_removed_weight = get_constraint_info(
-        complement_constraints(mss_weighted, constraints),
-        constraints, weights, labels
-    )
+    _, weighted_kept_weight = get_constraint_info(mss_weighted)
+    _, weighted_removed_weight = get_constraint_info(mcs_weighted)
 
     print(f"\n{'Method':<25} {'Kept':<12} {'Removed':<12} {'Kept Weight':<15} {'Removed Weight'}")
     print("-" * 70)
@@ -188,4 +185,5 @@ def main():
 
 
 if __name__ == "__main__":
+    write_in_blocks()
     main()
@@ -12,24 +12,31 @@ satisfy([
 
 constraints = flatten_constraints(posted())
 if solve() == UNSAT:
-    print("MUS:", mus(constraints))
-    print("Optimal MUS:", optimal_mus(constraints, weights=[1, 1, 1]))
-
-    print("OCUS (must include c2):", ocus(
-        constraints,
-        subset_constraints=lambda select: [select[2] == 1],
-        subset_predicate=lambda indices: 2 in indices,
-    ))
-
-    for kind, subset in marco(constraints):
-        print(kind, subset)
-
-    # or use the helper function
-    mus_result = explain_unsat("mus", soft=constraints, check=False)
-    print("MUS:", mus_result)
-
-    optimal = explain_unsat("optimal_mus", soft=constraints, check=False, weights=[1] * len(constraints))
-    print("Optimal MUS:", optimal)
-
-    for kind, subset in explain_unsat("marco", soft=constraints, check=False):
-        print(kind, subset)
\ No newline at end of file
+    # Every call below explains the same constraints: selectors are declared
+    # once for the assumption-based mus, and the session answers the subsets
+    # already checked by an earlier call without running the solver again
+    sels = post_with_selectors(constraints)
+    with Session("ace") as session:
+        print("MUS:", mus(sels))
+        print("Optimal MUS:", optimal_mus(constraints, weights=[1, 1, 1]))
+
+        print("OCUS (must include c2):", ocus(
+            constraints,
+            subset_constraints=lambda select: [select[2] == 1],
+            subset_predicate=lambda indices: 2 in indices,
+        ))
+
+        for kind, subset in marco(constraints):
+            print(kind, subset)
+
+        # or use the helper function
+        mus_result = explain_unsat("mus", soft=constraints, check=False)
+        print("MUS:", mus_result)
+
+        optimal = explain_unsat("optimal_mus", soft=constraints, check=False, weights=[1] * len(constraints))
+        print("Optimal MUS:", optimal)
+
+        for kind, subset in explain_unsat("marco", soft=constraints, check=False):
+            print(kind, subset)
+
+    print("Solver calls:", session.solver_calls, "answered by the session:", session.cache_hits)
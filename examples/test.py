@@ -1,5 +1,5 @@
 from pycsp3 import *
-from pycsp3_explain import mus, mus_naive, is_mus
+from pycsp3_explain import mus, mus_naive, is_mus, is_sat, Session, QUICK_START_JVM_OPTIONS
 
 # Define an infeasible model
 clear()
@@ -13,11 +13,19 @@ constraints = [
     x[1] == x[2],
 ]
 
-# Find a minimal unsatisfiable subset (assumption-based with ACE)
-minimal_conflict = mus(soft=constraints, solver="ace")
-print("MUS (assumption-based):", minimal_conflict)
-print("Valid:", is_mus(minimal_conflict, solver="ace"))
+# One session for every check: the satisfiability pre-check and the checks
+# repeated by the two MUS algorithms are solved once
+with Session("ace", jvm_options=QUICK_START_JVM_OPTIONS) as session:
+    if is_sat(constraints, solver="ace"):
+        print("Satisfiable: there is no MUS")
+    else:
+        # Find a minimal unsatisfiable subset (assumption-based with ACE)
+        minimal_conflict = mus(soft=constraints, solver="ace")
+        print("MUS (assumption-based):", minimal_conflict)
+        print("Valid:", is_mus(minimal_conflict, solver="ace"))
 
-# Naive MUS (works with any solver, but slower)
-minimal_conflict_naive = mus_naive(soft=constraints, solver="ace")
-print("MUS (naive):", minimal_conflict_naive)
\ No newline at end of file
+        # Naive MUS (works with any solver, but slower)
+        minimal_conflict_naive = mus_naive(soft=constraints, solver="ace")
+        print("MUS (naive):", minimal_conflict_naive)
+
+print("Solver calls:", session.solver_calls, "answered by the session:", session.cache_hits)
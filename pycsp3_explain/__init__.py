@@ -36,106 +36,81 @@ Example usage:
     print("Smallest MUS:", smallest)
 """
 
+from typing import Any, List
+
 __version__ = "0.1.0"
 
-# Import MUS algorithms
-from pycsp3_explain.explain.mus import (
-    mus,
-    mus_naive,
-    quickxplain_naive,
-    is_mus,
-    all_mus_naive,
-    optimal_mus,
-    optimal_mus_naive,
-    smus,
-    ocus,
-    ocus_naive,
-    OCUSException,
-)
-
-# Import MSS/MCS algorithms
-from pycsp3_explain.explain.mss import (
-    mss,
-    mss_naive,
-    mss_opt,
-    is_mss,
-    mcs,
-    mcs_naive,
-    mcs_opt,
-    mcs_from_mss,
-    is_mcs,
-)
-
-# Import MARCO enumeration
-from pycsp3_explain.explain.marco import (
-    marco,
-    marco_naive,
-    all_mus,
-    all_mcs,
-)
-
-# Import utility functions
-from pycsp3_explain.explain.utils import (
-    flatten_constraints,
-    get_constraint_variables,
-    explain_unsat,
-    ConstraintTracker,
-    make_assump_model,
-    order_by_num_variables,
-)
-
-# Import solver utilities
-from pycsp3_explain.solvers.wrapper import (
-    SolveResult,
-    solve_subset,
-    solve_subset_with_core,
-    is_sat,
-    is_unsat,
-)
-
-__all__ = [
-    # Version
-    "__version__",
+# Public names and the modules defining them. They are imported on first
+# access (PEP 562), so using the solver utilities does not load the
+# explanation algorithms
+_LAZY_IMPORTS = {
     # MUS algorithms
-    "mus",
-    "mus_naive",
-    "quickxplain_naive",
-    "is_mus",
-    "all_mus_naive",
-    # Optimal MUS algorithms
-    "optimal_mus",
-    "optimal_mus_naive",
-    "smus",
-    "ocus",
-    "ocus_naive",
-    "OCUSException",
-    # MSS algorithms
-    "mss",
-    "mss_naive",
-    "mss_opt",
-    "is_mss",
-    # MCS algorithms
-    "mcs",
-    "mcs_naive",
-    "mcs_opt",
-    "mcs_from_mss",
-    "is_mcs",
+    "mus": "pycsp3_explain.explain.mus",
+    "mus_naive": "pycsp3_explain.explain.mus",
+    "quickxplain_naive": "pycsp3_explain.explain.mus",
+    "is_mus": "pycsp3_explain.explain.mus",
+    "all_mus_naive": "pycsp3_explain.explain.mus",
+    "optimal_mus": "pycsp3_explain.explain.mus",
+    "optimal_mus_naive": "pycsp3_explain.explain.mus",
+    "smus": "pycsp3_explain.explain.mus",
+    "ocus": "pycsp3_explain.explain.mus",
+    "ocus_naive": "pycsp3_explain.explain.mus",
+    "OCUSException": "pycsp3_explain.explain.mus",
+    # MSS/MCS algorithms
+    "mss": "pycsp3_explain.explain.mss",
+    "mss_naive": "pycsp3_explain.explain.mss",
+    "mss_opt": "pycsp3_explain.explain.mss",
+    "is_mss": "pycsp3_explain.explain.mss",
+    "mcs": "pycsp3_explain.explain.mss",
+    "mcs_naive": "pycsp3_explain.explain.mss",
+    "mcs_opt": "pycsp3_explain.explain.mss",
+    "mcs_from_mss": "pycsp3_explain.explain.mss",
+    "is_mcs": "pycsp3_explain.explain.mss",
     # MARCO enumeration
-    "marco",
-    "marco_naive",
-    "all_mus",
-    "all_mcs",
-    # Utilities
-    "flatten_constraints",
-    "get_constraint_variables",
-    "explain_unsat",
-    "ConstraintTracker",
-    "make_assump_model",
-    "order_by_num_variables",
+    "marco": "pycsp3_explain.explain.marco",
+    "marco_naive": "pycsp3_explain.explain.marco",
+    "iter_mus": "pycsp3_explain.explain.marco",
+    "iter_mcs": "pycsp3_explain.explain.marco",
+    "all_mus": "pycsp3_explain.explain.marco",
+    "all_mcs": "pycsp3_explain.explain.marco",
+    "all_mus_and_mcs": "pycsp3_explain.explain.marco",
+    # Utility functions
+    "flatten_constraints": "pycsp3_explain.explain.utils",
+    "get_constraint_variables": "pycsp3_explain.explain.utils",
+    "explain_unsat": "pycsp3_explain.explain.utils",
+    "ConstraintTracker": "pycsp3_explain.explain.utils",
+    "make_assump_model": "pycsp3_explain.explain.utils",
+    "order_by_num_variables": "pycsp3_explain.explain.utils",
+    "constraint_fingerprint": "pycsp3_explain.explain.utils",
+    "SelectorModel": "pycsp3_explain.explain.utils",
+    "post_with_selectors": "pycsp3_explain.explain.utils",
+    "pycsp3_scope": "pycsp3_explain.explain.utils",
     # Solver utilities
-    "SolveResult",
-    "solve_subset",
-    "solve_subset_with_core",
-    "is_sat",
-    "is_unsat",
-]
+    "SolveResult": "pycsp3_explain.solvers.wrapper",
+    "Session": "pycsp3_explain.solvers.wrapper",
+    "QUICK_START_JVM_OPTIONS": "pycsp3_explain.solvers.wrapper",
+    "solve_subset": "pycsp3_explain.solvers.wrapper",
+    "solve_subset_with_core": "pycsp3_explain.solvers.wrapper",
+    "solve_subset_with_values": "pycsp3_explain.solvers.wrapper",
+    "is_sat": "pycsp3_explain.solvers.wrapper",
+    "is_unsat": "pycsp3_explain.solvers.wrapper",
+    "set_persistent_cache": "pycsp3_explain.solvers.cache",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
+
+__all__ = ["__version__", *_LAZY_IMPORTS]
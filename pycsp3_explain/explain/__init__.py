@@ -38,8 +38,11 @@ from pycsp3_explain.explain.mss import (
 from pycsp3_explain.explain.marco import (
     marco,
     marco_naive,
+    iter_mus,
+    iter_mcs,
     all_mus,
     all_mcs,
+    all_mus_and_mcs,
 )
 
 from pycsp3_explain.explain.utils import (
@@ -49,6 +52,10 @@ from pycsp3_explain.explain.utils import (
     ConstraintTracker,
     make_assump_model,
     order_by_num_variables,
+    constraint_fingerprint,
+    SelectorModel,
+    post_with_selectors,
+    pycsp3_scope,
 )
 
 __all__ = [
@@ -79,8 +86,11 @@ __all__ = [
     # MARCO enumeration
     "marco",
     "marco_naive",
+    "iter_mus",
+    "iter_mcs",
     "all_mus",
     "all_mcs",
+    "all_mus_and_mcs",
     # Utilities
     "flatten_constraints",
     "get_constraint_variables",
@@ -88,4 +98,8 @@ __all__ = [
     "ConstraintTracker",
     "make_assump_model",
     "order_by_num_variables",
+    "constraint_fingerprint",
+    "SelectorModel",
+    "post_with_selectors",
+    "pycsp3_scope",
 ]
@@ -0,0 +1,524 @@
+"""
+Subset checks shared by the explanation algorithms.
+
+Subsets of the soft constraints are integer bitmasks (bit i set when soft
+constraint i is in the subset). This module provides:
+- _Verdicts: monotone memo of the verdicts of checked subsets
+- _MapSolver: map of the explored subsets, as in MARCO
+- _shrink_to_mus / _grow_to_mss: QuickXplain shrinking and MSS growing
+- _Checker: the checks of one run, with ACE's cores and solutions
+"""
+
+from typing import List, Any, Optional, Iterator, Iterable, Tuple, Set, FrozenSet, Callable, Dict
+
+from pycsp3_explain.explain.utils import (
+    _auxiliary_definitions,
+    _discard_variables,
+    _next_assump_name,
+    get_constraint_variables,
+)
+from pycsp3_explain.solvers.wrapper import (
+    SolveResult,
+    is_sat,
+    solve_subset_with_values,
+    _parse_core_scopes,
+    _solve_with_core_line,
+)
+
+
+def _to_mask(indices: Iterable[int]) -> int:
+    """Encode a set of soft constraint indices as an integer bitmask."""
+    mask = 0
+    for i in indices:
+        mask |= 1 << i
+    return mask
+
+
+def _bits(mask: int) -> Iterator[int]:
+    """Yield the indices of the bits set in a bitmask, in increasing order."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _from_mask(mask: int) -> Set[int]:
+    """Decode an integer bitmask into the set of indices of its bits."""
+    return set(_bits(mask))
+
+
+class _Verdicts:
+    """
+    Verdicts of the subsets checked during a run, as bitmasks.
+
+    Satisfiability is monotone: every subset of a SAT set is SAT and every
+    superset of an UNSAT set is UNSAT. Only the maximal SAT sets and the
+    minimal UNSAT sets are kept, and they answer for all the sets below or
+    above them.
+    """
+
+    def __init__(self) -> None:
+        self.sat: List[int] = []
+        self.unsat: List[int] = []
+
+    def get(self, mask: int) -> Optional[bool]:
+        """Known verdict of a subset, or None if it must be checked."""
+        if any(mask & ~sat == 0 for sat in self.sat):
+            return True
+        if any(unsat & ~mask == 0 for unsat in self.unsat):
+            return False
+        return None
+
+    def record(self, mask: int, sat: bool) -> None:
+        """Record the verdict of a subset."""
+        if sat:
+            self.sat = [known for known in self.sat if known & ~mask]
+            self.sat.append(mask)
+        else:
+            self.unsat = [known for known in self.unsat if mask & ~known]
+            self.unsat.append(mask)
+
+
+class _MapSolver:
+    """
+    Map of the explored power set for MARCO.
+
+    Subsets of the soft constraints are integer bitmasks (bit i set when soft
+    constraint i is in the subset), so the subset/superset tests against all
+    blocked MUSes and MSSes are word-level ``&``/``|`` operations instead of
+    set comparisons. Python integers are unbounded, so any number of soft
+    constraints is supported.
+
+    Seeds are models of the map formula over one Boolean x_i per soft
+    constraint: every blocked MUS M adds the clause OR(not x_i, i in M) and
+    every blocked MSS S the clause OR(x_i, i not in S). The formula is solved
+    by a small DPLL search (see _solve_map), so finding the next seed is one
+    satisfiability check instead of an exploration of the power set, and the
+    map is exhausted exactly when the formula is unsatisfiable.
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self.full = (1 << n) - 1
+        self.mus_masks: List[int] = []  # MUS sets - no superset explored
+        self.mss_masks: List[int] = []  # MSS sets - no subset explored
+        # Map clauses as (negative literals, positive literals) bitmasks
+        self.clauses: List[Tuple[int, int]] = []
+
+    def block_mus(self, mask: int) -> bool:
+        """Block all supersets of a MUS (or any UNSAT set); return False if it was already blocked."""
+        if mask in self.mus_masks:
+            return False
+        self.mus_masks.append(mask)
+        self.clauses.append((mask, 0))
+        return True
+
+    def block_mss(self, mask: int) -> bool:
+        """Block all subsets of an MSS (or any SAT set); return False if it was already blocked."""
+        if mask in self.mss_masks:
+            return False
+        self.mss_masks.append(mask)
+        self.clauses.append((0, self.full & ~mask))
+        return True
+
+    def is_superset_of_mus(self, mask: int) -> bool:
+        return any(mus & mask == mus for mus in self.mus_masks)
+
+    def is_subset_of_mss(self, mask: int) -> bool:
+        return any(mask & ~mss == 0 for mss in self.mss_masks)
+
+    def next_seed(self, avoid: Optional[Set[int]] = None) -> Optional[int]:
+        """
+        Get next unexplored seed.
+
+        The seed must:
+        1. Not be a superset of any discovered MUS
+        2. Not be a subset of any discovered MSS
+        3. Not be one of the seeds in ``avoid`` (seeds still being processed)
+
+        :param avoid: Bitmasks of the seeds to skip
+        :return: Bitmask of the seed, or None when the map is fully explored
+        """
+        clauses = self.clauses
+        if avoid:
+            # A seed differs from each avoided mask in at least one position
+            clauses = clauses + [(mask, self.full & ~mask) for mask in avoid]
+        seed = _solve_map(self.full, clauses)
+        if seed is None:
+            return None
+        return _maximize_model(self.full, clauses, seed)
+
+
+def _solve_map(full: int, clauses: List[Tuple[int, int]]) -> Optional[int]:
+    """
+    Find a model of a CNF formula given as bitmask clauses, by DPLL search.
+
+    A clause (neg, pos) is satisfied when a variable of ``neg`` is false or a
+    variable of ``pos`` is true. Each decision sets a free variable of an open
+    clause to true first, and variables left undecided once every clause is
+    satisfied are set to true, so seeds start from the top of the lattice.
+
+    :param full: Bitmask of all the variables
+    :param clauses: List of (negative literals, positive literals) bitmasks
+    :return: Bitmask of the true variables of a model, or None if there is none
+    """
+    stack = [(0, 0)]
+    while stack:
+        true, false = stack.pop()
+
+        # Unit propagation, up to a fixpoint or a conflict. A variable is
+        # never both negative and positive in a clause, so the free literals
+        # of a clause are the free bits of neg | pos.
+        while True:
+            conflict = False
+            propagated = False
+            branch = 0  # Free variables of the first open clause
+            free = full & ~(true | false)
+            for neg, pos in clauses:
+                if pos & true or neg & false:
+                    continue  # Satisfied
+                literals = (neg | pos) & free
+                if not literals:
+                    conflict = True
+                    break
+                if not literals & (literals - 1):
+                    # Unit clause: its only free literal is forced
+                    if literals & pos:
+                        true |= literals
+                    else:
+                        false |= literals
+                    free &= ~literals
+                    propagated = True
+                elif not branch:
+                    branch = literals
+            if conflict or not propagated:
+                break
+
+        if conflict:
+            continue
+        if not branch:
+            # Every clause is satisfied: the undecided variables are free
+            return full & ~false
+
+        low = branch & -branch
+        stack.append((true, false | low))
+        stack.append((true | low, false))
+    return None
+
+
+def _maximize_model(full: int, clauses: List[Tuple[int, int]], model: int) -> int:
+    """
+    Turn a model of bitmask clauses into a maximal one.
+
+    False variables are set to true one at a time while every clause stays
+    satisfied. In a maximal seed, adding any constraint makes a superset of
+    a blocked MUS: a SAT seed is then already an MSS, and an UNSAT seed lies
+    as high as possible in the lattice.
+
+    :param full: Bitmask of all the variables
+    :param clauses: List of (negative literals, positive literals) bitmasks
+    :param model: Bitmask of the true variables of a model
+    :return: Bitmask of the true variables of a maximal model above it
+    """
+    remaining = full & ~model
+    while remaining:
+        low = remaining & -remaining
+        remaining ^= low
+        candidate = model | low
+        # Setting a variable to true can only falsify clauses where it is negative
+        if all(pos & candidate or neg & ~candidate for neg, pos in clauses if neg & low):
+            model = candidate
+    return model
+
+
+def _scope(constraint: Any) -> Optional[FrozenSet[str]]:
+    """Names of the variables of a constraint, or None if they cannot be read."""
+    try:
+        return frozenset(x.id for x in get_constraint_variables(constraint)) or None
+    except Exception:
+        return None
+
+
+def _shrink_to_mus(
+    seed_mask: int,
+    var_counts: List[int],
+    is_sat_subset: Callable[[int], bool]
+) -> int:
+    """
+    Shrink an UNSAT seed to a MUS with QuickXplain's divide and conquer.
+
+    A MUS of k constraints among n is found with O(k log(n/k)) checks, most
+    of them on small subsets, instead of the n near-full checks of linear
+    deletion. Constraints over fewer variables are preferred, as deletion
+    removed the ones over more variables first.
+
+    Reference:
+        Junker, U. "Preferred explanations and relaxations for
+        over-constrained problems." AAAI 2004.
+    """
+    def quickxplain(background: int, delta: bool, candidates: List[int]) -> int:
+        # Background alone already UNSAT: no candidate is needed
+        if delta and not is_sat_subset(background):
+            return 0
+        if len(candidates) == 1:
+            return 1 << candidates[0]
+        split = len(candidates) // 2
+        preferred, others = candidates[:split], candidates[split:]
+        needed_others = quickxplain(background | _to_mask(preferred), True, others)
+        needed_preferred = quickxplain(background | needed_others, needed_others != 0, preferred)
+        return needed_preferred | needed_others
+
+    ordered = sorted(_bits(seed_mask), key=var_counts.__getitem__)
+    if not ordered:
+        return 0
+    return quickxplain(0, False, ordered)
+
+
+def _reify(soft: List[Any]) -> Tuple[List[Any], List[Any], List[Any]]:
+    """
+    Declare a 0/1 flag equal to the truth value of each soft constraint.
+
+    :return: (flags, links, definitions) where links[i] is
+             flags[i] <-> soft[i], and definitions define the auxiliary
+             variables of the links (see _auxiliary_definitions)
+    """
+    from pycsp3 import VarArray, iff
+
+    flags = VarArray(size=len(soft), dom=range(2), id=_next_assump_name("reif"))
+    links = [iff(f, c) for f, c in zip(flags, soft, strict=True)]
+    return list(flags), links, _auxiliary_definitions()
+
+
+def _solve_with_model(
+    mask: int,
+    rest: int,
+    soft: List[Any],
+    hard: List[Any],
+    reified: Tuple[List[Any], List[Any], List[Any]],
+    solver: str,
+    verbose: int
+) -> Tuple[bool, Optional[int]]:
+    """
+    Check a subset and find which constraints of rest its solution satisfies.
+
+    The constraints of rest are posted through their (always satisfiable)
+    links to their flags, whose values in the solution tell which hold.
+
+    :return: (is SAT, bitmask of the constraints of rest satisfied by the
+             solution or None)
+    """
+    flags, links, definitions = reified
+    others = list(_bits(rest))
+    subset = [soft[i] for i in _bits(mask)] + [links[j] for j in others]
+    result, values = solve_subset_with_values(
+        subset, hard + definitions, [flags[j] for j in others], solver, verbose
+    )
+    if result != SolveResult.SAT:
+        return False, None
+    assert values is not None, "a SAT check returns the values of the flags"
+    return True, _to_mask(j for j, value in zip(others, values, strict=True) if value == 1)
+
+
+def _grow_to_mss(
+    seed_mask: int,
+    full: int,
+    is_sat_subset: Callable[[int], bool],
+    known_unsat: Optional[Callable[[int], bool]] = None,
+    satisfied: Optional[Callable[[int, int], Optional[int]]] = None
+) -> int:
+    """
+    Grow a SAT seed to an MSS.
+
+    Candidates for which ``known_unsat`` holds (e.g. supersets of a blocked
+    MUS) are skipped without a check; growing a maximal seed then needs none.
+
+    ``satisfied(mask, rest)`` checks a subset and returns the constraints
+    of rest satisfied by the solution found (None if UNSAT): they all join
+    the MSS with the candidate, which saves their own checks. Candidates
+    rejected earlier are not retried, as they stay UNSAT with a larger MSS.
+    """
+    mss = seed_mask
+
+    # Only the constraints outside the seed are candidates
+    for i in _bits(full & ~seed_mask):
+        bit = 1 << i
+        if mss & bit:
+            continue  # Joined with an earlier candidate
+        candidate = mss | bit
+        if known_unsat is not None and known_unsat(candidate):
+            continue
+        if satisfied is not None:
+            # Constraints after i not yet in the MSS
+            rest = full & ~(candidate | ((bit << 1) - 1))
+            found = satisfied(candidate, rest)
+            if found is not None:
+                mss = candidate | found
+        elif is_sat_subset(candidate):
+            mss = candidate
+
+    return mss
+
+
+class _Checker:
+    """
+    Satisfiability checks of subsets of the soft constraints, for one run.
+
+    ACE runs once per check through its command line, so no solver process
+    outlives a check. The checker instead keeps what all the checks of a run
+    share: the verdict memo, the variable counts ordering the shrinks and
+    the flags reading solutions back. Forked workers inherit a copy.
+    """
+
+    def __init__(
+        self,
+        soft: List[Any],
+        hard: List[Any],
+        solver: str,
+        verbose: int,
+        use_cores: bool,
+        use_models: bool
+    ):
+        self.soft = soft
+        self.hard = hard
+        self.solver = solver
+        self.verbose = verbose
+        self.use_cores = use_cores
+        self.full = (1 << len(soft)) - 1
+        # Scopes match core constraints, and their sizes order every shrink
+        self.scopes = [_scope(c) for c in soft]
+        self.hard_scopes = {_scope(c) for c in hard}
+        self.var_counts = [len(scope) if scope else 0 for scope in self.scopes]
+        # Shrink and grow test overlapping subsets, so many checks are
+        # answered without the solver
+        self.verdicts = _Verdicts()
+        # Cores matched by scope and not yet confirmed UNSAT, mapped to the
+        # UNSAT subset each came from (see confirm)
+        self.unconfirmed: Dict[int, int] = {}
+        self.use_models = use_models
+        # Flags are only declared once a grow reads a solution back
+        self.reified: Optional[Tuple[List[Any], List[Any], List[Any]]] = None
+
+    def check(self, mask: int) -> bool:
+        """Check if the subset of soft constraints is SAT."""
+        sat = self.verdicts.get(mask)
+        if sat is None:
+            sat = is_sat([self.soft[i] for i in _bits(mask)], self.hard, self.solver, self.verbose)
+            self.verdicts.record(mask, sat)
+        return sat
+
+    def satisfied(self, mask: int, rest: int) -> Optional[int]:
+        """Constraints of rest satisfied by a solution of the subset, None if UNSAT."""
+        if self.verdicts.get(mask) is False:
+            return None
+        reified = self.reified
+        if reified is None:
+            reified = self.reified = _reify(self.soft)
+        sat, satisfied = _solve_with_model(
+            mask, rest, self.soft, self.hard, reified, self.solver, self.verbose
+        )
+        self.verdicts.record(mask, sat)
+        return satisfied
+
+    def classify(self, mask: int) -> Tuple[bool, int]:
+        """
+        Check a seed: (True, mask) if it is SAT, else (False, an UNSAT subset
+        of it to shrink, its core when one was extracted).
+
+        A core takes a check of its own to be confirmed (see confirm), which
+        pays off on the full set of soft constraints, the first seed: it is
+        the set being explained, so it is usually UNSAT, and its core prunes
+        the most. Later seeds, smaller and often SAT, get a plain check.
+        """
+        core = self.unsat_core(mask) if mask == self.full else None
+        if core is not None:
+            return False, core
+        return self.check(mask), mask
+
+    def unsat_core(self, mask: int) -> Optional[int]:
+        """
+        Core of an UNSAT subset, or None if cores are not used, the verdict of
+        the subset is already known, or it is SAT. The verdict of the subset
+        is recorded; a core is only recorded as UNSAT once confirm checks it.
+        """
+        if not self.use_cores or self.verdicts.get(mask) is not None:
+            return None
+        result, core_line = _solve_with_core_line(
+            [self.soft[i] for i in _bits(mask)], self.hard, self.solver, self.verbose
+        )
+        # ACE's extraction mode reports UNKNOWN for a SAT subset, as it
+        # finds no core in it
+        if result == SolveResult.UNKNOWN:
+            self.verdicts.record(mask, True)
+        if result != SolveResult.UNSAT:
+            return None
+        self.verdicts.record(mask, False)
+        core = self._core_mask(mask, _parse_core_scopes(core_line))
+        if core != mask:
+            self.unconfirmed[core] = mask
+        return core
+
+    def confirm(self, mask: int) -> int:
+        """
+        An UNSAT subset to use in place of mask: mask itself, unless it is an
+        unconfirmed core that a check finds SAT, then the subset it came from.
+
+        A core is only recorded as UNSAT once a check confirms it; after a
+        shrink of the core, the memo usually holds that verdict already.
+        """
+        seed = self.unconfirmed.pop(mask, None)
+        if seed is not None and self.check(mask):
+            return seed
+        return mask
+
+    def _core_mask(self, mask: int, core_scopes: List[FrozenSet[str]]) -> int:
+        """
+        Constraints of an UNSAT subset that may be in the core ACE reported.
+
+        ACE numbers the constraints it keeps when loading the model (entailed
+        ones are dropped), so core constraints are matched by scope rather
+        than by position: the subset constraints over the scope of a core
+        constraint form a superset of the core, hence an UNSAT set. If some
+        core scope matches no constraint (ACE reformulated it), the whole
+        subset is kept.
+        """
+        if not core_scopes:
+            return mask
+        wanted = set(core_scopes)
+        core = 0
+        for i in _bits(mask):
+            if self.scopes[i] is None or self.scopes[i] in wanted:
+                core |= 1 << i
+        matched = {self.scopes[i] for i in _bits(core)} | self.hard_scopes
+        if not wanted <= matched:
+            return mask
+        return core
+
+    def shrink(self, mask: int) -> int:
+        """Shrink an UNSAT subset to a MUS with QuickXplain."""
+        mus = _shrink_to_mus(mask, self.var_counts, self.check)
+        seed = self.confirm(mask)
+        if seed != mask:
+            return self.shrink(seed)
+        return mus
+
+    def grow(self, mask: int, known_unsat: Optional[Callable[[int], bool]] = None) -> int:
+        """Grow a SAT subset to an MSS."""
+        return _grow_to_mss(
+            mask, self.full, self.check, known_unsat,
+            satisfied=self.satisfied if self.use_models else None,
+        )
+
+    def close(self) -> None:
+        """Remove the flags declared by the run from the caller's model."""
+        if self.reified is not None:
+            _discard_variables(self.reified[0])
+            self.reified = None
+
+
+def _unsat_core(soft: List[Any], hard: List[Any], solver: str, verbose: int) -> Optional[List[Any]]:
+    """Soft constraints of the core ACE reports for soft + hard, or None if it reports none."""
+    checker = _Checker(soft, hard, solver, verbose, use_cores=True, use_models=False)
+    core = checker.unsat_core(checker.full)
+    if core is None:
+        return None
+    return [soft[i] for i in _bits(core)]
@@ -10,20 +10,15 @@ Based on:
     Constraints 21 (2016): 223-250.
 """
 
-from typing import List, Any, Optional, Iterator, Tuple, Literal, Set
-
-from pycsp3_explain.explain.utils import (
-    flatten_constraints,
-    make_assump_model,
-    get_constraint_variables,
-)
-from pycsp3_explain.solvers.wrapper import (
-    SolveResult,
-    is_sat,
-    is_unsat,
-    solve_subset,
-    solve_subset_with_core,
-)
+from itertools import islice
+from typing import List, Any, Optional, Iterator, Tuple, Literal, Dict, TYPE_CHECKING
+
+from pycsp3_explain.explain._oracle import _Checker, _MapSolver, _bits
+from pycsp3_explain.explain.utils import flatten_constraints
+from pycsp3_explain.solvers.wrapper import _fork_executor
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ProcessPoolExecutor
 
 
 def marco(
@@ -32,7 +27,10 @@ def marco(
     solver: str = "ace",
     return_mus: bool = True,
     return_mcs: bool = True,
-    verbose: int = -1
+    verbose: int = -1,
+    n_workers: int = 1,
+    mode: Literal["both", "mus_only", "mcs_only"] = "both",
+    as_indices: bool = False
 ) -> Iterator[Tuple[Literal["MUS", "MCS"], List[Any]]]:
     """
     Enumerate all MUSes and MCSes using the MARCO algorithm.
@@ -52,12 +50,30 @@ def marco(
     - No superset of a discovered MUS is generated as a seed
     - No subset of a discovered MCS is generated as a seed
 
+    When only one kind of result is needed, ``mode`` skips the work spent on
+    the other: with "mus_only", a SAT seed is not grown but only its subsets
+    are blocked (no MUS lies below a SAT set); with "mcs_only", an UNSAT seed
+    is not shrunk but only its supersets are blocked (no MSS lies above an
+    UNSAT set). Each such seed then costs one check instead of one per
+    constraint.
+
+    With ACE, the first seed (all the soft constraints) is checked with core
+    extraction and shrunk from its core, usually much smaller than the seed.
+    Use marco_naive to check seeds without core extraction.
+
     :param soft: List of soft constraints to enumerate MUSes/MCSes of
     :param hard: List of hard constraints (always included, not in MUS/MCS)
     :param solver: Solver name ("ace" for best performance)
     :param return_mus: Whether to yield MUSes (default True)
     :param return_mcs: Whether to yield MCSes (default True)
     :param verbose: Verbosity level (-1 for silent)
+    :param n_workers: Number of worker processes shrinking/growing seeds in
+                      parallel (default 1, i.e. serial). With more than one
+                      worker the order of the results is not deterministic.
+    :param mode: "both" (default), "mus_only" (no MCS is yielded) or
+                 "mcs_only" (no MUS is yielded)
+    :param as_indices: Yield the sorted indices of the constraints in soft
+                       instead of the constraints themselves (default False)
     :yields: Tuples of ("MUS", subset) or ("MCS", subset)
 
     Example:
@@ -67,8 +83,13 @@ def marco(
         ...     else:
         ...         print(f"Found MCS with {len(subset)} constraints")
     """
-    # Delegate to naive implementation for now
-    yield from marco_naive(soft, hard, solver, return_mus, return_mcs, verbose)
+    soft = flatten_constraints(soft)
+    hard = flatten_constraints(hard) if hard else []
+    for result_type, mask in _marco_masks(
+        soft, hard, solver, return_mus, return_mcs, verbose, n_workers, mode,
+        use_cores=solver.lower() == "ace", use_models=True,
+    ):
+        yield result_type, _subset(soft, mask, as_indices)
 
 
 def marco_naive(
@@ -77,7 +98,10 @@ def marco_naive(
     solver: str = "ace",
     return_mus: bool = True,
     return_mcs: bool = True,
-    verbose: int = -1
+    verbose: int = -1,
+    n_workers: int = 1,
+    mode: Literal["both", "mus_only", "mcs_only"] = "both",
+    as_indices: bool = False
 ) -> Iterator[Tuple[Literal["MUS", "MCS"], List[Any]]]:
     """
     Naive MARCO implementation without assumption variables.
@@ -91,163 +115,318 @@ def marco_naive(
     :param return_mus: Whether to yield MUSes
     :param return_mcs: Whether to yield MCSes
     :param verbose: Verbosity level
+    :param n_workers: Number of worker processes (1 for serial enumeration)
+    :param mode: "both", "mus_only" or "mcs_only" (see marco)
+    :param as_indices: Yield indices instead of constraints (see marco)
     :yields: Tuples of ("MUS", subset) or ("MCS", subset)
     """
     soft = flatten_constraints(soft)
     hard = flatten_constraints(hard) if hard else []
+    for result_type, mask in _marco_masks(
+        soft, hard, solver, return_mus, return_mcs, verbose, n_workers, mode,
+        use_cores=False, use_models=False,
+    ):
+        yield result_type, _subset(soft, mask, as_indices)
+
+
+def _marco_masks(
+    soft: List[Any],
+    hard: List[Any],
+    solver: str,
+    return_mus: bool,
+    return_mcs: bool,
+    verbose: int,
+    n_workers: int,
+    mode: str,
+    use_cores: bool,
+    use_models: bool
+) -> Iterator[Tuple[Literal["MUS", "MCS"], int]]:
+    """
+    MARCO enumeration shared by marco and marco_naive, on flattened soft
+    and hard constraints. Results are yielded as bitmasks over soft, so a
+    caller stopping early never builds the lists of the results it skips.
+
+    With ``use_cores``, the first seed (all the soft constraints) is checked
+    with ACE's core extraction: it is shrunk from its core rather than from
+    the whole seed, and the core (a smaller UNSAT set) is what gets blocked
+    when no MUS is needed.
+
+    With ``use_models``, each SAT check made while growing an MSS reads back
+    its solution, and every constraint the solution satisfies joins the MSS
+    at once.
+    """
+    if mode not in _MODES:
+        raise ValueError(f"mode must be one of {', '.join(_MODES)}, got {mode!r}")
 
     if not soft:
         return
 
     n = len(soft)
+    checker = _Checker(soft, hard, solver, verbose, use_cores, use_models)
+    map_solver = _MapSolver(n)
+
+    try:
+        executor = _make_executor(n_workers, checker, mode)
+        if executor is not None:
+            yield from _marco_parallel_loop(
+                executor, n_workers, map_solver, return_mus, return_mcs, verbose
+            )
+            return
+
+        # Main MARCO loop: each seed blocks at least itself in the map, so the
+        # map solver runs out of seeds after finitely many iterations
+        iteration = 0
+
+        while True:
+            iteration += 1
+
+            seed_mask = map_solver.next_seed()
+            if seed_mask is None:
+                break  # No more seeds, enumeration complete
+
+            if verbose >= 0:
+                print(f"MARCO: iteration {iteration}, seed size {seed_mask.bit_count()}")
+
+            sat, seed_mask = checker.classify(seed_mask)
+            if sat:
+                if mode == "mus_only":
+                    # No MUS below a SAT seed; blocking it is enough
+                    map_solver.block_mss(seed_mask)
+                    continue
+
+                # SAT: grow to MSS (supersets of known MUSes are UNSAT)
+                mss_mask = checker.grow(seed_mask, known_unsat=map_solver.is_superset_of_mus)
+                map_solver.block_mss(mss_mask)
+
+                # MCS = complement of MSS
+                mcs_mask = map_solver.full & ~mss_mask
+
+                if return_mcs and mcs_mask:
+                    yield ("MCS", mcs_mask)
+
+            else:
+                if mode == "mcs_only":
+                    # No MSS above an UNSAT seed; blocking it is enough
+                    map_solver.block_mus(checker.confirm(seed_mask))
+                    continue
+
+                # UNSAT: shrink to MUS
+                mus_mask = checker.shrink(seed_mask)
+                map_solver.block_mus(mus_mask)
+
+                if return_mus and mus_mask:
+                    yield ("MUS", mus_mask)
+    finally:
+        checker.close()
+
 
-    def is_sat_subset(indices: Set[int]) -> bool:
-        """Check if the subset of soft constraints is SAT."""
-        subset = [soft[i] for i in indices]
-        return is_sat(subset, hard, solver, verbose)
-
-    # State for map solver simulation
-    blocked_mus_sets: List[Set[int]] = []  # MUS sets - no superset explored
-    blocked_mss_sets: List[Set[int]] = []  # MSS sets - no subset explored
-
-    def get_next_seed() -> Optional[Set[int]]:
-        """
-        Get next unexplored seed.
-        
-        The seed must:
-        1. Not be a superset of any discovered MUS
-        2. Not be a subset of any discovered MSS
-        """
-        all_indices = set(range(n))
-        
-        # Start with all constraints and try to find a valid seed
-        # Use a simple exploration: try all subsets in a smart order
-        
-        # Try the full set first if not blocked
-        if not any(mus_set <= all_indices for mus_set in blocked_mus_sets):
-            if not any(all_indices <= mss_set for mss_set in blocked_mss_sets):
-                return all_indices
-        
-        # Binary search for a valid seed
-        # The idea: find a set that is not blocked by any MUS or MSS
-        
-        # Build candidate sets by removing elements from blocked MUSes
-        # or adding elements to blocked MSSes
-        
-        from itertools import combinations
-        
-        # Strategy: iterate through all possible subsets efficiently
-        # by avoiding blocked regions
-        
-        explored: Set[frozenset] = set()
-        
-        # DFS to find unexplored seeds
-        def find_unexplored(current: Set[int]) -> Optional[Set[int]]:
-            key = frozenset(current)
-            if key in explored:
-                return None
-            explored.add(key)
-            
-            # Check if current is blocked
-            is_superset_of_mus = any(mus_set <= current for mus_set in blocked_mus_sets)
-            is_subset_of_mss = any(current <= mss_set for mss_set in blocked_mss_sets)
-            
-            if not is_superset_of_mus and not is_subset_of_mss:
-                return current
-            
-            # If blocked by MUS, try removing elements
-            if is_superset_of_mus:
-                for i in current:
-                    smaller = current - {i}
-                    if smaller:
-                        result = find_unexplored(smaller)
-                        if result is not None:
-                            return result
-            
-            return None
-        
-        # Try starting from all indices
-        result = find_unexplored(all_indices)
-        if result is not None:
-            return result
-        
-        # If that didn't work, try bottom-up from blocked MSSes
-        for mss_set in blocked_mss_sets:
-            remaining = all_indices - mss_set
-            for i in remaining:
-                new_set = mss_set | {i}
-                if frozenset(new_set) not in explored:
-                    if not any(mus_set <= new_set for mus_set in blocked_mus_sets):
-                        return new_set
-        
+_MODES = ("both", "mus_only", "mcs_only")
+
+
+def _subset(soft: List[Any], mask: int, as_indices: bool = False) -> List[Any]:
+    """The soft constraints of a bitmask (or their indices), in order."""
+    if as_indices:
+        return list(_bits(mask))
+    return [soft[i] for i in _bits(mask)]
+
+
+# Per-process state of the MARCO workers, set by _init_worker
+_WORKER_STATE: Optional[Tuple[_Checker, str, List[int]]] = None
+
+
+def _init_worker(checker: _Checker, mode: str) -> None:
+    global _WORKER_STATE
+    # Numbers of the blocked MUSes and MSSes already learned by this worker
+    _WORKER_STATE = (checker, mode, [0, 0])
+
+
+def _explore_seed(seed_mask: int, mus_masks: Tuple[int, ...], mss_masks: Tuple[int, ...]) -> Tuple[str, int]:
+    """
+    Worker task: classify a seed and shrink it to a MUS or grow it to an MSS.
+
+    In "mus_only" and "mcs_only" modes, a seed that needs no shrinking or
+    growing is returned as is, classified "SAT" or "UNSAT".
+
+    The MUSes and MSSes blocked so far, found by any worker, come with the
+    seed and join the worker's verdicts: checks of their supersets and
+    subsets are then answered without the solver.
+
+    :param seed_mask: Bitmask of the soft constraints in the seed
+    :param mus_masks: Bitmasks of the MUSes (UNSAT sets) blocked in the map
+    :param mss_masks: Bitmasks of the MSSes (SAT sets) blocked in the map
+    :return: ("MUS", mask), ("MSS", mask), ("SAT", seed) or ("UNSAT", seed)
+    """
+    assert _WORKER_STATE is not None, "_explore_seed runs in workers set up by _init_worker"
+    checker, mode, seen = _WORKER_STATE
+
+    # The map only appends, so the masks past those already seen are new
+    for mask in mus_masks[seen[0]:]:
+        checker.verdicts.record(mask, False)
+    for mask in mss_masks[seen[1]:]:
+        checker.verdicts.record(mask, True)
+    seen[:] = [len(mus_masks), len(mss_masks)]
+
+    sat, seed_mask = checker.classify(seed_mask)
+    if sat:
+        if mode == "mus_only":
+            return "SAT", seed_mask
+        return "MSS", checker.grow(seed_mask)
+    if mode == "mcs_only":
+        return "UNSAT", checker.confirm(seed_mask)
+    return "MUS", checker.shrink(seed_mask)
+
+
+def _make_executor(
+    n_workers: int,
+    checker: _Checker,
+    mode: str = "both"
+) -> Optional["ProcessPoolExecutor"]:
+    """
+    Create the worker pool for parallel MARCO, or None to run serially.
+
+    PyCSP3 keeps the model in global state, so workers are forked: each one
+    inherits the constraint objects (and a copy of the checker) and only seed
+    bitmasks cross process boundaries. Platforms without ``fork`` fall back to serial enumeration.
+    """
+    if n_workers <= 1:
         return None
+    import multiprocessing
 
-    def shrink_to_mus(seed_indices: Set[int]) -> Set[int]:
-        """Shrink an UNSAT seed to a MUS using deletion."""
-        mus = set(seed_indices)
-        
-        # Sort by number of variables (more vars first -> remove first)
-        def num_vars(i: int) -> int:
-            try:
-                return len(get_constraint_variables(soft[i]))
-            except Exception:
-                return 0
-        
-        ordered = sorted(mus, key=num_vars, reverse=True)
-        
-        for idx in ordered:
-            if idx not in mus:
-                continue
-            mus.remove(idx)
-            if not mus or is_sat_subset(mus):
-                mus.add(idx)
-        
-        return mus
-
-    def grow_to_mss(seed_indices: Set[int]) -> Set[int]:
-        """Grow a SAT seed to an MSS."""
-        mss = set(seed_indices)
-        
-        for i in range(n):
-            if i in mss:
-                continue
-            if is_sat_subset(mss | {i}):
-                mss.add(i)
-        
-        return mss
-
-    # Main MARCO loop
-    iteration = 0
-    max_iterations = 1000  # Safety limit
-    
-    while iteration < max_iterations:
-        iteration += 1
-        
-        seed_set = get_next_seed()
-        if seed_set is None:
-            break  # No more seeds, enumeration complete
-
-        if verbose >= 0:
-            print(f"MARCO: iteration {iteration}, seed size {len(seed_set)}")
-
-        if is_sat_subset(seed_set):
-            # SAT: grow to MSS
-            mss_set = grow_to_mss(seed_set)
-            blocked_mss_sets.append(mss_set)
-            
-            # MCS = complement of MSS
-            mcs_set = set(range(n)) - mss_set
-            
-            if return_mcs and mcs_set:
-                yield ("MCS", [soft[i] for i in sorted(mcs_set)])
-
-        else:
-            # UNSAT: shrink to MUS
-            mus_set = shrink_to_mus(seed_set)
-            blocked_mus_sets.append(mus_set)
-            
-            if return_mus and mus_set:
-                yield ("MUS", [soft[i] for i in sorted(mus_set)])
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    return _fork_executor(n_workers, _init_worker, (checker, mode))
+
+
+def _marco_parallel_loop(
+    executor: "ProcessPoolExecutor",
+    n_workers: int,
+    map_solver: _MapSolver,
+    return_mus: bool,
+    return_mcs: bool,
+    verbose: int
+) -> Iterator[Tuple[Literal["MUS", "MCS"], int]]:
+    """
+    MARCO main loop dispatching seeds to a pool of workers.
+
+    The map (blocked MUS/MSS sets) stays in this process: up to ``n_workers``
+    distinct seeds are in flight at once, and each result is blocked as soon as
+    it comes back. Each seed is sent with the MUSes and MSSes blocked so far,
+    so every worker knows what the others found. Two seeds may lead to the
+    same MUS/MSS; duplicates are blocked once and reported once.
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    pending: Dict["Future[Tuple[str, int]]", int] = {}
+
+    try:
+        while True:
+            while len(pending) < n_workers:
+                seed_mask = map_solver.next_seed(avoid=set(pending.values()))
+                if seed_mask is None:
+                    break
+                if verbose >= 0:
+                    print(f"MARCO: dispatching seed of size {seed_mask.bit_count()}")
+                future = executor.submit(
+                    _explore_seed, seed_mask, tuple(map_solver.mus_masks), tuple(map_solver.mss_masks)
+                )
+                pending[future] = seed_mask
+
+            if not pending:
+                break  # No more seeds and nothing in flight, enumeration complete
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                del pending[future]
+                kind, subset = future.result()
+                if kind == "SAT":
+                    map_solver.block_mss(subset)
+                elif kind == "UNSAT":
+                    map_solver.block_mus(subset)
+                elif kind == "MSS":
+                    if not map_solver.block_mss(subset):
+                        continue
+                    mcs_mask = map_solver.full & ~subset
+                    if return_mcs and mcs_mask:
+                        yield ("MCS", mcs_mask)
+                else:
+                    if not map_solver.block_mus(subset):
+                        continue
+                    if return_mus and subset:
+                        yield ("MUS", subset)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_mus(
+    soft: List[Any],
+    hard: Optional[List[Any]] = None,
+    solver: str = "ace",
+    max_mus: Optional[int] = None,
+    verbose: int = -1,
+    as_indices: bool = False
+) -> Iterator[List[Any]]:
+    """
+    Iterate over the MUSes found by the MARCO algorithm.
+
+    MUSes are yielded as soon as MARCO finds them, so they can be processed
+    without holding all of them in memory. Enumeration (and solving) stops
+    as soon as max_mus MUSes have been yielded, or when the caller stops
+    iterating.
+
+    :param soft: List of soft constraints
+    :param hard: List of hard constraints
+    :param solver: Solver name
+    :param max_mus: Maximum number of MUSes to find (None for all)
+    :param verbose: Verbosity level
+    :param as_indices: Yield indices instead of constraints (see marco)
+    :yields: MUSes, as lists of soft constraints (or of their indices)
+    """
+    if max_mus is not None and max_mus <= 0:
+        return
+    soft = flatten_constraints(soft)
+    hard = flatten_constraints(hard) if hard else []
+    results = _marco_masks(
+        soft, hard, solver, True, False, verbose, 1, "mus_only",
+        use_cores=solver.lower() == "ace", use_models=True,
+    )
+    for _, mask in islice(results, max_mus):
+        yield _subset(soft, mask, as_indices)
+
+
+def iter_mcs(
+    soft: List[Any],
+    hard: Optional[List[Any]] = None,
+    solver: str = "ace",
+    max_mcs: Optional[int] = None,
+    verbose: int = -1,
+    as_indices: bool = False
+) -> Iterator[List[Any]]:
+    """
+    Iterate over the MCSes found by the MARCO algorithm.
+
+    MCSes are yielded as soon as MARCO finds them, so they can be processed
+    without holding all of them in memory. Enumeration (and solving) stops
+    as soon as max_mcs MCSes have been yielded, or when the caller stops
+    iterating.
+
+    :param soft: List of soft constraints
+    :param hard: List of hard constraints
+    :param solver: Solver name
+    :param max_mcs: Maximum number of MCSes to find (None for all)
+    :param verbose: Verbosity level
+    :param as_indices: Yield indices instead of constraints (see marco)
+    :yields: MCSes, as lists of soft constraints (or of their indices)
+    """
+    if max_mcs is not None and max_mcs <= 0:
+        return
+    soft = flatten_constraints(soft)
+    hard = flatten_constraints(hard) if hard else []
+    results = _marco_masks(
+        soft, hard, solver, False, True, verbose, 1, "mcs_only",
+        use_cores=solver.lower() == "ace", use_models=True,
+    )
+    for _, mask in islice(results, max_mcs):
+        yield _subset(soft, mask, as_indices)
 
 
 def all_mus(
@@ -255,27 +434,24 @@ def all_mus(
     hard: Optional[List[Any]] = None,
     solver: str = "ace",
     max_mus: Optional[int] = None,
-    verbose: int = -1
+    verbose: int = -1,
+    as_indices: bool = False
 ) -> List[List[Any]]:
     """
     Find all MUSes using the MARCO algorithm.
 
-    This is a convenience function that collects all MUSes from MARCO.
+    This is a convenience function that collects the MUSes of iter_mus.
+    Enumeration (and solving) stops as soon as max_mus MUSes have been found.
 
     :param soft: List of soft constraints
     :param hard: List of hard constraints
     :param solver: Solver name
     :param max_mus: Maximum number of MUSes to find (None for all)
     :param verbose: Verbosity level
+    :param as_indices: Return indices instead of constraints (see marco)
     :return: List of all found MUSes
     """
-    muses = []
-    for result_type, subset in marco(soft, hard, solver, return_mus=True, return_mcs=False, verbose=verbose):
-        if result_type == "MUS":
-            muses.append(subset)
-            if max_mus is not None and len(muses) >= max_mus:
-                break
-    return muses
+    return list(iter_mus(soft, hard, solver, max_mus, verbose, as_indices))
 
 
 def all_mcs(
@@ -283,24 +459,51 @@ def all_mcs(
     hard: Optional[List[Any]] = None,
     solver: str = "ace",
     max_mcs: Optional[int] = None,
-    verbose: int = -1
+    verbose: int = -1,
+    as_indices: bool = False
 ) -> List[List[Any]]:
     """
     Find all MCSes using the MARCO algorithm.
 
-    This is a convenience function that collects all MCSes from MARCO.
+    This is a convenience function that collects the MCSes of iter_mcs.
+    Enumeration (and solving) stops as soon as max_mcs MCSes have been found.
 
     :param soft: List of soft constraints
     :param hard: List of hard constraints
     :param solver: Solver name
     :param max_mcs: Maximum number of MCSes to find (None for all)
     :param verbose: Verbosity level
+    :param as_indices: Return indices instead of constraints (see marco)
     :return: List of all found MCSes
     """
-    mcses = []
-    for result_type, subset in marco(soft, hard, solver, return_mus=False, return_mcs=True, verbose=verbose):
-        if result_type == "MCS":
-            mcses.append(subset)
-            if max_mcs is not None and len(mcses) >= max_mcs:
-                break
-    return mcses
+    return list(iter_mcs(soft, hard, solver, max_mcs, verbose, as_indices))
+
+
+def all_mus_and_mcs(
+    soft: List[Any],
+    hard: Optional[List[Any]] = None,
+    solver: str = "ace",
+    verbose: int = -1,
+    n_workers: int = 1,
+    as_indices: bool = False
+) -> Tuple[List[List[Any]], List[List[Any]]]:
+    """
+    Find all MUSes and all MCSes in a single MARCO enumeration.
+
+    MARCO finds both kinds of results in the same pass, so this costs one
+    enumeration instead of the two made by calling all_mus and all_mcs.
+
+    :param soft: List of soft constraints
+    :param hard: List of hard constraints
+    :param solver: Solver name
+    :param verbose: Verbosity level
+    :param n_workers: Number of worker processes (see marco)
+    :param as_indices: Return indices instead of constraints (see marco)
+    :return: Tuple (muses, mcses)
+    """
+    muses: List[List[Any]] = []
+    mcses: List[List[Any]] = []
+    results = marco(soft, hard, solver, verbose=verbose, n_workers=n_workers, as_indices=as_indices)
+    for result_type, subset in results:
+        (muses if result_type == "MUS" else mcses).append(subset)
+    return muses, mcses
@@ -4,8 +4,8 @@ MSS (Maximal Satisfiable Subset) algorithms for PyCSP3.
 This module provides implementations of:
 - mss_naive: Greedy growing MSS using naive re-solving
 - mss: Assumption-based MSS using incremental solving
-- mss_opt: Weighted MSS optimization
-- mcs_opt: Weighted MCS optimization
+- mss_opt: Weighted MSS, keeping heavier constraints first
+- mcs_opt: Weighted MCS, removing lighter constraints first
 
 An MSS is a maximal subset of constraints that is satisfiable:
 - The subset itself is SAT
@@ -14,28 +14,42 @@ An MSS is a maximal subset of constraints that is satisfiable:
 Note: MCS (Minimal Correction Set) = Soft \\ MSS
 """
 
-from typing import List, Any, Optional, Union
+from typing import List, Any, Optional, Union, Dict, Set
 
+from pycsp3_explain.explain._oracle import _Checker, _bits
 from pycsp3_explain.explain.utils import (
     flatten_constraints,
     order_by_num_variables,
     make_assump_model,
-    get_constraint_variables,
+    _constraint_key,
+    _num_variables,
+    _discard_variables,
+    _entailed_by_domain,
+    _partition_by_variables,
+    SelectorModel,
 )
 from pycsp3_explain.solvers.wrapper import (
     SolveResult,
+    Session,
+    _memoized,
+    current_session,
     is_sat,
     is_unsat,
+    session_scope,
     solve_subset,
-    solve_subset_with_core,
+    solve_subsets,
+    find_subset,
 )
 
 
+@_memoized
 def mss_naive(
     soft: List[Any],
     hard: Optional[List[Any]] = None,
     solver: str = "ace",
-    verbose: int = -1
+    verbose: int = -1,
+    assume_unsat: bool = False,
+    n_workers: int = 1
 ) -> List[Any]:
     """
     Compute a Maximal Satisfiable Subset using greedy growing algorithm.
@@ -51,10 +65,23 @@ def mss_naive(
        - If UNSAT: skip c (it conflicts with current MSS)
     3. Return the MSS
 
+    When the constraints split into groups sharing no variable, each group
+    is grown on its own, and a satisfiable group needs a single check.
+
+    With n_workers > 1, the next n_workers candidates are checked at once
+    in forked worker processes (see find_subset). The first SAT one joins
+    the MSS; an UNSAT one stays UNSAT with any larger MSS and is skipped, so
+    only the SAT ones after it are checked again, and the MSS is the one
+    the serial loop would grow.
+
     :param soft: List of soft constraints (candidates for MSS)
     :param hard: List of hard constraints (always included, not in MSS)
     :param solver: Solver name ("ace" or "choco")
     :param verbose: Verbosity level (-1 for silent)
+    :param assume_unsat: Skip the satisfiability check of soft + hard, for
+                         callers that already know they are UNSAT
+    :param n_workers: Number of worker processes checking candidates
+                      (1 to check them one at a time)
     :return: A maximal satisfiable subset of soft constraints
     """
     # Flatten and validate input
@@ -65,56 +92,87 @@ def mss_naive(
         return []
 
     # If all soft + hard is SAT, return all soft constraints
-    if is_sat(soft, hard, solver, verbose):
+    if not assume_unsat and is_sat(soft, hard, solver, verbose):
         return soft
 
+    # Groups sharing no variable have independent MSSes, whose union is an
+    # MSS; a SAT group is then kept whole after a single check
+    groups = _partition_by_variables(soft, hard)
+    if len(groups) > 1:
+        kept: Set[int] = set()
+        for soft_indices, hard_indices in groups:
+            group_mss = mss_naive(
+                [soft[i] for i in soft_indices], [hard[j] for j in hard_indices], solver, verbose,
+                n_workers=n_workers,
+            )
+            kept.update(map(id, group_mss))
+        return [c for c in soft if id(c) in kept]
+
     # Order constraints: try adding constraints with fewer variables first
     # (they are less likely to cause conflicts)
     candidates = order_by_num_variables(soft, descending=False)
 
     mss = []  # constraints confirmed to be in the MSS
+    pending = candidates
 
-    for i, c in enumerate(candidates):
+    while pending:
+        window = pending[:max(n_workers, 1)]
         if verbose >= 0:
-            print(f"MSS: testing constraint {i + 1}/{len(candidates)}, "
+            print(f"MSS: testing {len(window)} of {len(pending)} remaining constraints, "
                   f"current MSS size: {len(mss)}")
 
-        # Try adding constraint c to current MSS
-        if is_sat(mss + [c], hard, solver, verbose):
-            # Adding c keeps it SAT, so include c in MSS
-            mss.append(c)
-            if verbose >= 0:
-                print(f"  -> constraint added to MSS")
-        else:
-            # Adding c makes it UNSAT, skip it
-            if verbose >= 0:
-                print(f"  -> constraint conflicts, skipping")
+        # Try adding each constraint of the window to the current MSS
+        results = solve_subsets([mss + [c] for c in window], hard, solver, verbose, n_workers)
+        added = False
+        recheck = []
+        for c, result in zip(window, results, strict=True):
+            if result != SolveResult.SAT:
+                # Adding c makes it UNSAT, skip it
+                if verbose >= 0:
+                    print(f"  -> constraint conflicts, skipping")
+            elif not added:
+                # Adding c keeps it SAT, so include c in MSS
+                mss.append(c)
+                added = True
+                if verbose >= 0:
+                    print(f"  -> constraint added to MSS")
+            else:
+                # SAT without the constraint just added: check again with it
+                recheck.append(c)
+        pending = recheck + pending[len(window):]
 
     return mss
 
 
+@_memoized
 def mss(
     soft: List[Any],
     hard: Optional[List[Any]] = None,
     solver: str = "ace",
-    verbose: int = -1
+    verbose: int = -1,
+    assume_unsat: bool = False
 ) -> List[Any]:
     """
     Compute a Maximal Satisfiable Subset using assumption indicators.
 
-    This implementation uses assumptions for incremental solving,
-    leveraging core extraction to identify conflicts efficiently.
+    The soft constraints are posted once behind indicator literals
+    (a_i -> c_i), and each candidate subset is checked by assuming the
+    indicators of its constraints, so the guarded model is built once
+    instead of for every check. Candidates are added in growing batches,
+    so constraints that fit together share their checks.
 
-    :param soft: List of soft constraints (candidates for MSS)
+    :param soft: List of soft constraints (candidates for MSS), or a
+                 SelectorModel from post_with_selectors (hard is then ignored)
     :param hard: List of hard constraints (always included, not in MSS)
-    :param solver: Solver name ("ace" only for core extraction)
+    :param solver: Solver name ("ace" or "choco")
     :param verbose: Verbosity level (-1 for silent)
+    :param assume_unsat: Skip the satisfiability check of soft + hard, for
+                         callers that already know they are UNSAT
     :return: A maximal satisfiable subset of soft constraints
     """
-    if solver.lower() != "ace":
-        if verbose >= 0:
-            print("mss: solver does not support core extraction, using mss_naive")
-        return mss_naive(soft, hard, solver, verbose)
+    selector_model = soft if isinstance(soft, SelectorModel) else None
+    if selector_model is not None:
+        soft, hard = selector_model.soft, selector_model.hard
 
     soft = flatten_constraints(soft)
     hard = flatten_constraints(hard) if hard else []
@@ -122,86 +180,61 @@ def mss(
     if not soft:
         return []
 
-    soft, hard, assumptions, guard_constraints = make_assump_model(soft, hard)
-
-    def solve_with_assumptions(assumed_indices: List[int]):
-        assumption_constraints = [assumptions[i] == 1 for i in assumed_indices]
-        soft_constraints = guard_constraints + assumption_constraints
-        return solve_subset_with_core(soft_constraints, hard, solver, verbose)
-
-    def core_to_assumptions(core_indices: List[int], assumed_indices: List[int]) -> set[int]:
-        """Map core indices back to assumption indices."""
-        core_assumps = set()
-        hard_offset = len(hard)
-        guard_count = len(guard_constraints)
-        for idx in core_indices:
-            if idx < hard_offset:
-                continue
-            rel = idx - hard_offset
-            if rel < guard_count:
-                core_assumps.add(rel)
-                continue
-            rel -= guard_count
-            if 0 <= rel < len(assumed_indices):
-                core_assumps.add(assumed_indices[rel])
-        return core_assumps
+    soft, hard, assumptions, guard_constraints = make_assump_model(selector_model or soft, hard)
+    # Built once, so the session recognizes a subset checked again
+    literals = [a == 1 for a in assumptions]
 
     # Check if all soft constraints are satisfiable
-    all_indices = list(range(len(soft)))
-    result, _ = solve_with_assumptions(all_indices)
-    if result == SolveResult.SAT:
+    if not assume_unsat and solve_subset(guard_constraints + literals, hard, solver, verbose) == SolveResult.SAT:
         return soft  # All constraints are satisfiable
 
-    def num_vars(i: int) -> int:
-        try:
-            return len(get_constraint_variables(soft[i]))
-        except Exception:
-            return 0
-
     # Order by number of variables (fewer first - less likely to conflict)
-    ordered = sorted(all_indices, key=num_vars, reverse=False)
-
-    mss_indices = set()
-    excluded = set()
-
-    for idx in ordered:
-        if idx in excluded:
-            continue
-
-        # Try adding idx to current MSS
-        test_indices = sorted(mss_indices | {idx})
-        result, core_indices = solve_with_assumptions(test_indices)
+    ordered = sorted(range(len(soft)), key=lambda i: _num_variables(soft[i]), reverse=False)
+
+    # Indices in the order they joined the MSS, and the guards with their
+    # literals, grown as they join: the session keys checks by constraint
+    # set, so the assumptions need no sorting
+    mss_indices: List[int] = []
+    assumed = list(guard_constraints)
+
+    # Candidates are tried in batches that double after each SAT check and
+    # fall back to a single candidate after an UNSAT one, so a run of
+    # constraints that all fit costs a logarithmic number of checks, and a
+    # conflicting candidate about one more check than when tried alone.
+    # A candidate rejected alone conflicts with a subset of the final MSS,
+    # so the result is maximal.
+    start = 0
+    size = 1
+    while start < len(ordered):
+        batch = ordered[start:start + size]
+        result = solve_subset(assumed + [literals[i] for i in batch], hard, solver, verbose)
+        if result != SolveResult.SAT and result != SolveResult.UNSAT and len(batch) == 1:
+            # UNKNOWN/ERROR - fall back to naive check
+            if is_sat([soft[i] for i in mss_indices] + [soft[batch[0]]], hard, solver, verbose):
+                result = SolveResult.SAT
 
         if result == SolveResult.SAT:
-            mss_indices.add(idx)
-        elif result == SolveResult.UNSAT:
-            # Extract core and mark conflicting indices
-            core = core_to_assumptions(core_indices, test_indices)
-            if idx in core:
-                excluded.add(idx)
-            elif core:
-                # Core doesn't contain idx, but something in mss_indices
-                # This shouldn't happen if we're growing correctly, but handle it
-                excluded.add(idx)
+            mss_indices.extend(batch)
+            assumed.extend(literals[i] for i in batch)
+            start += len(batch)
+            size *= 2
+        elif len(batch) == 1:
+            start += 1  # Conflicts with the current MSS
         else:
-            # UNKNOWN/ERROR - fall back to naive check
-            if is_sat(
-                [soft[i] for i in mss_indices] + [soft[idx]],
-                hard, solver, verbose
-            ):
-                mss_indices.add(idx)
-            else:
-                excluded.add(idx)
+            size = 1  # Some candidate of the batch conflicts: retry alone
 
-    return [soft[i] for i in range(len(soft)) if i in mss_indices]
+    return [soft[i] for i in sorted(mss_indices)]
 
 
+@_memoized
 def is_mss(
     subset: List[Any],
     soft: List[Any],
     hard: Optional[List[Any]] = None,
     solver: str = "ace",
-    verbose: int = -1
+    verbose: int = -1,
+    session: Optional[Session] = None,
+    n_workers: int = 1
 ) -> bool:
     """
     Verify that a subset is an MSS (Maximal Satisfiable Subset).
@@ -215,29 +248,77 @@ def is_mss(
     :param hard: Hard constraints
     :param solver: Solver name
     :param verbose: Verbosity level
+    :param session: Optional Session sharing verdicts with other checks
+    :param n_workers: Number of worker processes running the maximality
+                      checks when they are made one by one (see find_subset)
     :return: True if subset is a valid MSS
     """
-    subset = flatten_constraints(subset)
-    soft = flatten_constraints(soft)
-    hard = flatten_constraints(hard) if hard else []
+    with session_scope(session):
+        subset = flatten_constraints(subset)
+        soft = flatten_constraints(soft)
+        hard = flatten_constraints(hard) if hard else []
 
-    # Check SAT
-    if not is_sat(subset, hard, solver, verbose):
-        if verbose >= 0:
-            print("is_mss: subset is UNSAT, not an MSS")
-        return False
+        subset_keys = {_constraint_key(c) for c in subset}
+        remaining = [c for c in soft if _constraint_key(c) not in subset_keys]
 
-    # Check maximality - adding any constraint from soft \ subset should make it UNSAT
-    subset_ids = set(id(c) for c in subset)
-    remaining = [c for c in soft if id(c) not in subset_ids]
+        # A constraint entailed by its domain can be added to any SAT subset
+        if any(_entailed_by_domain(c) for c in remaining):
+            if verbose >= 0:
+                print("is_mss: a remaining constraint holds over its domain, not maximal")
+            return False
 
-    for c in remaining:
-        if is_sat(subset + [c], hard, solver, verbose):
+        # Check SAT
+        if not is_sat(subset, hard, solver, verbose):
             if verbose >= 0:
-                print("is_mss: can add more constraints, not maximal")
+                print("is_mss: subset is UNSAT, not an MSS")
             return False
 
-    return True
+        # Check maximality - adding any constraint from soft \ subset should make it UNSAT
+        if not remaining:
+            return True
+
+        # One check answers for all the extensions: subset + [c] is SAT for
+        # some c exactly when subset is SAT with at least one of them
+        result = _some_extension_sat(subset, remaining, hard, solver, verbose)
+        if result == SolveResult.UNSAT:
+            # Every extension is UNSAT, which later checks (e.g. is_mcs) reuse
+            current = current_session()
+            if current is not None:
+                for c in remaining:
+                    current.record(hard + subset + [c], solver, SolveResult.UNSAT)
+            return True
+        if result != SolveResult.SAT:
+            # No verdict: check the extensions one by one
+            extended = [subset + [c] for c in remaining]
+            if find_subset(extended, hard, True, solver, verbose, n_workers) is None:
+                return True
+
+        if verbose >= 0:
+            print("is_mss: can add more constraints, not maximal")
+        return False
+
+
+def _some_extension_sat(
+    subset: List[Any],
+    remaining: List[Any],
+    hard: List[Any],
+    solver: str,
+    verbose: int
+) -> SolveResult:
+    """
+    Check if subset stays SAT with at least one of the remaining constraints.
+
+    Each remaining constraint is guarded by an indicator (a_i -> c_i), and
+    at least one indicator must be set. The indicators only live for this
+    check and are removed from the model afterwards.
+    """
+    from pycsp3 import Sum
+
+    _, definitions, indicators, guards = make_assump_model(remaining, name_prefix="ext")
+    try:
+        return solve_subset(subset + guards + [Sum(indicators) >= 1], hard + definitions, solver, verbose)
+    finally:
+        _discard_variables(indicators)
 
 
 def mcs_from_mss(
@@ -249,19 +330,24 @@ def mcs_from_mss(
 
     MCS = soft \\ MSS (the complement of MSS relative to soft constraints)
 
+    Constraints are matched by structure (see constraint_fingerprint), so
+    the MSS may come from an equivalent model built again.
+
     :param mss: A maximal satisfiable subset
     :param soft: The full set of soft constraints
     :return: The minimal correction set (constraints to remove to restore SAT)
     """
-    mss_ids = set(id(c) for c in mss)
-    return [c for c in soft if id(c) not in mss_ids]
+    mss_keys = {_constraint_key(c) for c in mss}
+    return [c for c in soft if _constraint_key(c) not in mss_keys]
 
 
+@_memoized
 def mcs_naive(
     soft: List[Any],
     hard: Optional[List[Any]] = None,
     solver: str = "ace",
-    verbose: int = -1
+    verbose: int = -1,
+    n_workers: int = 1
 ) -> List[Any]:
     """
     Compute a Minimal Correction Set via MSS complement.
@@ -273,6 +359,7 @@ def mcs_naive(
     :param hard: List of hard constraints
     :param solver: Solver name
     :param verbose: Verbosity level
+    :param n_workers: Number of worker processes (see mss_naive)
     :return: A minimal correction set
     """
     soft = flatten_constraints(soft)
@@ -286,10 +373,11 @@ def mcs_naive(
         return []
 
     # Find MSS and return its complement
-    mss_result = mss_naive(soft, hard, solver, verbose)
+    mss_result = mss_naive(soft, hard, solver, verbose, assume_unsat=True, n_workers=n_workers)
     return mcs_from_mss(mss_result, soft)
 
 
+@_memoized
 def mcs(
     soft: List[Any],
     hard: Optional[List[Any]] = None,
@@ -316,16 +404,19 @@ def mcs(
         return []
 
     # Find MSS and return its complement
-    mss_result = mss(soft, hard, solver, verbose)
+    mss_result = mss(soft, hard, solver, verbose, assume_unsat=True)
     return mcs_from_mss(mss_result, soft)
 
 
+@_memoized
 def is_mcs(
     subset: List[Any],
     soft: List[Any],
     hard: Optional[List[Any]] = None,
     solver: str = "ace",
-    verbose: int = -1
+    verbose: int = -1,
+    session: Optional[Session] = None,
+    n_workers: int = 1
 ) -> bool:
     """
     Verify that a subset is an MCS (Minimal Correction Set).
@@ -339,61 +430,92 @@ def is_mcs(
     :param hard: Hard constraints
     :param solver: Solver name
     :param verbose: Verbosity level
+    :param session: Optional Session sharing verdicts with other checks
+    :param n_workers: Number of worker processes running the minimality
+                      checks (see find_subset)
     :return: True if subset is a valid MCS
     """
-    subset = flatten_constraints(subset)
-    soft = flatten_constraints(soft)
-    hard = flatten_constraints(hard) if hard else []
-
-    # Compute complement
-    subset_ids = set(id(c) for c in subset)
-    complement = [c for c in soft if id(c) not in subset_ids]
-
-    # Check that complement is SAT
-    if not is_sat(complement, hard, solver, verbose):
-        if verbose >= 0:
-            print("is_mcs: complement is UNSAT, not a valid MCS")
-        return False
-
-    # Check minimality: removing any constraint from MCS makes complement UNSAT
-    for i, c in enumerate(subset):
-        reduced_mcs = subset[:i] + subset[i + 1:]
-        reduced_mcs_ids = set(id(x) for x in reduced_mcs)
-        new_complement = [x for x in soft if id(x) not in reduced_mcs_ids]
+    with session_scope(session):
+        subset = flatten_constraints(subset)
+        soft = flatten_constraints(soft)
+        hard = flatten_constraints(hard) if hard else []
+
+        # Compute complement
+        soft_keys = [_constraint_key(c) for c in soft]
+        subset_keys = [_constraint_key(c) for c in subset]
+        in_subset = set(subset_keys)
+        complement = [c for c, key in zip(soft, soft_keys, strict=True) if key not in in_subset]
+
+        # A constraint entailed by its domain never needs to be removed
+        for j, c in enumerate(subset):
+            if _entailed_by_domain(c):
+                if verbose >= 0:
+                    print(f"is_mcs: constraint {j} holds over its domain, not minimal")
+                return False
+
+        # Check that complement is SAT
+        if not is_sat(complement, hard, solver, verbose):
+            if verbose >= 0:
+                print("is_mcs: complement is UNSAT, not a valid MCS")
+            return False
 
-        if is_sat(new_complement, hard, solver, verbose):
+        # Check minimality: removing any constraint from MCS makes complement UNSAT.
+        # Removing c from the MCS puts its occurrences in soft back into the
+        # complement, so each new complement is a copy, not a scan of soft
+        occurrences: Dict[Any, List[Any]] = {}
+        for c, key in zip(soft, soft_keys, strict=True):
+            occurrences.setdefault(key, []).append(c)
+        # Constraints over many variables first: as in mus_naive, they are
+        # the likeliest to leave the complement SAT, which ends the search
+        order = sorted(range(len(subset)), key=lambda j: -_num_variables(subset[j]))
+        new_complements = (complement + occurrences.get(subset_keys[j], []) for j in order)
+
+        i = find_subset(new_complements, hard, True, solver, verbose, n_workers)
+        if i is not None:
             if verbose >= 0:
-                print(f"is_mcs: removing constraint {i} still gives SAT complement, not minimal")
+                print(f"is_mcs: removing constraint {order[i]} still gives SAT complement, not minimal")
             return False
 
-    return True
+        return True
 
 
+@_memoized
 def mss_opt(
     soft: List[Any],
     hard: Optional[List[Any]] = None,
     weights: Optional[List[Union[int, float]]] = None,
     solver: str = "ace",
-    verbose: int = -1
+    verbose: int = -1,
+    assume_unsat: bool = False
 ) -> List[Any]:
     """
-    Compute an optimal (weighted) Maximal Satisfiable Subset.
+    Compute a weighted Maximal Satisfiable Subset.
 
-    This implementation finds an MSS that maximizes the sum of weights
-    of included constraints. If no weights are provided, it maximizes
-    the number of constraints (equivalent to standard MSS).
+    The MSS keeps heavier constraints first, but is maximal rather than
+    optimal: its sum of weights is not always the largest. For instance,
+    soft = [v == 1, v == 2, v >= 2] with weights [3, 2, 2] gives [v == 1]
+    (weight 3) rather than [v == 2, v >= 2] (weight 4). If no weights are
+    provided, it is a maximal MSS like any other.
 
-    Algorithm:
-    Uses an iterative approach to find the optimal weighted MSS.
-    For each constraint subset sorted by total weight (descending),
-    tests if it's SAT and returns the first maximal one found.
+    Algorithm (core-guided, with ACE's core extraction):
+    1. Start from all soft constraints
+    2. While the current set is UNSAT, extract a core and drop its
+       lowest-weight constraint
+    3. Greedily add the dropped constraints back, by decreasing weight
+
+    Each step drops a constraint of a different conflict, so the number of
+    solver calls follows the number of conflicts rather than the number of
+    constraints. Without cores (other solvers, or no core reported), the
+    MSS is grown greedily from the empty set by decreasing weight.
 
     :param soft: List of soft constraints
     :param hard: List of hard constraints
     :param weights: Weight for each soft constraint (default: all 1s)
     :param solver: Solver name
     :param verbose: Verbosity level
-    :return: An optimal weighted MSS
+    :param assume_unsat: Skip the satisfiability check of soft + hard, for
+                         callers that already know they are UNSAT
+    :return: A weighted MSS
     """
     soft = flatten_constraints(soft)
     hard = flatten_constraints(hard) if hard else []
@@ -408,29 +530,49 @@ def mss_opt(
     if len(w) != n:
         raise ValueError(f"weights length ({len(w)}) must match soft length ({n})")
 
-    # If all constraints are SAT, return all
-    if is_sat(soft, hard, solver, verbose):
-        return soft
-
-    # Greedy approach: order by weight (higher weight first)
-    # Try to include high-weight constraints first
-    indexed_constraints = [(i, soft[i], w[i]) for i in range(n)]
-    indexed_constraints.sort(key=lambda x: -x[2])  # Sort by weight descending
-
-    mss_indices: set = set()
-
-    for i, c, weight in indexed_constraints:
-        # Try adding constraint to current MSS
-        test_subset = [soft[j] for j in mss_indices] + [c]
-        if is_sat(test_subset, hard, solver, verbose):
-            mss_indices.add(i)
+    checker = _Checker(soft, hard, solver, verbose, use_cores=solver.lower() == "ace", use_models=False)
+    mss_mask = checker.full
+    dropped = []
+    if assume_unsat:
+        # Without cores, the greedy growth then starts without a check
+        checker.verdicts.record(mss_mask, False)
+
+    # Cores are matched by scope, so a core may hold more constraints than
+    # the conflict; one of them still has to go, and the greedy growth below
+    # makes the result maximal whichever it is. A core without soft
+    # constraints (e.g. hard alone is UNSAT) guides nothing
+    core = checker.unsat_core(mss_mask)
+    while core:
+        i = min(_bits(core), key=w.__getitem__)
+        mss_mask &= ~(1 << i)
+        dropped.append(i)
+        if verbose >= 0:
+            print(f"mss_opt: dropped constraint {i} (weight {w[i]}) from a core")
+        core = checker.unsat_core(mss_mask)
+
+    # An extraction that found no core left the set SAT, and recorded it
+    if checker.check(mss_mask):
+        candidates = dropped
+    else:
+        # No core to guide the search: grow from the empty set
+        mss_mask = 0
+        candidates = list(range(n))
+
+    # Higher weights first, then fewer variables (less likely to conflict);
+    # a constraint rejected here stays UNSAT with the larger MSS, so the
+    # result is maximal
+    var_counts = checker.var_counts
+    for i in sorted(candidates, key=lambda j: (-w[j], var_counts[j])):
+        if checker.check(mss_mask | 1 << i):
+            mss_mask |= 1 << i
             if verbose >= 0:
-                print(f"mss_opt: added constraint {i} (weight {weight}), "
-                      f"MSS size: {len(mss_indices)}")
+                print(f"mss_opt: added constraint {i} (weight {w[i]}), "
+                      f"MSS size: {mss_mask.bit_count()}")
 
-    return [soft[i] for i in range(n) if i in mss_indices]
+    return [soft[i] for i in _bits(mss_mask)]
 
 
+@_memoized
 def mcs_opt(
     soft: List[Any],
     hard: Optional[List[Any]] = None,
@@ -439,18 +581,18 @@ def mcs_opt(
     verbose: int = -1
 ) -> List[Any]:
     """
-    Compute an optimal (weighted) Minimal Correction Set.
+    Compute a weighted Minimal Correction Set.
 
-    This implementation finds an MCS that minimizes the sum of weights
-    of removed constraints. If no weights are provided, it minimizes
-    the number of constraints (smallest MCS).
+    The MCS is the complement of mss_opt's MSS: it removes lighter
+    constraints first, but is minimal rather than optimal, so its sum of
+    weights is not always the smallest (see mss_opt).
 
     :param soft: List of soft constraints
     :param hard: List of hard constraints
     :param weights: Weight for each soft constraint (default: all 1s)
     :param solver: Solver name
     :param verbose: Verbosity level
-    :return: An optimal weighted MCS
+    :return: A weighted MCS
     """
     soft = flatten_constraints(soft)
     hard = flatten_constraints(hard) if hard else []
@@ -463,5 +605,5 @@ def mcs_opt(
         return []
 
     # Find optimal MSS and return its complement
-    mss_result = mss_opt(soft, hard, weights, solver, verbose)
+    mss_result = mss_opt(soft, hard, weights, solver, verbose, assume_unsat=True)
     return mcs_from_mss(mss_result, soft)
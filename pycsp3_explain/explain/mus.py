@@ -15,21 +15,32 @@ A MUS is a minimal subset of constraints that is unsatisfiable:
 - Removing any constraint from the subset makes it SAT
 """
 
-from typing import List, Any, Optional, Union, Callable, Set
-from contextlib import contextmanager
+from typing import List, Any, Optional, Union, Callable, Set, FrozenSet
 
+from pycsp3_explain.explain._oracle import _MapSolver, _bits, _scope
 from pycsp3_explain.explain.utils import (
     flatten_constraints,
     order_by_num_variables,
     make_assump_model,
-    get_constraint_variables,
+    _num_variables,
+    _entailed_by_domain,
+    _refuted_by_domain,
+    _partition_by_variables,
+    pycsp3_scope,
+    SelectorModel,
 )
 from pycsp3_explain.solvers.wrapper import (
     SolveResult,
+    Session,
+    _memoized,
+    current_session,
     is_sat,
     is_unsat,
+    session_scope,
     solve_subset,
-    solve_subset_with_core,
+    find_subset,
+    _parse_core_scopes,
+    _solve_with_core_line,
 )
 
 
@@ -46,120 +57,17 @@ def _normalize_constraint_list(constraints: Optional[Any]) -> List[Any]:
     return [constraints]
 
 
-@contextmanager
-def _clean_pycsp3_state():
-    from pycsp3_explain.solvers.wrapper import disable_pycsp3_atexit
-    from pycsp3.classes.entities import (
-        CtrEntities,
-        VarEntities,
-        ObjEntities,
-        AnnEntities,
-    )
-    from pycsp3.classes.main.variables import Variable
-    from pycsp3.classes.main.constraints import auxiliary
-    from pycsp3.compiler import Compilation
-
-    disable_pycsp3_atexit()
-
-    saved_ctr_items = CtrEntities.items[:]
-    saved_obj_items = ObjEntities.items[:]
-    saved_ann_items = AnnEntities.items[:]
-    saved_ann_types = AnnEntities.items_types[:] if hasattr(AnnEntities, "items_types") else []
-    saved_var_items = VarEntities.items[:]
-    saved_var_to_evar = VarEntities.varToEVar.copy()
-    saved_var_to_evar_array = VarEntities.varToEVarArray.copy()
-    saved_prefix_to_evar_array = VarEntities.prefixToEVarArray.copy()
-    saved_name2obj = Variable.name2obj.copy()
-    saved_arrays = Variable.arrays[:] if hasattr(Variable, "arrays") else []
-
-    saved_compilation = {
-        "done": Compilation.done,
-        "model": Compilation.model,
-        "string_model": Compilation.string_model,
-        "string_data": Compilation.string_data,
-        "data": Compilation.data,
-        "solve": Compilation.solve,
-        "stopwatch": Compilation.stopwatch,
-        "stopwatch2": Compilation.stopwatch2,
-        "pathname": Compilation.pathname,
-        "filename": Compilation.filename,
-    }
-
-    aux = auxiliary()
-    saved_aux_intro = aux._introduced_variables
-    saved_aux_collected = aux._collected_constraints
-    saved_aux_raw = aux._collected_raw_constraints
-    saved_aux_ext = aux._collected_extension_constraints
-    saved_aux_cache = aux.cache
-    saved_aux_cache_ints = aux.cache_ints.copy()
-    saved_aux_cache_nodes = aux.cache_nodes.copy()
-
-    try:
-        CtrEntities.items = []
-        ObjEntities.items = []
-        AnnEntities.items = []
-        if hasattr(AnnEntities, "items_types"):
-            AnnEntities.items_types = []
-        VarEntities.items = []
-        VarEntities.varToEVar = {}
-        VarEntities.varToEVarArray = {}
-        VarEntities.prefixToEVarArray = {}
-        Variable.name2obj = {}
-        if hasattr(Variable, "arrays"):
-            Variable.arrays = []
-
-        aux._introduced_variables = []
-        aux._collected_constraints = []
-        aux._collected_raw_constraints = []
-        aux._collected_extension_constraints = []
-        aux.cache = []
-        aux.cache_ints = {}
-        aux.cache_nodes = {}
-
-        Compilation.done = False
-        Compilation.model = None
-        Compilation.string_model = None
-        Compilation.string_data = None
-        Compilation.data = None
-        Compilation.solve = None
-        Compilation.stopwatch = None
-        Compilation.stopwatch2 = None
-        Compilation.pathname = ""
-        Compilation.filename = ""
-
-        yield
-    finally:
-        CtrEntities.items = saved_ctr_items
-        ObjEntities.items = saved_obj_items
-        AnnEntities.items = saved_ann_items
-        if hasattr(AnnEntities, "items_types"):
-            AnnEntities.items_types = saved_ann_types
-        VarEntities.items = saved_var_items
-        VarEntities.varToEVar = saved_var_to_evar
-        VarEntities.varToEVarArray = saved_var_to_evar_array
-        VarEntities.prefixToEVarArray = saved_prefix_to_evar_array
-        Variable.name2obj = saved_name2obj
-        if hasattr(Variable, "arrays"):
-            Variable.arrays = saved_arrays
-
-        aux._introduced_variables = saved_aux_intro
-        aux._collected_constraints = saved_aux_collected
-        aux._collected_raw_constraints = saved_aux_raw
-        aux._collected_extension_constraints = saved_aux_ext
-        aux.cache = saved_aux_cache
-        aux.cache_ints = saved_aux_cache_ints
-        aux.cache_nodes = saved_aux_cache_nodes
-
-        Compilation.done = saved_compilation["done"]
-        Compilation.model = saved_compilation["model"]
-        Compilation.string_model = saved_compilation["string_model"]
-        Compilation.string_data = saved_compilation["string_data"]
-        Compilation.data = saved_compilation["data"]
-        Compilation.solve = saved_compilation["solve"]
-        Compilation.stopwatch = saved_compilation["stopwatch"]
-        Compilation.stopwatch2 = saved_compilation["stopwatch2"]
-        Compilation.pathname = saved_compilation["pathname"]
-        Compilation.filename = saved_compilation["filename"]
+def _shared_correction_sets(soft: List[Any], hard: List[Any], solver: str) -> List[Set[int]]:
+    """
+    Correction sets to start an implicit hitting set search from.
+
+    Inside a Session, the list is shared with earlier searches on the same
+    constraints (whatever their weights); otherwise it starts empty.
+    """
+    session = current_session()
+    if session is None:
+        return []
+    return session.correction_sets(soft, hard, solver)
 
 
 def _solve_selection_model(
@@ -189,7 +97,7 @@ def _solve_selection_model(
     if fixed is not None and any(i < 0 or i >= n for i in fixed):
         raise ValueError("fixed_selection contains indices out of range")
 
-    with _clean_pycsp3_state():
+    with pycsp3_scope():
         var_id = f"hs_{uuid.uuid4().hex}"
         if fixed is None:
             select = VarArray(size=n, dom=range(2), id=var_id)
@@ -306,6 +214,8 @@ def _find_optimal_hitting_set(
         return constraints
 
     def objective_builder(select):
+        if all(weight == 1 for weight in scaled_w):
+            return Sum(select)  # Unit weights: plain cardinality
         return Sum(select[i] * scaled_w[i] for i in range(n))
 
     use_cp = subset_predicate is None or subset_constraints is not None
@@ -354,6 +264,12 @@ def _find_optimal_hitting_set(
     return best_set
 
 
+# Number of candidates above which mus_naive runs QuickXplain: both need
+# about as many checks on 8 constraints
+_QUICKXPLAIN_MIN_SIZE = 8
+
+
+@_memoized
 def mus_naive(
     soft: List[Any],
     hard: Optional[List[Any]] = None,
@@ -367,13 +283,18 @@ def mus_naive(
     constraint test. For large models, this can be slow.
 
     Algorithm:
-    1. Start with all soft constraints (must be UNSAT)
+    1. Start with all soft constraints (must be UNSAT), restricted to the
+       first UNSAT group of constraints sharing no variable with the others
     2. For each constraint c (ordered by number of variables, descending):
        - Try removing c from the current set
        - If still UNSAT: c is not needed, keep it removed
        - If SAT: c is necessary for unsatisfiability, restore it
     3. Return the remaining constraints (the MUS)
 
+    Past _QUICKXPLAIN_MIN_SIZE candidates, the MUS is found with
+    quickxplain_naive instead: its O(k log(n/k)) checks for a MUS of k
+    constraints among n beat the n checks of deletion on small conflicts.
+
     :param soft: List of soft constraints (candidates for MUS)
     :param hard: List of hard constraints (always included, not in MUS)
     :param solver: Solver name ("ace" or "choco")
@@ -392,6 +313,21 @@ def mus_naive(
     assert is_unsat(soft, hard, solver, verbose), \
         "MUS: model must be UNSAT (soft + hard constraints must be unsatisfiable)"
 
+    # A MUS lies within one group of constraints sharing no variable with
+    # the others: deletion then runs on the first UNSAT group only
+    groups = _partition_by_variables(soft, hard)
+    if len(groups) > 1:
+        for soft_indices, hard_indices in groups:
+            group_soft = [soft[i] for i in soft_indices]
+            group_hard = [hard[j] for j in hard_indices]
+            if is_unsat(group_soft, group_hard, solver, verbose):
+                return mus_naive(group_soft, group_hard, solver, verbose)
+
+    if len(soft) > _QUICKXPLAIN_MIN_SIZE:
+        # Constraints over fewer variables are preferred, as deletion
+        # removes the ones over more variables first
+        return quickxplain_naive(order_by_num_variables(soft, descending=False), hard, solver, verbose)
+
     # Order constraints: try removing constraints with many variables first
     # (they are more likely to be removable)
     candidates = order_by_num_variables(soft, descending=True)
@@ -419,6 +355,7 @@ def mus_naive(
     return mus
 
 
+@_memoized
 def mus(
     soft: List[Any],
     hard: Optional[List[Any]] = None,
@@ -431,68 +368,73 @@ def mus(
     This implementation relies on ACE's core extraction to seed and refine
     a deletion-based MUS search.
 
-    :param soft: List of soft constraints (candidates for MUS)
+    :param soft: List of soft constraints (candidates for MUS), or a
+                 SelectorModel from post_with_selectors (hard is then ignored)
     :param hard: List of hard constraints (always included, not in MUS)
     :param solver: Solver name ("ace" only for core extraction)
     :param verbose: Verbosity level (-1 for silent)
     :return: A minimal unsatisfiable subset of soft constraints
     :raises AssertionError: If soft + hard is satisfiable
     """
+    selector_model = soft if isinstance(soft, SelectorModel) else None
+    if selector_model is not None:
+        soft, hard = selector_model.soft, selector_model.hard
+
     if solver.lower() != "ace":
         if verbose >= 0:
             print("mus: solver does not support core extraction, using mus_naive")
         return mus_naive(soft, hard, solver, verbose)
 
-    soft, hard, assumptions, guard_constraints = make_assump_model(soft, hard)
+    soft, hard, assumptions, guard_constraints = make_assump_model(selector_model or soft, hard)
+
+    assumption_of = {a.id: i for i, a in enumerate(assumptions)}
+    hard_scopes = {_scope(c) for c in hard}
 
     def solve_with_assumptions(assumed_indices: List[int]):
         assumption_constraints = [assumptions[i] == 1 for i in assumed_indices]
         soft_constraints = guard_constraints + assumption_constraints
-        return solve_subset_with_core(soft_constraints, hard, solver, verbose)
-
-    def core_to_assumptions(core_indices: List[int], assumed_indices: List[int]) -> set[int]:
+        result, core_line = _solve_with_core_line(soft_constraints, hard, solver, verbose)
+        return result, _parse_core_scopes(core_line)
+
+    def core_to_assumptions(core_scopes: List[FrozenSet[str]], assumed_indices: List[int]) -> Set[int]:
+        # ACE numbers the constraints it keeps when loading the model, so
+        # core constraints are matched by scope: every guard or assumption
+        # of the core involves the indicator of its soft constraint. If a
+        # core scope matches neither an indicator nor a hard constraint (ACE
+        # reformulated it), all assumed constraints are kept
+        assumed = set(assumed_indices)
         core_assumps = set()
-        hard_offset = len(hard)
-        guard_count = len(guard_constraints)
-        for idx in core_indices:
-            if idx < hard_offset:
-                continue
-            rel = idx - hard_offset
-            if rel < guard_count:
-                core_assumps.add(rel)
-                continue
-            rel -= guard_count
-            if 0 <= rel < len(assumed_indices):
-                core_assumps.add(assumed_indices[rel])
+        for scope in core_scopes:
+            indices = {assumption_of[name] for name in scope if name in assumption_of}
+            if not indices and scope not in hard_scopes:
+                return assumed
+            core_assumps |= indices & assumed
         return core_assumps
 
     all_indices = list(range(len(soft)))
-    result, core_indices = solve_with_assumptions(all_indices)
+    result, core_scopes = solve_with_assumptions(all_indices)
     assert result == SolveResult.UNSAT, \
         "MUS: model must be UNSAT (soft + hard constraints must be unsatisfiable)"
 
-    core = core_to_assumptions(core_indices, all_indices)
+    core = core_to_assumptions(core_scopes, all_indices)
     if not core:
         core = set(all_indices)
 
-    def num_vars(i: int) -> int:
-        try:
-            return len(get_constraint_variables(soft[i]))
-        except Exception:
-            return 0
-
-    ordered = sorted(core, key=num_vars, reverse=True)
+    ordered = sorted(core, key=lambda i: _num_variables(soft[i]), reverse=True)
 
     for idx in ordered:
         if idx not in core:
             continue
         core.remove(idx)
         assumed = sorted(core)
-        result, core_indices = solve_with_assumptions(assumed)
+        result, core_scopes = solve_with_assumptions(assumed)
+        if result not in (SolveResult.SAT, SolveResult.UNSAT):
+            # ACE's extraction mode reports no verdict for a SAT subset
+            result = solve_subset([soft[i] for i in assumed], hard, solver, verbose)
         if result == SolveResult.SAT:
             core.add(idx)
         elif result == SolveResult.UNSAT:
-            refined = core_to_assumptions(core_indices, assumed)
+            refined = core_to_assumptions(core_scopes, assumed)
             if refined:
                 core = set(refined)
         else:
@@ -503,6 +445,7 @@ def mus(
     return [soft[i] for i in range(len(soft)) if i in core]
 
 
+@_memoized
 def quickxplain_naive(
     soft: List[Any],
     hard: Optional[List[Any]] = None,
@@ -539,6 +482,8 @@ def quickxplain_naive(
     assert is_unsat(soft, hard, solver, verbose), \
         "QuickXplain: model must be UNSAT"
 
+    # Each call halves soft_list, so the recursion is only log2(len(soft))
+    # deep: about 11 frames for 2000 constraints
     def do_recursion(soft_list: List[Any], hard_list: List[Any], delta: List[Any]) -> List[Any]:
         """
         Recursive QuickXplain procedure.
@@ -580,11 +525,14 @@ def quickxplain_naive(
     return do_recursion(soft, hard, [])
 
 
+@_memoized
 def is_mus(
     subset: List[Any],
     hard: Optional[List[Any]] = None,
     solver: str = "ace",
-    verbose: int = -1
+    verbose: int = -1,
+    session: Optional[Session] = None,
+    n_workers: int = 1
 ) -> bool:
     """
     Verify that a subset is a MUS.
@@ -597,31 +545,44 @@ def is_mus(
     :param hard: Hard constraints
     :param solver: Solver name
     :param verbose: Verbosity level
+    :param session: Optional Session sharing verdicts with other checks
+    :param n_workers: Number of worker processes running the minimality
+                      checks (see find_subset)
     :return: True if subset is a valid MUS
     """
-    subset = flatten_constraints(subset)
-    hard = flatten_constraints(hard) if hard else []
+    with session_scope(session):
+        subset = flatten_constraints(subset)
+        hard = flatten_constraints(hard) if hard else []
 
-    if not subset:
-        return False
+        if not subset:
+            return False
 
-    # Check UNSAT
-    if not is_unsat(subset, hard, solver, verbose):
-        if verbose >= 0:
-            print("is_mus: subset is SAT, not a MUS")
-        return False
+        # A constraint entailed by its domain can be removed from any subset
+        for i, c in enumerate(subset):
+            if _entailed_by_domain(c):
+                if verbose >= 0:
+                    print(f"is_mus: constraint {i} holds over its domain, not minimal")
+                return False
+
+        # Check UNSAT
+        if not is_unsat(subset, hard, solver, verbose):
+            if verbose >= 0:
+                print("is_mus: subset is SAT, not a MUS")
+            return False
 
-    # Check minimality
-    for i, c in enumerate(subset):
-        reduced = subset[:i] + subset[i + 1:]
-        if is_unsat(reduced, hard, solver, verbose):
+        # Check minimality; the reduced subsets are built one at a time, so
+        # finding a removable constraint builds none past it
+        reduced = (subset[:i] + subset[i + 1:] for i in range(len(subset)))
+        removable = find_subset(reduced, hard, False, solver, verbose, n_workers)
+        if removable is not None:
             if verbose >= 0:
-                print(f"is_mus: removing constraint {i} still UNSAT, not minimal")
+                print(f"is_mus: removing constraint {removable} still UNSAT, not minimal")
             return False
 
-    return True
+        return True
 
 
+@_memoized
 def all_mus_naive(
     soft: List[Any],
     hard: Optional[List[Any]] = None,
@@ -632,8 +593,13 @@ def all_mus_naive(
     """
     Find all MUSes (up to a maximum count).
 
-    This is a naive implementation that repeatedly finds MUSes and blocks them.
-    For complete enumeration, consider using MARCO algorithm.
+    This is a naive implementation that finds each MUS with mus_naive and
+    blocks it. Seeds are drawn from a map of blocking clauses over the soft
+    constraints: a found MUS M adds OR(c not in seed, c in M), and a SAT
+    seed S adds OR(c in seed, c not in S). Each seed is as large as the map
+    allows, so an UNSAT seed holds a new MUS, and the enumeration is complete
+    once the map has no seed left.
+    For MUS and MCS enumeration with fewer checks, consider using MARCO.
 
     WARNING: This can be very slow for models with many MUSes.
 
@@ -650,49 +616,34 @@ def all_mus_naive(
     if not soft:
         return []
 
-    if not is_unsat(soft, hard, solver, verbose):
-        return []  # Model is SAT, no MUS
-
+    map_solver = _MapSolver(len(soft))
     all_muses = []
-    blocked_sets = []  # Sets of constraint indices that have been found
 
-    while True:
-        if max_mus is not None and len(all_muses) >= max_mus:
-            break
-
-        # Find a MUS avoiding already found ones
-        # Use different orderings to find different MUSes
-        import random
-        shuffled = soft.copy()
-        random.shuffle(shuffled)
-
-        mus = mus_naive(shuffled, hard, solver, verbose)
+    while max_mus is None or len(all_muses) < max_mus:
+        seed_mask = map_solver.next_seed()
+        if seed_mask is None:
+            break  # Every seed is blocked, enumeration complete
 
-        # Check if this MUS is new
-        mus_set = frozenset(id(c) for c in mus)
-        if mus_set in blocked_sets:
-            # Try with original ordering
-            mus = mus_naive(soft, hard, solver, verbose)
-            mus_set = frozenset(id(c) for c in mus)
+        indices = list(_bits(seed_mask))
+        seed = [soft[i] for i in indices]
 
-            if mus_set in blocked_sets:
-                # No new MUS found
-                break
+        if not is_unsat(seed, hard, solver, verbose):
+            # No MUS below a SAT seed (the first seed is the whole model)
+            map_solver.block_mss(seed_mask)
+            continue
 
+        mus = mus_naive(seed, hard, solver, verbose)
+        in_mus = set(map(id, mus))
+        map_solver.block_mus(sum(1 << i for i in indices if id(soft[i]) in in_mus))
         all_muses.append(mus)
-        blocked_sets.append(mus_set)
 
         if verbose >= 0:
             print(f"Found MUS #{len(all_muses)} with {len(mus)} constraints")
 
-        # Simple termination: if we found a MUS of size 1, we're likely done
-        # (this is a heuristic, not complete)
-        if len(mus) == 1:
-            break
-
     return all_muses
 
 
+@_memoized
 def optimal_mus_naive(
     soft: List[Any],
     hard: Optional[List[Any]] = None,
@@ -708,6 +659,9 @@ def optimal_mus_naive(
     2. Find optimal hitting sets that hit all correction subsets
     3. Test if hitting set is UNSAT; if so, return it as optimal MUS
 
+    Inside a Session, correction subsets found by earlier searches on the same
+    constraints are reused, whatever their weights.
+
     :param soft: List of soft constraints
     :param hard: List of hard constraints
     :param weights: Weight for each soft constraint (default: all 1s = smallest MUS)
@@ -735,12 +689,23 @@ def optimal_mus_naive(
     if len(w) != n:
         raise ValueError(f"weights length ({len(w)}) must match soft length ({n})")
 
+    # A constraint no value of its variable satisfies is a MUS on its own
+    # (unless the hard constraints are UNSAT already). Every MUS weighs at
+    # least the lightest weight, so one of the lightest is optimal
+    lightest = min(w)
+    if lightest >= 0:
+        for c, weight in zip(soft, w, strict=True):
+            if weight == lightest and _refuted_by_domain(c):
+                if not hard or is_sat([], hard, solver, verbose):
+                    return [c]
+                break
+
     # Verify model is UNSAT
     assert is_unsat(soft, hard, solver, verbose), \
         "optimal_mus: model must be UNSAT"
 
     # Collect correction subsets (complements of maximal satisfiable subsets)
-    correction_subsets: List[set] = []
+    correction_subsets: List[set] = _shared_correction_sets(soft, hard, solver)
 
     def find_optimal_hitting_set(correction_sets: List[set]) -> Optional[set]:
         """Find the minimum weight hitting set that hits all correction sets."""
@@ -772,36 +737,40 @@ def optimal_mus_naive(
 
         if result == SolveResult.UNSAT:
             # Found an optimal MUS candidate - verify and shrink if needed
-            # The hitting set might not be minimal, so shrink it
-            mus_indices = set(hitting_set)
+            # The hitting set might not be minimal, so shrink it. Membership
+            # is kept in a bytearray, which gives the subsets in order
+            # without sorting the indices for each check
+            in_mus = bytearray(n)
+            for i in hitting_set_list:
+                in_mus[i] = 1
 
             # Order by weight (higher weight first for removal)
-            ordered = sorted(mus_indices, key=lambda i: -w[i])
+            ordered = sorted(hitting_set_list, key=lambda i: -w[i])
 
             for idx in ordered:
-                if idx not in mus_indices:
-                    continue
-                mus_indices.remove(idx)
-                test_subset = [soft[i] for i in sorted(mus_indices)]
+                in_mus[idx] = 0
+                test_subset = [c for c, kept in zip(soft, in_mus, strict=True) if kept]
                 if not test_subset or is_sat(test_subset, hard, solver, verbose):
-                    mus_indices.add(idx)
+                    in_mus[idx] = 1
 
-            return [soft[i] for i in range(n) if i in mus_indices]
+            return [c for c, kept in zip(soft, in_mus, strict=True) if kept]
 
         elif result == SolveResult.SAT:
             # SAT: grow to MSS, derive correction subset
-            mss_indices = set(hitting_set_list)
+            in_mss = bytearray(n)
+            for i in hitting_set_list:
+                in_mss[i] = 1
 
             for i in range(n):
-                if i in mss_indices:
+                if in_mss[i]:
                     continue
-                test_indices = sorted(mss_indices | {i})
-                test_subset = [soft[j] for j in test_indices]
-                if is_sat(test_subset, hard, solver, verbose):
-                    mss_indices.add(i)
+                in_mss[i] = 1
+                test_subset = [c for c, kept in zip(soft, in_mss, strict=True) if kept]
+                if not is_sat(test_subset, hard, solver, verbose):
+                    in_mss[i] = 0
 
             # Correction subset = complement of MSS
-            correction_subset = set(range(n)) - mss_indices
+            correction_subset = {i for i in range(n) if not in_mss[i]}
             if not correction_subset:
                 raise OCUSException("Model is SAT, no MUS exists")
 
@@ -814,6 +783,7 @@ def optimal_mus_naive(
             raise OCUSException(f"Solver returned {result}")
 
 
+@_memoized
 def smus(
     soft: List[Any],
     hard: Optional[List[Any]] = None,
@@ -834,6 +804,7 @@ def smus(
     return optimal_mus_naive(soft, hard, weights=None, solver=solver, verbose=verbose)
 
 
+@_memoized
 def optimal_mus(
     soft: List[Any],
     hard: Optional[List[Any]] = None,
@@ -846,6 +817,10 @@ def optimal_mus(
 
     Alias for optimal_mus_naive. For weighted MUS optimization.
 
+    With uniform positive weights, every MUS weighs the same multiple of its
+    size, so the weighted problem degenerates to SMUS: such calls are
+    delegated to smus(), whose hitting sets minimize a plain cardinality.
+
     :param soft: List of soft constraints
     :param hard: List of hard constraints
     :param weights: Weight for each soft constraint
@@ -853,9 +828,13 @@ def optimal_mus(
     :param verbose: Verbosity level
     :return: An optimal MUS according to weights
     """
+    if weights and len(set(weights)) == 1 and weights[0] > 0 \
+            and len(weights) == len(flatten_constraints(soft)):
+        return smus(soft, hard, solver, verbose)
     return optimal_mus_naive(soft, hard, weights, solver, verbose)
 
 
+@_memoized
 def ocus(
     soft: List[Any],
     hard: Optional[List[Any]] = None,
@@ -872,6 +851,8 @@ def ocus(
     Use subset_constraints to encode the constraint as PyCSP3 constraints
     on selection variables (0/1). Optionally provide subset_predicate to
     validate subsets during shrinking and enumeration fallback.
+    Inside a Session, correction subsets found by earlier searches on the
+    same constraints are reused.
 
     :param soft: List of soft constraints
     :param hard: List of hard constraints
@@ -899,7 +880,7 @@ def ocus(
     assert is_unsat(soft, hard, solver, verbose), \
         "ocus: model must be UNSAT"
 
-    correction_subsets: List[Set[int]] = []
+    correction_subsets: List[Set[int]] = _shared_correction_sets(soft, hard, solver)
 
     subset_checker = _make_subset_checker(
         n=n,
@@ -974,6 +955,7 @@ def ocus(
             raise OCUSException(f"Solver returned {result}")
 
 
+@_memoized
 def ocus_naive(
     soft: List[Any],
     hard: Optional[List[Any]] = None,
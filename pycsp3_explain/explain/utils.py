@@ -5,9 +5,12 @@ This module provides helper functions for:
 - Flattening constraint lists
 - Creating subset models
 - Tracking constraint-to-index mappings
+- Scoping PyCSP3 models
 """
 
-from typing import List, Any, Optional, Tuple, Dict
+from typing import List, Any, Optional, Tuple, Dict, Iterator
+from contextlib import contextmanager
+import operator
 import sys
 import os
 
@@ -20,21 +23,69 @@ def _next_assump_name(prefix: str) -> str:
     return f"{prefix}_{_ASSUMP_COUNTER}"
 
 
+def _discard_variables(variables: List[Any]) -> None:
+    """
+    Remove a helper array of variables (indicators, flags) from the model.
+
+    PyCSP3 registers every declared array globally, so the helper arrays of
+    a run would otherwise stay in the caller's model once it is done.
+
+    :param variables: Variables of arrays declared with _next_assump_name
+    """
+    from pycsp3.classes.entities import VarEntities
+    from pycsp3.classes.main.variables import Variable
+
+    names = {x.id for x in variables}
+    names |= {name.split("[")[0] for name in names}
+    VarEntities.items[:] = [e for e in VarEntities.items if e.id not in names]
+    for registry in (VarEntities.varToEVar, VarEntities.varToEVarArray):
+        for x in variables:
+            registry.pop(x, None)
+    for name in names:
+        VarEntities.prefixToEVarArray.pop(name, None)
+        Variable.name2obj.pop(name, None)
+    Variable.arrays[:] = [a for a in Variable.arrays if not any(getattr(x, "id", None) in names for x in a)]
+
+
+_CONSTRAINT_CLASSES: Optional[tuple] = None
+
+
+def _constraint_classes() -> tuple:
+    """
+    PyCSP3 classes used to normalize constraints, imported once: every
+    check flattens its constraint lists, so an import statement per
+    constraint costs more than the normalization itself.
+    """
+    global _CONSTRAINT_CLASSES
+    if _CONSTRAINT_CLASSES is None:
+        try:
+            from pycsp3.classes.auxiliary.enums import TypeCtrArg
+            from pycsp3.classes.entities import ECtr
+            from pycsp3.classes.main.constraints import Constraint, ConstraintIntension
+        except Exception:
+            _CONSTRAINT_CLASSES = ()
+        else:
+            _CONSTRAINT_CLASSES = (TypeCtrArg.FUNCTION, ECtr, Constraint, ConstraintIntension)
+    return _CONSTRAINT_CLASSES
+
+
 def _normalize_constraint(constraint: Any) -> Any:
-    try:
-        from pycsp3.classes.auxiliary.enums import TypeCtrArg
-        from pycsp3.classes.entities import ECtr
-        from pycsp3.classes.main.constraints import Constraint, ConstraintIntension
-    except Exception:
+    classes = _CONSTRAINT_CLASSES if _CONSTRAINT_CLASSES is not None else _constraint_classes()
+    if not classes:
         return constraint
+    function, ECtr, Constraint, ConstraintIntension = classes
 
     if isinstance(constraint, ConstraintIntension):
-        return constraint.arguments[TypeCtrArg.FUNCTION].content
+        return constraint.arguments[function].content
     if isinstance(constraint, Constraint):
         return ECtr(constraint)
     return constraint
 
 
+class _Flat(list):
+    """List returned by flatten_constraints(), known to need no flattening."""
+
+
 def flatten_constraints(constraints: List[Any]) -> List[Any]:
     """
     Flatten a nested list of constraints into a single list.
@@ -42,12 +93,27 @@ def flatten_constraints(constraints: List[Any]) -> List[Any]:
     :param constraints: List of constraints (possibly nested)
     :return: Flat list of constraints
     """
+    # Algorithms flatten their input, then pass it down to functions that
+    # flatten it again
+    if isinstance(constraints, _Flat):
+        return _Flat(constraints)
+    return _Flat(_flatten(constraints))
+
+
+def _flatten(constraints: List[Any]) -> List[Any]:
     result = []
-    for c in constraints:
-        if isinstance(c, list):
-            result.extend(flatten_constraints(c))
-        elif c is not None:
-            result.append(_normalize_constraint(c))
+    # Walked with a stack of iterators in one pass, rather than a recursive
+    # call (and a list to copy) per nested list
+    stack = [iter(constraints)]
+    while stack:
+        for c in stack[-1]:
+            if isinstance(c, list):
+                stack.append(iter(c))
+                break
+            if c is not None:
+                result.append(_normalize_constraint(c))
+        else:
+            stack.pop()
     return result
 
 
@@ -59,28 +125,199 @@ def get_constraint_variables(constraint) -> List:
     :return: List of variables in the constraint
     """
     from pycsp3.classes.main.variables import Variable
-    from pycsp3.tools.utilities import flatten
+    from pycsp3.classes.nodes import Node
 
     variables = []
 
-    def extract_vars(obj):
+    # Walked with an explicit stack, pushed in reverse so that variables
+    # come out in the order they appear in the constraint
+    stack = [constraint]
+    while stack:
+        obj = stack.pop()
         if isinstance(obj, Variable):
             variables.append(obj)
+        elif isinstance(obj, Node):
+            # Intension constraint (expression tree)
+            variables.extend(obj.list_of_vars())
         elif hasattr(obj, 'arguments'):
             # Constraint with arguments
-            for arg in obj.arguments.values():
-                if hasattr(arg, 'content'):
-                    extract_vars(arg.content)
-                else:
-                    extract_vars(arg)
+            stack.extend(reversed([arg.content if hasattr(arg, 'content') else arg
+                                   for arg in obj.arguments.values()]))
         elif hasattr(obj, 'constraint'):
-            extract_vars(obj.constraint)
+            stack.append(obj.constraint)
         elif isinstance(obj, (list, tuple)):
-            for item in obj:
-                extract_vars(item)
+            stack.extend(reversed(obj))
+    return list(dict.fromkeys(variables))
+
 
-    extract_vars(constraint)
-    return list(set(variables))
+@contextmanager
+def pycsp3_scope() -> Iterator[None]:
+    """
+    Run a block on an empty PyCSP3 model, restoring the current one on exit.
+
+    Variables, constraints, objectives, auxiliary-variable caches and the
+    compilation state are set aside on entry and put back on exit, so a model
+    built in the block (e.g. one example among several run back-to-back) is
+    discarded without clear(), and the model of the caller is left intact.
+
+    Example:
+        >>> with pycsp3_scope():
+        ...     x = VarArray(size=2, dom=range(3))
+        ...     conflict = mus_naive([x[0] == 1, x[0] == 2])
+    """
+    from pycsp3_explain.solvers.wrapper import disable_pycsp3_atexit
+    from pycsp3.classes.entities import (
+        CtrEntities,
+        VarEntities,
+        ObjEntities,
+        AnnEntities,
+    )
+    from pycsp3.classes.main.variables import Variable
+    from pycsp3.classes.main.constraints import auxiliary
+    from pycsp3.compiler import Compilation
+
+    disable_pycsp3_atexit()
+
+    saved_ctr_items = CtrEntities.items[:]
+    saved_obj_items = ObjEntities.items[:]
+    saved_ann_items = AnnEntities.items[:]
+    saved_ann_types = AnnEntities.items_types[:] if hasattr(AnnEntities, "items_types") else []
+    saved_var_items = VarEntities.items[:]
+    saved_var_to_evar = VarEntities.varToEVar.copy()
+    saved_var_to_evar_array = VarEntities.varToEVarArray.copy()
+    saved_prefix_to_evar_array = VarEntities.prefixToEVarArray.copy()
+    saved_name2obj = Variable.name2obj.copy()
+    saved_arrays = Variable.arrays[:] if hasattr(Variable, "arrays") else []
+
+    saved_compilation = {
+        "done": Compilation.done,
+        "model": Compilation.model,
+        "string_model": Compilation.string_model,
+        "string_data": Compilation.string_data,
+        "data": Compilation.data,
+        "solve": Compilation.solve,
+        "stopwatch": Compilation.stopwatch,
+        "stopwatch2": Compilation.stopwatch2,
+        "pathname": Compilation.pathname,
+        "filename": Compilation.filename,
+    }
+
+    aux = auxiliary()
+    saved_aux_intro = aux._introduced_variables
+    saved_aux_collected = aux._collected_constraints
+    saved_aux_raw = aux._collected_raw_constraints
+    saved_aux_ext = aux._collected_extension_constraints
+    saved_aux_cache = aux.cache
+    saved_aux_cache_ints = aux.cache_ints.copy()
+    saved_aux_cache_nodes = aux.cache_nodes.copy()
+
+    try:
+        CtrEntities.items = []
+        ObjEntities.items = []
+        AnnEntities.items = []
+        if hasattr(AnnEntities, "items_types"):
+            AnnEntities.items_types = []
+        VarEntities.items = []
+        VarEntities.varToEVar = {}
+        VarEntities.varToEVarArray = {}
+        VarEntities.prefixToEVarArray = {}
+        Variable.name2obj = {}
+        if hasattr(Variable, "arrays"):
+            Variable.arrays = []
+
+        aux._introduced_variables = []
+        aux._collected_constraints = []
+        aux._collected_raw_constraints = []
+        aux._collected_extension_constraints = []
+        aux.cache = []
+        aux.cache_ints = {}
+        aux.cache_nodes = {}
+
+        Compilation.done = False
+        Compilation.model = None
+        Compilation.string_model = None
+        Compilation.string_data = None
+        Compilation.data = None
+        Compilation.solve = None
+        Compilation.stopwatch = None
+        Compilation.stopwatch2 = None
+        Compilation.pathname = ""
+        Compilation.filename = ""
+
+        yield
+    finally:
+        CtrEntities.items = saved_ctr_items
+        ObjEntities.items = saved_obj_items
+        AnnEntities.items = saved_ann_items
+        if hasattr(AnnEntities, "items_types"):
+            AnnEntities.items_types = saved_ann_types
+        VarEntities.items = saved_var_items
+        VarEntities.varToEVar = saved_var_to_evar
+        VarEntities.varToEVarArray = saved_var_to_evar_array
+        VarEntities.prefixToEVarArray = saved_prefix_to_evar_array
+        Variable.name2obj = saved_name2obj
+        if hasattr(Variable, "arrays"):
+            Variable.arrays = saved_arrays
+
+        aux._introduced_variables = saved_aux_intro
+        aux._collected_constraints = saved_aux_collected
+        aux._collected_raw_constraints = saved_aux_raw
+        aux._collected_extension_constraints = saved_aux_ext
+        aux.cache = saved_aux_cache
+        aux.cache_ints = saved_aux_cache_ints
+        aux.cache_nodes = saved_aux_cache_nodes
+
+        Compilation.done = saved_compilation["done"]
+        Compilation.model = saved_compilation["model"]
+        Compilation.string_model = saved_compilation["string_model"]
+        Compilation.string_data = saved_compilation["string_data"]
+        Compilation.data = saved_compilation["data"]
+        Compilation.solve = saved_compilation["solve"]
+        Compilation.stopwatch = saved_compilation["stopwatch"]
+        Compilation.stopwatch2 = saved_compilation["stopwatch2"]
+        Compilation.pathname = saved_compilation["pathname"]
+        Compilation.filename = saved_compilation["filename"]
+
+
+def constraint_fingerprint(constraint: Any) -> str:
+    """
+    Build a structural fingerprint of a constraint.
+
+    Unlike id(c), the fingerprint only depends on what the constraint states
+    (its textual XCSP3-like form and the domains of its variables), so it is
+    stable across clear() and across Python processes.
+
+    :param constraint: A PyCSP3 constraint
+    :return: Fingerprint string
+    """
+    from pycsp3.classes.entities import ECtr
+    from pycsp3.classes.nodes import Node
+
+    c = _normalize_constraint(constraint)
+    if isinstance(c, Node):
+        text = str(c)
+        variables = list(c.scope())
+    else:
+        text = str(c.constraint) if isinstance(c, ECtr) else str(c)
+        variables = get_constraint_variables(c)
+
+    domains = ",".join(sorted(f"{v.id}:{v.dom}" for v in variables))
+    return f"{text}|{domains}"
+
+
+def _constraint_key(constraint: Any) -> Any:
+    """
+    Key matching a constraint with its structurally equal copies.
+
+    Subsets given to the verification functions may be rebuilt from an
+    equivalent model rather than taken from the soft list itself, so they
+    are matched against it by fingerprint; a constraint that cannot be
+    fingerprinted is matched by identity.
+    """
+    try:
+        return constraint_fingerprint(constraint)
+    except Exception:
+        return id(constraint)
 
 
 class ConstraintTracker:
@@ -89,6 +326,10 @@ class ConstraintTracker:
 
     This class maintains a mapping between constraints and their indices,
     which is useful for tracking which constraints are in a MUS/MCS.
+
+    Tags (see tag) belong to the tracker: nothing is written on the
+    constraints, so several trackers over the same constraints do not
+    interfere.
     """
 
     def __init__(self, soft: List[Any], hard: Optional[List[Any]] = None):
@@ -101,30 +342,76 @@ class ConstraintTracker:
         self.soft = flatten_constraints(soft)
         self.hard = flatten_constraints(hard) if hard else []
 
-        # Create index mappings
+        # Indices are dense, so self.soft maps them to constraints; only
+        # the reverse mapping needs a dict
         self._soft_to_idx: Dict[int, int] = {}
-        self._idx_to_soft: Dict[int, Any] = {}
 
         for i, c in enumerate(self.soft):
             self._soft_to_idx[id(c)] = i
-            self._idx_to_soft[i] = c
 
-    def get_index(self, constraint) -> Optional[int]:
+    def get_index(self, constraint: Any) -> Optional[int]:
         """Get the index of a soft constraint."""
         return self._soft_to_idx.get(id(constraint))
 
+    def tag(self, constraint: Any) -> int:
+        """
+        Get the integer tag of a constraint: its index if it is a soft
+        constraint of this tracker, else id(constraint).
+
+        Tags of any constraints can be used together as set/dict keys.
+        """
+        i = self._soft_to_idx.get(id(constraint))
+        return i if i is not None else id(constraint)
+
+    def get_indices(self, constraints: List[Any]) -> List[int]:
+        """Get the indices of the soft constraints in a subset (others are skipped)."""
+        indices = []
+        for c in constraints:
+            i = self.get_index(c)
+            if i is not None:
+                indices.append(i)
+        return indices
+
     def get_constraint(self, index: int) -> Optional[Any]:
         """Get a soft constraint by its index."""
-        return self._idx_to_soft.get(index)
+        if 0 <= index < len(self.soft):
+            return self.soft[index]
+        return None
 
     def get_subset(self, indices: List[int]) -> List[Any]:
         """Get a subset of soft constraints by their indices."""
-        return [self._idx_to_soft[i] for i in indices if i in self._idx_to_soft]
+        n = len(self.soft)
+        return [self.soft[i] for i in indices if 0 <= i < n]
 
     def get_complement(self, indices: List[int]) -> List[Any]:
         """Get the complement of a subset (all soft constraints not in indices)."""
-        index_set = set(indices)
-        return [c for i, c in self._idx_to_soft.items() if i not in index_set]
+        n = len(self.soft)
+        excluded = bytearray(n)
+        for i in indices:
+            if 0 <= i < n:
+                excluded[i] = 1
+        return [c for c, out in zip(self.soft, excluded, strict=True) if not out]
+
+    def get_mask(self, indices: List[int]) -> int:
+        """Get the bitmask of a subset (bit i set for soft constraint i; others are skipped)."""
+        mask = 0
+        for i in indices:
+            if 0 <= i < len(self.soft):
+                mask |= 1 << i
+        return mask
+
+    def get_subset_mask(self, mask: int) -> List[Any]:
+        """Get the soft constraints of a bitmask, in order."""
+        return [c for i, c in enumerate(self.soft) if mask >> i & 1]
+
+    def get_complement_mask(self, mask: int) -> int:
+        """Get the bitmask of the complement of a subset given as a bitmask."""
+        return self.full_mask & ~mask
+
+    @property
+    def full_mask(self) -> int:
+        """Bitmask of all soft constraints."""
+        return (1 << len(self.soft)) - 1
 
     @property
     def num_soft(self) -> int:
@@ -137,6 +424,57 @@ class ConstraintTracker:
         return list(range(self.num_soft))
 
 
+class SelectorModel:
+    """
+    Soft constraints posted once behind selector (assumption) literals.
+
+    Each soft constraint c_i is guarded as selectors[i] -> c_i, and a subset
+    is checked by assuming selectors[i] == 1 for its indices. Building the
+    model once and passing it to several assumption-based algorithms
+    (mus, mss, ...) avoids declaring a new array of selector variables, and
+    new guards, for every call.
+    """
+
+    def __init__(self, soft: List[Any], hard: List[Any], selectors: List[Any], guards: List[Any]):
+        self.soft = soft
+        self.hard = hard
+        self.selectors = selectors
+        self.guards = guards
+
+    def assumptions(self, indices: List[int]) -> List[Any]:
+        """
+        Build the assumption literals enabling the given soft constraints.
+
+        :param indices: Indices of the soft constraints to enable
+        :return: List of selectors[i] == 1 constraints
+        """
+        return [self.selectors[i] == 1 for i in indices]
+
+    def __len__(self) -> int:
+        return len(self.soft)
+
+
+def post_with_selectors(
+    soft: List[Any],
+    hard: Optional[List[Any]] = None,
+    name_prefix: str = "sel"
+) -> SelectorModel:
+    """
+    Declare selector literals for soft constraints once, for reuse across calls.
+
+    Example:
+        >>> sels = post_with_selectors(constraints)
+        >>> conflict = mus(sels)
+        >>> satisfiable = mss(sels)
+
+    :param soft: List of soft constraints
+    :param hard: List of hard constraints
+    :param name_prefix: Prefix of the selector variable array
+    :return: A SelectorModel accepted in place of soft by mus() and mss()
+    """
+    return SelectorModel(*make_assump_model(soft, hard, name_prefix))
+
+
 def make_assump_model(
     soft: List[Any],
     hard: Optional[List[Any]] = None,
@@ -146,8 +484,12 @@ def make_assump_model(
     Build assumption indicators and implication constraints for soft constraints.
 
     Returns (soft, hard, assumptions, guard_constraints) where guard constraints
-    are of the form a -> c for each soft constraint c.
+    are of the form a -> c for each soft constraint c. If soft is a
+    SelectorModel, its existing selectors and guards are returned.
     """
+    if isinstance(soft, SelectorModel):
+        return soft.soft, soft.hard, soft.selectors, soft.guards
+
     soft = flatten_constraints(soft)
     hard = flatten_constraints(hard) if hard else []
 
@@ -158,7 +500,161 @@ def make_assump_model(
 
     assumptions = VarArray(size=len(soft), dom=range(2), id=_next_assump_name(name_prefix))
     guard_constraints = [imply(a, c) for a, c in zip(assumptions, soft)]
-    return soft, hard, list(assumptions), guard_constraints
+    return soft, hard + _auxiliary_definitions(), list(assumptions), guard_constraints
+
+
+def _auxiliary_definitions() -> List[Any]:
+    """
+    Take the definitions of the auxiliary variables PyCSP3 introduced so far.
+
+    A global constraint inside an expression (e.g. imply(a, AllDifferent(x)))
+    is replaced by an auxiliary variable, whose definition PyCSP3 only posts
+    with the next satisfy(). Every check restores the posted constraints
+    afterwards, so the definitions have to be posted with each check, as
+    hard constraints; otherwise the auxiliary variables are free.
+
+    PyCSP3 also reuses the auxiliary variable of an equal constraint replaced
+    before; once its definition is taken, that variable must not be reused
+    (guards built twice over one constraint would leave it free), so the
+    replacements are forgotten too.
+    """
+    from pycsp3.classes.main.constraints import auxiliary
+
+    collected = auxiliary()
+    definitions = [replaced == aux for replaced, aux in collected.get_collected_and_clear()]
+    definitions += collected.get_collected_raw_and_clear()
+    collected.cache = []
+    return flatten_constraints(definitions)
+
+
+def _num_variables(constraint: Any) -> int:
+    """Number of variables of a constraint, 0 if they cannot be extracted."""
+    try:
+        return len(get_constraint_variables(constraint))
+    except Exception:
+        return 0
+
+
+def _domain_comparison(constraint: Any) -> Optional[Tuple[Any, List[int], int]]:
+    """
+    Read a comparison of a variable with an integer (e.g. x >= 0 or 3 < x).
+
+    :return: (test, values, value) where test(v, value) tells if the
+             constraint holds for the value v of the variable, and values
+             are the values of its domain; None for any other constraint
+    """
+    from pycsp3.classes.nodes import Node, TypeNode
+
+    tests = {TypeNode.LT: operator.lt, TypeNode.LE: operator.le, TypeNode.GE: operator.ge,
+             TypeNode.GT: operator.gt, TypeNode.EQ: operator.eq, TypeNode.NE: operator.ne}
+    mirrored = {TypeNode.LT: TypeNode.GT, TypeNode.LE: TypeNode.GE, TypeNode.GE: TypeNode.LE,
+                TypeNode.GT: TypeNode.LT, TypeNode.EQ: TypeNode.EQ, TypeNode.NE: TypeNode.NE}
+    if not isinstance(constraint, Node) or constraint.type not in mirrored or len(constraint.cnt) != 2:
+        return None
+    left, right = constraint.cnt
+    if left.type == TypeNode.VAR and right.type == TypeNode.INT:
+        variable, value, relation = left.cnt, right.cnt, constraint.type
+    elif left.type == TypeNode.INT and right.type == TypeNode.VAR:
+        variable, value, relation = right.cnt, left.cnt, mirrored[constraint.type]
+    else:
+        return None
+
+    try:
+        return tests[relation], variable.dom.all_values(), value
+    except Exception:
+        return None
+
+
+def _entailed_by_domain(constraint: Any) -> bool:
+    """
+    Check, without the solver, if a constraint holds for every value of its
+    variable (e.g. x >= 0 with x in range(10)).
+
+    Only comparisons of a variable with an integer are recognized; any other
+    constraint is reported as not entailed.
+    """
+    comparison = _domain_comparison(constraint)
+    if comparison is None:
+        return False
+    test, values, value = comparison
+    try:
+        if test in (operator.eq, operator.ne):
+            return all(test(v, value) for v in values)
+        # An order holds for every value iff it holds at both ends of the domain
+        return bool(test(min(values), value) and test(max(values), value))
+    except Exception:
+        return False
+
+
+def _refuted_by_domain(constraint: Any) -> bool:
+    """
+    Check, without the solver, if a constraint holds for no value of its
+    variable (e.g. x < 0 with x in range(10)): it is then UNSAT on its own.
+
+    Only comparisons of a variable with an integer are recognized; any other
+    constraint is reported as not refuted.
+    """
+    comparison = _domain_comparison(constraint)
+    if comparison is None:
+        return False
+    test, values, value = comparison
+    try:
+        if test in (operator.eq, operator.ne):
+            return not any(test(v, value) for v in values)
+        # An order holds for no value iff it fails at both ends of the domain
+        return not test(min(values), value) and not test(max(values), value)
+    except Exception:
+        return False
+
+
+def _partition_by_variables(soft: List[Any], hard: List[Any]) -> List[Tuple[List[int], List[int]]]:
+    """
+    Split constraints into groups that share no variable.
+
+    Hard constraints sharing no variable with a soft constraint join every
+    group, so each group is satisfiable only if they are. If the variables
+    of some constraint cannot be read, everything forms a single group.
+
+    :param soft: Flat list of soft constraints
+    :param hard: Flat list of hard constraints
+    :return: (soft indices, hard indices) of each group, in the order of
+             their first soft constraint
+    """
+    single = [(list(range(len(soft))), list(range(len(hard))))]
+    parent: Dict[str, str] = {}
+
+    def find(name: str) -> str:
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    scopes = []
+    for c in soft + hard:
+        try:
+            names = [x.id for x in get_constraint_variables(c)]
+        except Exception:
+            return single
+        if not names:
+            return single
+        for name in names:
+            parent.setdefault(name, name)
+        root = find(names[0])
+        for name in names[1:]:
+            parent[find(name)] = root
+        scopes.append(names)
+
+    groups: Dict[str, Tuple[List[int], List[int]]] = {}
+    for i in range(len(soft)):
+        groups.setdefault(find(scopes[i][0]), ([], []))[0].append(i)
+    shared = []
+    for j in range(len(hard)):
+        group = groups.get(find(scopes[len(soft) + j][0]))
+        if group is None:
+            shared.append(j)
+        else:
+            group[1].append(j)
+    return [(soft_indices, sorted(hard_indices + shared)) for soft_indices, hard_indices in groups.values()]
 
 
 def order_by_num_variables(constraints: List[Any], descending: bool = True) -> List[Any]:
@@ -169,13 +665,7 @@ def order_by_num_variables(constraints: List[Any], descending: bool = True) -> L
     :param descending: If True, constraints with more variables come first
     :return: Ordered list of constraints
     """
-    def count_vars(c):
-        try:
-            return len(get_constraint_variables(c))
-        except:
-            return 0
-
-    return sorted(constraints, key=count_vars, reverse=descending)
+    return sorted(constraints, key=_num_variables, reverse=descending)
 
 
 def explain_unsat(
@@ -190,19 +680,27 @@ def explain_unsat(
 
     If soft is None, constraints are pulled from the current model via posted().
     The algorithm can be a string key or a callable.
+
+    With ACE, mus_naive is run on the core ACE reports rather than on all
+    soft constraints. The core is checked first; all soft constraints are
+    kept if it is SAT.
     """
     from pycsp3 import posted
-    from pycsp3_explain.solvers.wrapper import is_unsat
+    from pycsp3_explain.solvers.wrapper import Session, SolveResult, current_session, is_unsat
+    from pycsp3_explain.explain._oracle import _unsat_core
+    from pycsp3_explain.explain.mus import mus_naive
+
+    session = current_session()
+    if session is None:
+        # The core run and the algorithm share their verdicts
+        with Session():
+            return explain_unsat(algorithm, soft, hard, check, **kwargs)
 
     soft = posted() if soft is None else soft
     soft = flatten_constraints(soft)
     hard = flatten_constraints(hard) if hard else []
-
-    if check:
-        solver = kwargs.get("solver", "ace")
-        verbose = kwargs.get("verbose", -1)
-        if not is_unsat(soft, hard, solver=solver, verbose=verbose):
-            raise ValueError("explain_unsat: model must be UNSAT")
+    solver = kwargs.get("solver", "ace")
+    verbose = kwargs.get("verbose", -1)
 
     if isinstance(algorithm, str):
         key = algorithm.lower()
@@ -260,4 +758,17 @@ def explain_unsat(
             raise ValueError(f"Unknown algorithm '{algorithm}'. Expected one of: {options}")
         algorithm = algo_map[key]
 
+    core = None
+    if algorithm is mus_naive and solver.lower() == "ace":
+        core = _unsat_core(soft, hard, solver, verbose)
+    if core is not None:
+        # The core run proved soft + hard UNSAT; deletion starts from the
+        # core once a solve has confirmed it
+        session.record(hard + soft, solver, SolveResult.UNSAT)
+        if is_unsat(core, hard, solver=solver, verbose=verbose):
+            soft = core
+    elif check:
+        if not is_unsat(soft, hard, solver=solver, verbose=verbose):
+            raise ValueError("explain_unsat: model must be UNSAT")
+
     return algorithm(soft, hard, **kwargs)
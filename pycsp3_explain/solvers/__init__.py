@@ -5,20 +5,43 @@ This module provides wrappers around PyCSP3 solvers for checking
 satisfiability of constraint subsets.
 """
 
-from pycsp3_explain.solvers.wrapper import (
-    SolveResult,
-    solve_subset,
-    solve_subset_with_core,
-    is_sat,
-    is_unsat,
-    disable_pycsp3_atexit,
-)
-
-__all__ = [
-    "SolveResult",
-    "solve_subset",
-    "solve_subset_with_core",
-    "is_sat",
-    "is_unsat",
-    "disable_pycsp3_atexit",
-]
+from typing import Any, List
+
+# Public names and the modules defining them, imported on first access
+# (PEP 562)
+_LAZY_IMPORTS = {
+    "SolveResult": "pycsp3_explain.solvers.wrapper",
+    "Session": "pycsp3_explain.solvers.wrapper",
+    "QUICK_START_JVM_OPTIONS": "pycsp3_explain.solvers.wrapper",
+    "current_session": "pycsp3_explain.solvers.wrapper",
+    "solve_subset": "pycsp3_explain.solvers.wrapper",
+    "solve_subset_with_core": "pycsp3_explain.solvers.wrapper",
+    "solve_subset_with_values": "pycsp3_explain.solvers.wrapper",
+    "is_sat": "pycsp3_explain.solvers.wrapper",
+    "is_unsat": "pycsp3_explain.solvers.wrapper",
+    "find_subset": "pycsp3_explain.solvers.wrapper",
+    "solve_subsets": "pycsp3_explain.solvers.wrapper",
+    "disable_pycsp3_atexit": "pycsp3_explain.solvers.wrapper",
+    "PersistentSatCache": "pycsp3_explain.solvers.cache",
+    "set_persistent_cache": "pycsp3_explain.solvers.cache",
+    "get_persistent_cache": "pycsp3_explain.solvers.cache",
+    "default_cache_path": "pycsp3_explain.solvers.cache",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
+
+__all__ = list(_LAZY_IMPORTS)
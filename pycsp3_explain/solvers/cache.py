@@ -0,0 +1,183 @@
+"""
+Persistent cache of satisfiability verdicts.
+
+Explanation algorithms issue many overlapping SAT checks on subsets of the
+same constraints, and the examples re-run several algorithms on identical
+models. This module stores SAT/UNSAT verdicts on disk (in an SQLite
+database), keyed by a hash of the structural fingerprints of the
+constraints, so that repeated checks skip the solver entirely - also across
+clear() and across runs.
+
+The cache is disabled by default. Enable it by setting the environment
+variable PYCSP3_EXPLAIN_CACHE to the path of the cache file (or to 1 for
+the default location, see default_cache_path), or by calling
+set_persistent_cache(path).
+"""
+
+import hashlib
+import os
+import sqlite3
+from typing import List, Any, Optional
+
+CACHE_ENV_VAR = "PYCSP3_EXPLAIN_CACHE"
+
+# Values of PYCSP3_EXPLAIN_CACHE selecting the default location
+_ENABLE_VALUES = ("1", "true", "yes", "on")
+
+# Seconds a writer waits for another process to release the database
+_LOCK_TIMEOUT = 30.0
+
+# PyCSP3 version, read once by _solver_version
+_SOLVER_VERSION: Optional[str] = None
+
+
+def _solver_version() -> str:
+    """
+    Version of PyCSP3, which bundles the ACE and Choco jars it runs.
+
+    Keys include it, so verdicts are not carried over to other solver
+    versions.
+    """
+    global _SOLVER_VERSION
+    if _SOLVER_VERSION is None:
+        try:
+            from importlib.metadata import version
+            _SOLVER_VERSION = version("pycsp3")
+        except Exception:
+            _SOLVER_VERSION = ""
+    return _SOLVER_VERSION
+
+
+class PersistentSatCache:
+    """
+    Disk-backed mapping from constraint sets to SAT/UNSAT verdicts.
+
+    The database is opened for each access, so the cache is safe to use
+    from forked worker processes and needs no explicit close. SQLite locks
+    the file, so verdicts written by concurrent workers are all kept. Any
+    database error is treated as a cache miss: the cache never makes a solve
+    fail.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: Path of the SQLite database file
+        """
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating it and its table if needed."""
+        db = sqlite3.connect(self.path, timeout=_LOCK_TIMEOUT)
+        # Readers do not block the writer (nor the writer the readers)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS verdicts (key TEXT PRIMARY KEY, sat INTEGER NOT NULL)")
+        return db
+
+    @staticmethod
+    def make_key(constraints: List[Any], solver: str) -> str:
+        """
+        Compute the cache key of a set of constraints.
+
+        The key is order-independent: only the set of constraints (soft and
+        hard together) determines satisfiability. It also depends on the
+        solver and on the PyCSP3 version, which fixes the solver jars.
+
+        :param constraints: Flat list of constraints
+        :param solver: Solver name
+        :return: Hex digest identifying the constraint set
+        """
+        from pycsp3_explain.explain.utils import constraint_fingerprint
+
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(solver.lower().encode())
+        digest.update(b"\0")
+        digest.update(_solver_version().encode())
+        for fingerprint in sorted({constraint_fingerprint(c) for c in constraints}):
+            digest.update(b"\0")
+            digest.update(fingerprint.encode())
+        return digest.hexdigest()
+
+    def get(self, key: str, verbose: int = -1) -> Optional[bool]:
+        """
+        Look up a verdict.
+
+        :param key: Key from make_key
+        :param verbose: Verbosity level (-1 = silent); failures are reported at 0
+        :return: True if SAT, False if UNSAT, None if unknown
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            db = self._connect()
+            try:
+                row = db.execute("SELECT sat FROM verdicts WHERE key = ?", (key,)).fetchone()
+            finally:
+                db.close()
+        except (sqlite3.Error, OSError) as e:
+            if verbose >= 0:
+                print(f"SAT cache: cannot read {self.path}: {e}")
+            return None
+        return None if row is None else bool(row[0])
+
+    def put(self, key: str, sat: bool, verbose: int = -1) -> None:
+        """
+        Record a verdict.
+
+        :param key: Key from make_key
+        :param sat: True if SAT, False if UNSAT
+        :param verbose: Verbosity level (-1 = silent); failures are reported at 0
+        """
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = self._connect()
+            try:
+                with db:
+                    db.execute("INSERT OR REPLACE INTO verdicts VALUES (?, ?)", (key, int(sat)))
+            finally:
+                db.close()
+        except (sqlite3.Error, OSError) as e:
+            if verbose >= 0:
+                print(f"SAT cache: cannot write {self.path}: {e}")
+
+
+# Sentinel: follow the PYCSP3_EXPLAIN_CACHE environment variable
+_FROM_ENV = object()
+_cache_path: Any = _FROM_ENV
+
+
+def set_persistent_cache(path: Optional[str]) -> None:
+    """
+    Enable the persistent cache at the given path, or disable it with None.
+
+    This overrides the PYCSP3_EXPLAIN_CACHE environment variable.
+
+    :param path: Path of the SQLite database file, or None
+    """
+    global _cache_path
+    _cache_path = path
+
+
+def default_cache_path() -> str:
+    """
+    Return the cache file used when PYCSP3_EXPLAIN_CACHE is set to 1.
+
+    The file is sat.db in a pycsp3_explain directory under $XDG_CACHE_HOME
+    (~/.cache when unset).
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pycsp3_explain", "sat.db")
+
+
+def get_persistent_cache() -> Optional[PersistentSatCache]:
+    """
+    Return the active persistent cache, or None if caching is disabled.
+    """
+    if _cache_path is _FROM_ENV:
+        path = os.environ.get(CACHE_ENV_VAR)
+        if path and path.lower() in _ENABLE_VALUES:
+            path = default_cache_path()
+    else:
+        path = _cache_path
+    return PersistentSatCache(path) if path else None
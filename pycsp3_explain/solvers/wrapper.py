@@ -5,15 +5,23 @@ This module provides utilities for solving constraint models with subsets
 of constraints, which is essential for MUS/MSS/MCS computation.
 """
 
+import functools
 import os
+import sys
 import tempfile
 import traceback
 import atexit
 import re
-from typing import List, Any, Optional, Tuple
+import uuid
+from contextlib import contextmanager, nullcontext, suppress
+from types import TracebackType
+from typing import List, Any, Optional, Tuple, Dict, FrozenSet, Set, ContextManager, Iterable, Iterator, Generator, Callable, Type, TypeVar, ParamSpec, TYPE_CHECKING
 from enum import Enum
 
-from pycsp3_explain.explain.utils import flatten_constraints
+from pycsp3_explain.solvers.cache import get_persistent_cache
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
 
 
 class SolveResult(Enum):
@@ -25,6 +33,9 @@ class SolveResult(Enum):
 
 
 _ANSI_ESCAPE = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
+_CORE_INDEX = re.compile(r"(?<!\()c(\d+)(?=\()")
+_ANY_CORE_INDEX = re.compile(r"c(\d+)")
+_CORE_SCOPE = re.compile(r"(?<![\w\]])c\d+\(([^()]*)\)")
 
 
 def _strip_ansi(text: str) -> str:
@@ -35,19 +46,255 @@ def _parse_core_indices(core_line: Optional[str]) -> List[int]:
     if not core_line:
         return []
     cleaned = _strip_ansi(core_line)
-    matches = re.findall(r"(?<!\()c(\d+)(?=\()", cleaned)
+    matches = _CORE_INDEX.findall(cleaned)
     if not matches:
-        matches = re.findall(r"c(\d+)", cleaned)
+        matches = _ANY_CORE_INDEX.findall(cleaned)
     return [int(m) for m in matches]
 
 
+def _parse_core_scopes(core_line: Optional[str]) -> List[FrozenSet[str]]:
+    """Scope (variable names) of each constraint of a core line, e.g. c2(x[0],x[2])."""
+    if not core_line:
+        return []
+    cleaned = _strip_ansi(core_line)
+    return [
+        frozenset(name.strip() for name in scope.split(",") if name.strip())
+        for scope in _CORE_SCOPE.findall(cleaned)
+    ]
+
+
+# JVM options trading peak JIT performance for a faster start: on the small
+# models checked while explaining, ACE spends most of its run starting up
+QUICK_START_JVM_OPTIONS = "-XX:TieredStopAtLevel=1 -XX:+UseSerialGC"
+
+
 def _normalize_constraints(constraints: Optional[List[Any]]) -> List[Any]:
     if constraints is None:
         return []
+    from pycsp3_explain.explain.utils import flatten_constraints, _Flat
+
+    if isinstance(constraints, _Flat):
+        # Only read here, so no copy is needed
+        return constraints
     items = list(constraints) if isinstance(constraints, (list, tuple)) else [constraints]
     return flatten_constraints(items)
 
 
+class Session:
+    """
+    Solving session shared by consecutive satisfiability checks.
+
+    ACE is driven through its command line, so every check is a separate
+    solver run. What a session shares is the work: the verdict of every
+    subset checked inside the session is remembered, and checks of the same
+    constraint set (in any order, hard and soft together) are answered
+    without calling the solver again. Verifying an MSS and then the matching
+    MCS, for instance, issues the same checks twice. Satisfiability is
+    monotone, so a check of a superset of an UNSAT set, or of a subset of a
+    SAT set, is answered as well: deletion and growing loops mostly check
+    sets one constraint away from a set checked before.
+
+    Sessions are context managers; while a session is active, every check
+    made through this module (by any algorithm) goes through it.
+
+    Example:
+        >>> with Session("ace") as session:
+        ...     is_mss(mss_result, soft, session=session)
+        ...     is_mcs(mcs_result, soft, session=session)
+
+    Constraints checked in a session are kept alive until the session is
+    discarded, so their id() cannot be reused by other objects.
+
+    Every solver run of a session also starts a new JVM; jvm_options (for
+    instance QUICK_START_JVM_OPTIONS) are passed to those JVMs.
+    """
+
+    def __init__(self, solver: str = "ace", verbose: int = -1, jvm_options: Optional[str] = None):
+        """
+        :param solver: Default solver name of the session
+        :param verbose: Default verbosity level of the session
+        :param jvm_options: Extra JVM options of the solver runs made in the session
+        """
+        self.solver = solver
+        self.verbose = verbose
+        self.jvm_options = jvm_options
+        self.solver_calls = 0
+        self.cache_hits = 0
+        self._verdicts: Dict[Tuple[str, FrozenSet[int]], SolveResult] = {}
+        # Minimal UNSAT and maximal SAT sets recorded for each solver, which
+        # decide every superset (subset) by containment
+        self._unsat_sets: Dict[str, List[FrozenSet[int]]] = {}
+        self._sat_sets: Dict[str, List[FrozenSet[int]]] = {}
+        self._correction_sets: Dict[Tuple[str, Tuple[int, ...], FrozenSet[int]], List[Set[int]]] = {}
+        self._pinned: Dict[int, Any] = {}
+
+    def __enter__(self) -> "Session":
+        _SESSION_STACK.append(self)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        tb: Optional[TracebackType]
+    ) -> None:
+        # Sessions may be re-entered, so remove the innermost occurrence
+        for i in range(len(_SESSION_STACK) - 1, -1, -1):
+            if _SESSION_STACK[i] is self:
+                del _SESSION_STACK[i]
+                break
+
+    @staticmethod
+    def _identity(constraint: Any) -> Any:
+        # Normalization wraps global constraints in a fresh ECtr on each call;
+        # the wrapped Constraint object is the stable identity
+        return getattr(constraint, "constraint", constraint)
+
+    def _key(self, constraints: List[Any], solver: str) -> Tuple[str, FrozenSet[int]]:
+        return solver.lower(), frozenset(id(self._identity(c)) for c in constraints)
+
+    def lookup(self, constraints: List[Any], solver: str) -> Optional[SolveResult]:
+        """
+        Return the verdict of a constraint set, or None if it is unknown.
+
+        The verdict is the recorded one, or else the one implied by a
+        recorded UNSAT subset or SAT superset of the constraint set.
+
+        :param constraints: Flat list of constraints (hard + soft)
+        :param solver: Solver name
+        """
+        key = self._key(constraints, solver)
+        result = self._verdicts.get(key)
+        if result is None:
+            solver_key, ids = key
+            if any(unsat <= ids for unsat in self._unsat_sets.get(solver_key, ())):
+                result = SolveResult.UNSAT
+            elif any(ids <= sat for sat in self._sat_sets.get(solver_key, ())):
+                result = SolveResult.SAT
+        if result is not None:
+            self.cache_hits += 1
+        return result
+
+    def record(self, constraints: List[Any], solver: str, result: SolveResult) -> None:
+        """
+        Record the verdict of a constraint set (only SAT/UNSAT are kept).
+
+        :param constraints: Flat list of constraints (hard + soft)
+        :param solver: Solver name
+        :param result: Result of the check
+        """
+        if result not in (SolveResult.SAT, SolveResult.UNSAT):
+            return
+        for c in constraints:
+            identity = self._identity(c)
+            self._pinned[id(identity)] = identity
+        key = self._key(constraints, solver)
+        self._verdicts[key] = result
+
+        solver_key, ids = key
+        if result == SolveResult.UNSAT:
+            unsat_sets = self._unsat_sets.setdefault(solver_key, [])
+            if not any(unsat <= ids for unsat in unsat_sets):
+                unsat_sets[:] = [unsat for unsat in unsat_sets if not ids <= unsat]
+                unsat_sets.append(ids)
+        else:
+            sat_sets = self._sat_sets.setdefault(solver_key, [])
+            if not any(ids <= sat for sat in sat_sets):
+                sat_sets[:] = [sat for sat in sat_sets if not sat <= ids]
+                sat_sets.append(ids)
+
+    def correction_sets(self, soft: List[Any], hard: List[Any], solver: str) -> List[Set[int]]:
+        """
+        Return the correction sets found so far for a soft/hard split.
+
+        Correction sets do not depend on weights, so optimal MUS searches on
+        the same constraints (with any weights) share them. The returned list
+        is owned by the session: sets appended to it are kept.
+
+        :param soft: Flat list of soft constraints, in order (sets hold indices into it)
+        :param hard: Flat list of hard constraints
+        :param solver: Solver name
+        """
+        for c in hard + soft:
+            identity = self._identity(c)
+            self._pinned[id(identity)] = identity
+        key = (
+            solver.lower(),
+            tuple(id(self._identity(c)) for c in soft),
+            frozenset(id(self._identity(c)) for c in hard),
+        )
+        return self._correction_sets.setdefault(key, [])
+
+    def clear(self) -> None:
+        """Forget all recorded verdicts and correction sets."""
+        self._verdicts.clear()
+        self._unsat_sets.clear()
+        self._sat_sets.clear()
+        self._correction_sets.clear()
+        self._pinned.clear()
+
+
+_SESSION_STACK: List[Session] = []
+
+
+def current_session() -> Optional[Session]:
+    """Return the innermost active Session, or None."""
+    return _SESSION_STACK[-1] if _SESSION_STACK else None
+
+
+def session_scope(session: Optional[Session]) -> ContextManager:
+    """
+    Context manager activating the given session (no-op for None).
+
+    :param session: A Session or None
+    """
+    return session if session is not None else nullcontext()
+
+
+_P = ParamSpec("_P")
+_R = TypeVar("_R")
+
+
+def _memoized(func: Callable[_P, _R]) -> Callable[_P, _R]:
+    """
+    Decorator running an algorithm inside a private Session if none is active.
+
+    Algorithms check some subsets more than once (directly or through the
+    algorithms they call); the private session answers the repeated checks
+    without a solver run. It is discarded on return, with the constraints
+    it kept alive.
+    """
+    @functools.wraps(func)
+    def wrapper(*args: _P.args, **kwargs: _P.kwargs) -> _R:
+        if current_session() is not None:
+            return func(*args, **kwargs)
+        with Session():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def _jvm_options(options: Optional[str]) -> Iterator[None]:
+    """
+    Pass extra options to the JVMs started in the block (no-op for None).
+
+    The solver is launched by PyCSP3, so the options go through the
+    JAVA_TOOL_OPTIONS environment variable, restored on exit.
+    """
+    if not options:
+        yield
+        return
+    saved = os.environ.get("JAVA_TOOL_OPTIONS")
+    os.environ["JAVA_TOOL_OPTIONS"] = f"{saved} {options}" if saved else options
+    try:
+        yield
+    finally:
+        if saved is None:
+            del os.environ["JAVA_TOOL_OPTIONS"]
+        else:
+            os.environ["JAVA_TOOL_OPTIONS"] = saved
+
+
 def disable_pycsp3_atexit():
     """
     Disable PyCSP3's atexit callback to prevent errors when Compilation state is invalid.
@@ -84,18 +331,16 @@ def _solve_subset_internal(
     from pycsp3.classes.entities import CtrEntities, VarEntities, ObjEntities, AnnEntities
     from pycsp3.compiler import Compilation
 
-    # Save current constraint state (NOT variables - those are managed by the caller)
-    saved_ctr_items = CtrEntities.items[:]
-    saved_obj_items = ObjEntities.items[:]
-    saved_ann_items = AnnEntities.items[:]
-    saved_ann_types = AnnEntities.items_types[:] if hasattr(AnnEntities, 'items_types') else []
-
-    # Save and reset compilation state
-    saved_compilation_done = Compilation.done
-    saved_compilation_model = Compilation.model
-    saved_compilation_string_model = Compilation.string_model
+    # Save current constraint state (NOT variables - those are managed by the caller).
+    # The lists are replaced below, not modified, so keeping them needs no copy
+    saved_ctr_items = CtrEntities.items
+    saved_obj_items = ObjEntities.items
+    saved_ann_items = AnnEntities.items
+    # Older PyCSP3 versions keep no annotation types
+    saved_ann_types = getattr(AnnEntities, 'items_types', None)
 
     core_line = None
+    saved_contents: List[Tuple[Any, Any]] = []
 
     try:
         # Reset compilation state for fresh solve
@@ -107,7 +352,7 @@ def _solve_subset_internal(
         CtrEntities.items = []
         ObjEntities.items = []
         AnnEntities.items = []
-        if hasattr(AnnEntities, 'items_types'):
+        if saved_ann_types is not None:
             AnnEntities.items_types = []
 
         # Post constraints
@@ -118,7 +363,16 @@ def _solve_subset_internal(
         if not all_constraints:
             return SolveResult.SAT, None  # Empty model is SAT
 
-        satisfy(*all_constraints)
+        # Compilation compacts the arguments of the constraints in place
+        # (x[0], x[1], x[2] becomes x[]); they are put back afterwards so
+        # that fingerprints and printed constraints stay the same
+        for c in all_constraints:
+            arguments = getattr(getattr(c, 'constraint', None), 'arguments', None) or {}
+            saved_contents.extend((arg, arg.content) for arg in arguments.values())
+
+        # The comments and tags PyCSP3 reads from the calling source would be
+        # this line's; skipping them saves a stack inspection per check
+        satisfy(*all_constraints, no_comment_tags_extraction=True)
 
         # Build solver options
         solver_type = ACE if solver.lower() == "ace" else CHOCO
@@ -127,27 +381,25 @@ def _solve_subset_internal(
             options_str = f"-t={timeout}s"
 
         # Generate a unique temp filename for this solve
-        import uuid
         temp_filename = os.path.join(tempfile.gettempdir(), f"pycsp3_explain_{uuid.uuid4().hex}.xml")
 
         # Solve with explicit filename
-        status = solve(
-            solver=solver_type,
-            verbose=verbose,
-            options=options_str,
-            filename=temp_filename,
-            extraction=extraction,
-        )
+        session = current_session()
+        with _jvm_options(session.jvm_options if session is not None else None):
+            status = solve(
+                solver=solver_type,
+                verbose=verbose,
+                options=options_str,
+                filename=temp_filename,
+                extraction=extraction,
+            )
 
         if extraction:
             core_line = pycsp3_core()
 
         # Clean up temp file
-        try:
-            if os.path.exists(temp_filename):
-                os.remove(temp_filename)
-        except:
-            pass
+        with suppress(OSError):
+            os.remove(temp_filename)
 
         if status == SAT or status == OPTIMUM:
             return SolveResult.SAT, core_line
@@ -167,8 +419,10 @@ def _solve_subset_internal(
         CtrEntities.items = saved_ctr_items
         ObjEntities.items = saved_obj_items
         AnnEntities.items = saved_ann_items
-        if hasattr(AnnEntities, 'items_types'):
+        if saved_ann_types is not None:
             AnnEntities.items_types = saved_ann_types
+        for arg, content in saved_contents:
+            arg.content = content
 
         # Note: We don't restore Compilation state - it needs to stay as-is
         # for the solve result to be valid
@@ -194,6 +448,27 @@ def solve_subset(
     :param timeout: Optional timeout in seconds
     :return: SolveResult indicating SAT, UNSAT, or UNKNOWN
     """
+    soft = _normalize_constraints(soft)
+    hard = _normalize_constraints(hard)
+    constraints = hard + soft
+
+    session = current_session()
+    if session is not None:
+        cached = session.lookup(constraints, solver)
+        if cached is not None:
+            return cached
+
+    cache = get_persistent_cache()
+    key = None
+    if cache is not None:
+        key = cache.make_key(constraints, solver)
+        sat = cache.get(key, verbose)
+        if sat is not None:
+            result = SolveResult.SAT if sat else SolveResult.UNSAT
+            if session is not None:
+                session.record(constraints, solver, result)
+            return result
+
     result, _ = _solve_subset_internal(
         soft=soft,
         hard=hard,
@@ -202,9 +477,41 @@ def solve_subset(
         timeout=timeout,
         extraction=False,
     )
+
+    if session is not None:
+        session.solver_calls += 1
+        session.record(constraints, solver, result)
+
+    # Only definitive verdicts are cached (UNKNOWN may be a timeout)
+    if cache is not None and key is not None and result in (SolveResult.SAT, SolveResult.UNSAT):
+        cache.put(key, result == SolveResult.SAT, verbose)
     return result
 
 
+def _solve_with_core_line(
+    soft: List[Any],
+    hard: Optional[List[Any]] = None,
+    solver: str = "ace",
+    verbose: int = -1,
+    timeout: Optional[int] = None
+) -> Tuple[SolveResult, Optional[str]]:
+    """Solve with core extraction and return ACE's raw core line."""
+    result, core_line = _solve_subset_internal(
+        soft=soft,
+        hard=hard,
+        solver=solver,
+        verbose=verbose,
+        timeout=timeout,
+        extraction=True,
+    )
+
+    # Cores are not cached, but the call is counted like any other solve
+    session = current_session()
+    if session is not None:
+        session.solver_calls += 1
+    return result, core_line
+
+
 def solve_subset_with_core(
     soft: List[Any],
     hard: Optional[List[Any]] = None,
@@ -218,15 +525,44 @@ def solve_subset_with_core(
     :return: (SolveResult, core_indices) where core_indices refers to the
              constraint positions in hard + soft.
     """
-    result, core_line = _solve_subset_internal(
+    result, core_line = _solve_with_core_line(soft, hard, solver, verbose, timeout)
+    return result, _parse_core_indices(core_line)
+
+
+def solve_subset_with_values(
+    soft: List[Any],
+    hard: Optional[List[Any]] = None,
+    variables: Optional[List[Any]] = None,
+    solver: str = "ace",
+    verbose: int = -1,
+    timeout: Optional[int] = None
+) -> Tuple[SolveResult, Optional[List[Any]]]:
+    """
+    Solve a model with a subset of constraints and read back a solution.
+
+    The solver is always called, as a cached verdict comes without a
+    solution; the verdict is still recorded in the active session.
+
+    :param variables: Variables whose values are returned
+    :return: (SolveResult, values) where values holds the value of each
+             variable in the solution found, or None if there is none
+    """
+    result, _ = _solve_subset_internal(
         soft=soft,
         hard=hard,
         solver=solver,
         verbose=verbose,
         timeout=timeout,
-        extraction=True,
     )
-    return result, _parse_core_indices(core_line)
+
+    session = current_session()
+    if session is not None:
+        session.solver_calls += 1
+        session.record(_normalize_constraints(hard) + _normalize_constraints(soft), solver, result)
+
+    if result != SolveResult.SAT:
+        return result, None
+    return result, [x.value for x in (variables or [])]
 
 
 def is_sat(
@@ -265,3 +601,162 @@ def is_unsat(
     """
     result = solve_subset(soft, hard, solver, verbose)
     return result == SolveResult.UNSAT
+
+
+def _fork_executor(
+    max_workers: int,
+    initializer: Callable[..., None],
+    initargs: Tuple[Any, ...]
+) -> "ProcessPoolExecutor":
+    """
+    Create a pool of forked workers, which inherit the PyCSP3 model.
+
+    Forked workers inherit unwritten output and write it again on exit, so
+    stdout and stderr are flushed first.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=initializer,
+        initargs=initargs,
+    )
+
+
+# Subsets, hard constraints, solver and verbosity of the checks of the
+# forked worker processes of find_subset
+_PROBE_STATE: Optional[Tuple[List[List[Any]], List[Any], str, int]] = None
+
+
+def _init_probe_worker(subsets: List[List[Any]], hard: List[Any], solver: str, verbose: int) -> None:
+    global _PROBE_STATE
+    _PROBE_STATE = (subsets, hard, solver, verbose)
+
+
+def _probe(i: int) -> SolveResult:
+    assert _PROBE_STATE is not None, "_probe runs in workers set up by _init_probe_worker"
+    subsets, hard, solver, verbose = _PROBE_STATE
+    return solve_subset(subsets[i], hard, solver, verbose)
+
+
+def _verdicts(
+    subsets: Iterable[List[Any]],
+    hard: List[Any],
+    solver: str,
+    verbose: int,
+    n_workers: int
+) -> Generator[Tuple[int, SolveResult], None, None]:
+    """
+    Yield (index, verdict) for each subset, in the order the checks end.
+
+    With n_workers > 1 and fork available, subsets not answered by the
+    active session are checked in forked workers; closing the generator
+    cancels the checks not started yet. Otherwise subsets are checked one at
+    a time, taken from the iterable as they are checked.
+    """
+    import multiprocessing
+
+    if n_workers <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        for i, subset in enumerate(subsets):
+            yield i, solve_subset(subset, hard, solver, verbose)
+        return
+
+    subsets = [_normalize_constraints(subset) for subset in subsets]
+    session = current_session()
+    pending = []
+    for i, subset in enumerate(subsets):
+        cached = session.lookup(hard + subset, solver) if session is not None else None
+        if cached is None:
+            pending.append(i)
+        else:
+            yield i, cached
+    if not pending:
+        return
+
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    executor = _fork_executor(
+        min(n_workers, len(pending)), _init_probe_worker, (subsets, hard, solver, verbose)
+    )
+    try:
+        futures = {executor.submit(_probe, i): i for i in pending}
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = futures.pop(future)
+                result = future.result()
+                if session is not None:
+                    session.solver_calls += 1
+                    session.record(hard + subsets[i], solver, result)
+                yield i, result
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def find_subset(
+    subsets: Iterable[List[Any]],
+    hard: Optional[List[Any]] = None,
+    sat: bool = True,
+    solver: str = "ace",
+    verbose: int = -1,
+    n_workers: int = 1
+) -> Optional[int]:
+    """
+    Find a subset that is SAT (or UNSAT), checking them independently.
+
+    With n_workers > 1, the checks run in forked worker processes, which
+    inherit the constraints, so up to n_workers solvers run at once. As
+    soon as a subset with the wanted verdict is found, the checks not
+    started yet are cancelled. Verdicts of the active session are used
+    and recorded in this process. Platforms without ``fork`` check the
+    subsets one at a time.
+
+    Checked one at a time, subsets are taken from the iterable as they are
+    checked, so a generator builds none past the first subset found.
+
+    :param subsets: Subsets of soft constraints to check (any iterable)
+    :param hard: List of hard constraints (always included)
+    :param sat: Find a SAT subset if True, an UNSAT one if False
+    :param solver: Solver name
+    :param verbose: Verbosity level
+    :param n_workers: Number of worker processes (1 to check serially)
+    :return: Index in subsets of a subset with the wanted verdict, or None
+    """
+    wanted = SolveResult.SAT if sat else SolveResult.UNSAT
+    verdicts = _verdicts(subsets, _normalize_constraints(hard), solver, verbose, n_workers)
+    try:
+        for i, result in verdicts:
+            if result == wanted:
+                return i
+        return None
+    finally:
+        verdicts.close()
+
+
+def solve_subsets(
+    subsets: Iterable[List[Any]],
+    hard: Optional[List[Any]] = None,
+    solver: str = "ace",
+    verbose: int = -1,
+    n_workers: int = 1
+) -> List[SolveResult]:
+    """
+    Check several subsets independently and return all their verdicts.
+
+    Workers are used as in find_subset(), but every subset is checked.
+
+    :param subsets: Subsets of soft constraints to check (any iterable)
+    :param hard: List of hard constraints (always included)
+    :param solver: Solver name
+    :param verbose: Verbosity level
+    :param n_workers: Number of worker processes (1 to check serially)
+    :return: The verdict of each subset, in the order of subsets
+    """
+    results = {}
+    for i, result in _verdicts(subsets, _normalize_constraints(hard), solver, verbose, n_workers):
+        results[i] = result
+    return [results[i] for i in range(len(results))]
@@ -21,35 +21,78 @@ sys.argv[0] = _fake_script
 import pytest
 
 
+def pytest_addoption(parser):
+    """Register the --sat-cache option."""
+    parser.addoption(
+        "--sat-cache",
+        action="store_true",
+        help="Keep SAT/UNSAT verdicts on disk (under .pytest_cache) across runs; "
+             "tests marked solver_runs still reach the solver",
+    )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def quick_start_jvm():
+    """Start the JVM of every solver run with QUICK_START_JVM_OPTIONS."""
+    from pycsp3_explain.solvers.wrapper import QUICK_START_JVM_OPTIONS, _jvm_options
+
+    # ACE runs once per check, and the test models are tiny: each run is
+    # mostly JVM startup
+    with _jvm_options(QUICK_START_JVM_OPTIONS):
+        yield
+
+
 @pytest.fixture(autouse=True)
-def reset_pycsp3_state():
-    """Reset PyCSP3 state before each test to ensure isolation."""
-    from pycsp3 import clear
-    from pycsp3.classes.entities import CtrEntities, VarEntities, ObjEntities, AnnEntities
-    from pycsp3.compiler import Compilation
+def reset_pycsp3_state(request):
+    """
+    Run each test on an empty PyCSP3 model, discarded after the test.
 
-    # Clear all state before test
-    clear()
+    Tests marked shared_model run on the model of the fixture they use.
+    """
+    if request.node.get_closest_marker("shared_model"):
+        yield
+        return
 
-    # Reset compilation state
-    Compilation.done = False
-    Compilation.string_model = None
-    Compilation.model = None
+    from pycsp3_explain.explain.utils import pycsp3_scope
 
-    yield  # Run the test
+    with pycsp3_scope():
+        yield  # Run the test
 
-    # Clear after test as well
-    clear()
 
-    # Reset compilation state again
-    Compilation.done = False
-    Compilation.string_model = None
-    Compilation.model = None
+@pytest.fixture
+def simple_conflict():
+    """
+    Soft constraints [x[0] == 5, x[1] >= 3, x[0] == 7]: the first and the
+    last conflict, the middle one holds with either.
+    """
+    from pycsp3 import VarArray
+
+    x = VarArray(size=2, dom=range(10))
+    return [x[0] == 5, x[1] >= 3, x[0] == 7]
+
+
+@pytest.fixture(autouse=True)
+def persistent_sat_cache(request, monkeypatch):
+    """With --sat-cache, serve the verdicts of earlier runs from disk."""
+    if request.config.getoption("--sat-cache") and not request.node.get_closest_marker("solver_runs"):
+        from pycsp3_explain.solvers import cache
+
+        # SQLite locks the file, so pytest-xdist workers share it
+        path = request.config.cache.mkdir("pycsp3_explain") / "sat.db"
+        monkeypatch.setattr(cache, "_cache_path", str(path))
+    yield
 
 
 def pytest_configure(config):
     """Called after command line options have been parsed."""
-    pass
+    config.addinivalue_line(
+        "markers",
+        "solver_runs: the test counts or inspects solver runs, so it runs without --sat-cache",
+    )
+    config.addinivalue_line(
+        "markers",
+        "shared_model: the test solves on the model of a fixture shared with other tests",
+    )
 
 
 def pytest_unconfigure(config):
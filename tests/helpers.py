@@ -0,0 +1,15 @@
+"""
+Helpers shared by the test modules.
+"""
+
+
+def constraint_in_list(constraint, constraint_list):
+    """Check if constraint is in list using identity comparison."""
+    # Compared by id(), as == on PyCSP3 expressions builds a new expression
+    return id(constraint) in map(id, constraint_list)
+
+
+def constraints_in_list(constraints, constraint_list):
+    """Check if all constraints are in list using identity comparison."""
+    ids = set(map(id, constraint_list))
+    return all(id(c) in ids for c in constraints)
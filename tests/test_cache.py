@@ -0,0 +1,234 @@
+"""
+Tests for caching of satisfiability verdicts.
+"""
+
+import os
+
+import pytest
+
+from pycsp3 import AllDifferent, Sum, Var, VarArray, clear
+from pycsp3_explain.explain.utils import constraint_fingerprint
+from pycsp3_explain.solvers import wrapper
+from pycsp3_explain.solvers.cache import set_persistent_cache
+from pycsp3_explain.solvers.wrapper import (
+    SolveResult, Session, QUICK_START_JVM_OPTIONS, current_session, solve_subset,
+)
+from pycsp3_explain.explain.mss import is_mss, is_mcs, mss_naive
+
+
+class TestConstraintFingerprint:
+    """Tests for structural constraint fingerprints."""
+
+    def test_stable_across_clear(self):
+        """Identical constraints rebuilt after clear() share a fingerprint."""
+        x = Var(dom=range(10))
+        before = constraint_fingerprint(x == 5)
+
+        clear()
+        x = Var(dom=range(10))
+        after = constraint_fingerprint(x == 5)
+
+        assert before == after
+
+    def test_depends_on_domains(self):
+        """Same expression over different domains gives different fingerprints."""
+        x = Var(dom=range(10))
+        small = constraint_fingerprint(x == 5)
+
+        clear()
+        x = Var(dom=range(6))
+        assert constraint_fingerprint(x == 5) != small
+
+    def test_global_constraint(self):
+        """Global constraints are fingerprinted by their arguments."""
+        q = VarArray(size=3, dom=range(3))
+        assert constraint_fingerprint(AllDifferent(q)) != constraint_fingerprint(Sum(q) == 2)
+
+    def test_unchanged_by_solving(self):
+        """Checking a global constraint leaves its fingerprint as it was."""
+        q = VarArray(size=3, dom=range(3))
+        c = AllDifferent(q)
+        before = constraint_fingerprint(c)
+
+        assert solve_subset([c], solver="ace", verbose=-1) == SolveResult.SAT
+        assert constraint_fingerprint(c) == before
+
+
+class TestPersistentCache:
+    """Tests for the on-disk SAT/UNSAT cache."""
+
+    def teardown_method(self):
+        set_persistent_cache(None)
+
+    @pytest.mark.solver_runs
+    def test_verdict_reused_after_clear(self, tmp_path, monkeypatch):
+        """A verdict stored before clear() is served from disk afterwards."""
+        set_persistent_cache(str(tmp_path / "sat_cache"))
+
+        x = Var(dom=range(10))
+        assert solve_subset([x == 5, x == 7], solver="ace", verbose=-1) == SolveResult.UNSAT
+
+        clear()
+        x = Var(dom=range(10))
+
+        def fail(*args, **kwargs):
+            raise AssertionError("solver should not be called on a cache hit")
+
+        monkeypatch.setattr(wrapper, "_solve_subset_internal", fail)
+        assert solve_subset([x == 7, x == 5], solver="ace", verbose=-1) == SolveResult.UNSAT
+
+    @pytest.mark.solver_runs
+    def test_disabled_by_default(self, monkeypatch):
+        """Without a cache path, every check reaches the solver."""
+        monkeypatch.delenv("PYCSP3_EXPLAIN_CACHE", raising=False)
+
+        x = Var(dom=range(10))
+        assert solve_subset([x >= 5], solver="ace", verbose=-1) == SolveResult.SAT
+        assert wrapper.get_persistent_cache() is None
+
+    @pytest.mark.solver_runs
+    def test_enabled_at_default_location(self, tmp_path, monkeypatch):
+        """PYCSP3_EXPLAIN_CACHE=1 keeps verdicts under the user cache directory."""
+        from pycsp3_explain.solvers import cache as cache_module
+        monkeypatch.setattr(cache_module, "_cache_path", cache_module._FROM_ENV)
+        monkeypatch.setenv("PYCSP3_EXPLAIN_CACHE", "1")
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+        x = Var(dom=range(10))
+        assert solve_subset([x == 5, x == 7], solver="ace", verbose=-1) == SolveResult.UNSAT
+
+        cache = wrapper.get_persistent_cache()
+        assert cache.path == str(tmp_path / "pycsp3_explain" / "sat.db")
+        assert cache.get(cache.make_key([x == 5, x == 7], "ace")) is False
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+    def test_concurrent_writers_keep_every_verdict(self, tmp_path):
+        """Verdicts written by forked workers at the same time are all kept."""
+        import multiprocessing
+        from pycsp3_explain.solvers.cache import PersistentSatCache
+
+        cache = PersistentSatCache(str(tmp_path / "sat.db"))
+
+        def write(worker):
+            for i in range(40):
+                cache.put(f"{worker}-{i}", i % 2 == 0)
+
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=write, args=(w,)) for w in range(6)]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+
+        assert all(cache.get(f"{w}-{i}") is (i % 2 == 0) for w in range(6) for i in range(40))
+
+    def test_key_depends_on_solver_version(self, monkeypatch):
+        """Verdicts are not shared between PyCSP3 (solver jar) versions."""
+        from pycsp3_explain.solvers import cache as cache_module
+
+        x = Var(dom=range(10))
+        constraints = [x == 5, x == 7]
+        key = cache_module.PersistentSatCache.make_key(constraints, "ace")
+
+        monkeypatch.setattr(cache_module, "_SOLVER_VERSION", "0.0.0")
+        assert cache_module.PersistentSatCache.make_key(constraints, "ace") != key
+
+
+class TestSession:
+    """Tests for solver sessions sharing verdicts between checks."""
+
+    @pytest.mark.solver_runs
+    def test_repeated_check_answered_by_session(self):
+        """The same constraint set is solved once per session, in any order."""
+        x = Var(dom=range(10))
+        c0 = x == 5
+        c1 = x == 7
+
+        with Session("ace") as session:
+            assert solve_subset([c0, c1], solver="ace", verbose=-1) == SolveResult.UNSAT
+            assert solve_subset([c1], hard=[c0], solver="ace", verbose=-1) == SolveResult.UNSAT
+
+        assert session.solver_calls == 1
+        assert session.cache_hits == 1
+        assert current_session() is None
+
+    @pytest.mark.solver_runs
+    def test_containment_answered_by_session(self):
+        """Supersets of an UNSAT set and subsets of a SAT set need no solve."""
+        x = Var(dom=range(10))
+        y = Var(dom=range(10))
+        c0 = x == 5
+        c1 = x == 7
+        c2 = y >= 3
+        c3 = y <= 8
+
+        with Session("ace") as session:
+            assert solve_subset([c0, c1], solver="ace", verbose=-1) == SolveResult.UNSAT
+            assert solve_subset([c0, c2, c3], solver="ace", verbose=-1) == SolveResult.SAT
+            assert solve_subset([c2, c1], hard=[c0], solver="ace", verbose=-1) == SolveResult.UNSAT
+            assert solve_subset([c3], hard=[c0], solver="ace", verbose=-1) == SolveResult.SAT
+            assert solve_subset([c1, c2], solver="ace", verbose=-1) == SolveResult.SAT
+
+        assert session.solver_calls == 3
+        assert session.cache_hits == 2
+
+    @pytest.mark.solver_runs
+    def test_is_mcs_reuses_is_mss_checks(self):
+        """Verifying an MCS after its complementary MSS needs no new solve."""
+        x = VarArray(size=2, dom=range(10))
+        c0 = x[0] == 5
+        c1 = x[0] == 7
+        c2 = x[1] >= 3
+
+        soft = [c0, c1, c2]
+        session = Session("ace")
+
+        assert is_mss([c0, c2], soft, solver="ace", verbose=-1, session=session)
+        calls = session.solver_calls
+        assert is_mcs([c1], soft, solver="ace", verbose=-1, session=session)
+
+        assert session.solver_calls == calls
+
+    @pytest.mark.solver_runs
+    def test_jvm_options_reach_solver(self, monkeypatch):
+        """Session JVM options apply to its solver runs only."""
+        monkeypatch.delenv("JAVA_TOOL_OPTIONS", raising=False)
+        x = Var(dom=range(10))
+        c0 = x == 5
+        c1 = x == 7
+
+        with Session("ace", jvm_options=QUICK_START_JVM_OPTIONS):
+            assert solve_subset([c0, c1], solver="ace", verbose=-1) == SolveResult.UNSAT
+            assert solve_subset([c0], solver="ace", verbose=-1) == SolveResult.SAT
+        # An option the JVM rejects makes the run fail
+        with Session("ace", jvm_options="-XX:+NoSuchJvmOption"):
+            assert solve_subset([c1], solver="ace", verbose=-1) not in (SolveResult.SAT, SolveResult.UNSAT)
+
+        assert "JAVA_TOOL_OPTIONS" not in os.environ
+
+    @pytest.mark.solver_runs
+    def test_algorithm_without_session_reuses_verdicts(self, monkeypatch):
+        """Outside a session, an algorithm still solves each subset once."""
+        x = VarArray(size=2, dom=range(10))
+        soft = [x[0] == 5, x[0] == 7, x[1] >= 3, x[1] <= 8]
+
+        with Session("ace") as session:
+            mss_naive(soft, solver="ace", verbose=-1)
+        assert session.cache_hits > 0
+
+        runs = []
+        solve_internal = wrapper._solve_subset_internal
+
+        def counting_solve(*args, **kwargs):
+            runs.append(1)
+            return solve_internal(*args, **kwargs)
+
+        monkeypatch.setattr(wrapper, "_solve_subset_internal", counting_solve)
+        mss_naive(soft, solver="ace", verbose=-1)
+
+        assert len(runs) == session.solver_calls
+        assert current_session() is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
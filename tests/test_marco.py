@@ -3,67 +3,75 @@ Tests for MARCO algorithm (MUS/MCS enumeration).
 """
 
 import pytest
-from pycsp3 import *
+from pycsp3 import AllDifferent, Var, VarArray
+from pycsp3_explain.explain import _oracle
 from pycsp3_explain.explain.marco import (
     marco,
     marco_naive,
+    iter_mus,
+    iter_mcs,
     all_mus,
     all_mcs,
+    all_mus_and_mcs,
 )
 from pycsp3_explain.explain.mus import is_mus
 from pycsp3_explain.explain.mss import is_mcs
+from pycsp3_explain.explain.utils import pycsp3_scope
+from pycsp3_explain.solvers.wrapper import Session
 
 
-def constraint_in_list(constraint, constraint_list):
-    """Check if constraint is in list using identity comparison."""
-    return any(c is constraint for c in constraint_list)
-
-
-class TestMarcoBasic:
-    """Basic tests for MARCO algorithm."""
-
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
-
-    def test_simple_conflict_enumerate(self):
-        """Test MARCO on a simple conflict."""
-        clear()
+@pytest.fixture(scope="module")
+def three_way_conflict():
+    """
+    Pairwise conflicting soft = [x == 1, x == 2, x == 3], its MARCO
+    enumeration, run once for all the tests reading it, and the session
+    holding the verdicts of the run.
 
+    The model stays active until the tests of the module are done; tests
+    solving on it are marked shared_model.
+    """
+    with pycsp3_scope():
         x = Var(dom=range(10))
+        soft = [x == 1, x == 2, x == 3]
+        with Session("ace") as session:
+            results = list(marco(soft, solver="ace", verbose=-1))
+        yield soft, results, session
 
-        c0 = x == 5
-        c1 = x == 7  # Conflicts with c0
 
-        soft = [c0, c1]
+def _split(results):
+    """MUSes and MCSes of a MARCO enumeration."""
+    results = list(results)
+    return [s for t, s in results if t == "MUS"], [s for t, s in results if t == "MCS"]
 
-        results = list(marco(soft, solver="ace", verbose=-1))
 
-        # Should find exactly one MUS (both constraints)
-        muses = [s for t, s in results if t == "MUS"]
-        mcses = [s for t, s in results if t == "MCS"]
-
-        assert len(muses) == 1
-        assert len(muses[0]) == 2
+class TestSimpleConflict:
+    """Tests of every enumeration on the same simple conflict."""
 
-        # Should find two MCSes (removing either c0 or c1)
-        assert len(mcses) == 2
-        for mcs in mcses:
-            assert len(mcs) == 1
+    @pytest.mark.parametrize("enumerate_all", [
+        lambda soft, **kwargs: _split(marco(soft, **kwargs)),
+        lambda soft, **kwargs: _split(marco_naive(soft, **kwargs)),
+        lambda soft, **kwargs: (all_mus(soft, **kwargs), None),
+        lambda soft, **kwargs: (None, all_mcs(soft, **kwargs)),
+    ], ids=["marco", "marco_naive", "all_mus", "all_mcs"])
+    def test_one_mus_two_mcses(self, enumerate_all, simple_conflict):
+        """Test that the conflict is the only MUS, and each side of it an MCS."""
+        c0, _, c2 = simple_conflict
 
-    def test_three_way_conflict(self):
-        """Test MARCO with multiple MUSes."""
-        clear()
+        muses, mcses = enumerate_all(simple_conflict, solver="ace", verbose=-1)
 
-        x = Var(dom=range(10))
+        if muses is not None:
+            assert len(muses) == 1
+            assert set(map(id, muses[0])) == {id(c0), id(c2)}
+        if mcses is not None:
+            assert sorted([id(c) for c in mcs] for mcs in mcses) == sorted([[id(c0)], [id(c2)]])
 
-        c0 = x == 1
-        c1 = x == 2
-        c2 = x == 3
 
-        soft = [c0, c1, c2]
+class TestMarcoBasic:
+    """Basic tests for MARCO algorithm."""
 
-        results = list(marco(soft, solver="ace", verbose=-1))
+    def test_three_way_conflict(self, three_way_conflict):
+        """Test MARCO with multiple MUSes."""
+        _, results, _ = three_way_conflict
 
         muses = [s for t, s in results if t == "MUS"]
         mcses = [s for t, s in results if t == "MCS"]
@@ -78,10 +86,86 @@ class TestMarcoBasic:
         for mcs_result in mcses:
             assert len(mcs_result) == 2  # Need to remove 2 to leave just 1
 
+    def test_parallel_workers(self):
+        """Test MARCO with a pool of workers finds the same MUSes/MCSes."""
+        x = Var(dom=range(10))
+
+        c0 = x == 1
+        c1 = x == 2
+        c2 = x == 3
+
+        soft = [c0, c1, c2]
+
+        muses = set()
+        mcs_count = 0
+        for t, s in marco(soft, solver="ace", verbose=-1, n_workers=2):
+            assert len(s) == 2
+            if t == "MUS":
+                muses.add(frozenset(map(id, s)))
+            else:
+                mcs_count += 1
+
+        assert len(muses) == 3
+        assert mcs_count == 3
+
+    def test_cores_match_naive(self):
+        """Test MARCO shrinking from UNSAT cores finds the same results as marco_naive."""
+        x = VarArray(size=3, dom=range(10))
+
+        soft = [
+            x[0] + x[1] == 5,
+            x[1] + x[2] == 3,
+            x[0] + x[2] == 10,
+            x[0] == x[1],
+            x[1] == x[2],
+        ]
+
+        def as_keys(results):
+            return {(t, frozenset(map(id, s))) for t, s in results}
+
+        with_cores = as_keys(marco(soft, solver="ace", verbose=-1))
+        assert with_cores == as_keys(marco_naive(soft, solver="ace", verbose=-1))
+        assert any(t == "MUS" for t, _ in with_cores)
+
+    @pytest.mark.solver_runs
+    def test_cores_cost_no_extra_runs(self):
+        """Test that core extraction takes no more solver runs than marco_naive."""
+        x = Var(dom=range(10))
+        y = Var(dom=range(10))
+        soft = [x == 1, x == 2, x == 3, y >= 5, y <= 3]
+
+        with Session("ace") as with_cores:
+            assert len(list(marco(soft, solver="ace", verbose=-1))) == 10
+        with Session("ace") as naive:
+            assert len(list(marco_naive(soft, solver="ace", verbose=-1))) == 10
+
+        assert with_cores.solver_calls <= naive.solver_calls
+
+    def test_core_with_entailed_constraint(self):
+        """Test that a constraint ACE drops as entailed does not shift the core."""
+        x = VarArray(size=2, dom=range(10))
+
+        # x[0] >= 0 holds for the whole domain, and ACE drops it when loading
+        soft = [x[1] == 1, x[0] >= 0, x[1] > 2]
+
+        results = list(marco(soft, solver="ace", verbose=-1, as_indices=True))
+
+        assert [s for t, s in results if t == "MUS"] == [[0, 2]]
+        assert sorted(s for t, s in results if t == "MCS") == [[0], [2]]
+
+    def test_as_indices(self):
+        """Test MARCO yielding the indices of the constraints."""
+        x = Var(dom=range(10))
+
+        soft = [x == 1, x == 2, x >= 0]
+
+        results = list(marco(soft, solver="ace", verbose=-1, as_indices=True))
+
+        assert ("MUS", [0, 1]) in results
+        assert sorted(s for t, s in results if t == "MCS") == [[0], [1]]
+
     def test_mus_only(self):
         """Test MARCO returning only MUSes."""
-        clear()
-
         x = Var(dom=range(10))
 
         c0 = x == 5
@@ -89,15 +173,15 @@ class TestMarcoBasic:
 
         soft = [c0, c1]
 
-        results = list(marco(soft, return_mus=True, return_mcs=False, solver="ace", verbose=-1))
+        count = 0
+        for t, _ in marco(soft, return_mus=True, return_mcs=False, solver="ace", verbose=-1):
+            assert t == "MUS"
+            count += 1
 
-        assert all(t == "MUS" for t, s in results)
-        assert len(results) == 1
+        assert count == 1
 
     def test_mcs_only(self):
         """Test MARCO returning only MCSes."""
-        clear()
-
         x = Var(dom=range(10))
 
         c0 = x == 5
@@ -105,39 +189,59 @@ class TestMarcoBasic:
 
         soft = [c0, c1]
 
-        results = list(marco(soft, return_mus=False, return_mcs=True, solver="ace", verbose=-1))
+        count = 0
+        for t, _ in marco(soft, return_mus=False, return_mcs=True, solver="ace", verbose=-1):
+            assert t == "MCS"
+            count += 1
 
-        assert all(t == "MCS" for t, s in results)
-        assert len(results) == 2
+        assert count == 2
 
+    def test_enumeration_modes(self):
+        """Test that mus_only/mcs_only modes find the same results as both."""
+        x = Var(dom=range(10))
+        y = Var(dom=range(10))
 
-class TestAllMus:
-    """Tests for all_mus convenience function."""
+        soft = [x == 1, x == 2, x == 3, y >= 5, y <= 3]
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
+        def as_sets(results, kind):
+            return {frozenset(map(id, s)) for t, s in results if t == kind}
 
-    def test_all_mus_simple(self):
-        """Test all_mus on a simple conflict."""
-        clear()
+        both = list(marco(soft, solver="ace", verbose=-1))
+        mus_only = list(marco(soft, solver="ace", verbose=-1, mode="mus_only"))
+        mcs_only = list(marco(soft, solver="ace", verbose=-1, mode="mcs_only"))
 
-        x = Var(dom=range(10))
+        assert all(t == "MUS" for t, s in mus_only)
+        assert all(t == "MCS" for t, s in mcs_only)
+        assert as_sets(mus_only, "MUS") == as_sets(both, "MUS")
+        assert len(as_sets(mus_only, "MUS")) == 4
+        assert as_sets(mcs_only, "MCS") == as_sets(both, "MCS")
 
-        c0 = x == 5
-        c1 = x == 7
+    def test_invalid_mode(self):
+        """Test that an unknown mode is rejected."""
+        x = Var(dom=range(10))
 
-        soft = [c0, c1]
+        with pytest.raises(ValueError):
+            list(marco([x == 5, x == 7], solver="ace", verbose=-1, mode="all"))
 
-        muses = all_mus(soft, solver="ace", verbose=-1)
 
-        assert len(muses) == 1
-        assert len(muses[0]) == 2
+class TestAllMus:
+    """Tests for all_mus convenience function."""
 
-    def test_all_mus_with_limit(self):
+    @pytest.mark.parametrize("n, k", [(3, 1), (3, 2), (5, 3)])
+    def test_all_mus_with_limit(self, n, k):
         """Test all_mus with max_mus limit."""
-        clear()
+        x = Var(dom=range(10))
 
+        # Every pair conflicts, so there are n * (n - 1) / 2 MUSes
+        soft = [x == i for i in range(n)]
+
+        muses = all_mus(soft, max_mus=k, solver="ace", verbose=-1)
+
+        assert len(muses) == k
+        assert all(len(m) == 2 for m in muses)
+
+    def test_all_mus_limit_stops_early(self, monkeypatch):
+        """Test that all_mus stops solving once max_mus MUSes are found."""
         x = Var(dom=range(10))
 
         c0 = x == 1
@@ -145,41 +249,108 @@ class TestAllMus:
         c2 = x == 3
 
         soft = [c0, c1, c2]
+        calls = []
+        original_is_sat = _oracle.is_sat
 
-        muses = all_mus(soft, max_mus=2, solver="ace", verbose=-1)
+        def counting_is_sat(subset, *args, **kwargs):
+            calls.append(len(subset))
+            return original_is_sat(subset, *args, **kwargs)
 
-        assert len(muses) <= 2
-        assert len(muses) >= 1
+        monkeypatch.setattr(_oracle, "is_sat", counting_is_sat)
 
+        assert len(all_mus(soft, max_mus=1, solver="ace", verbose=-1)) == 1
+        limited_calls = len(calls)
 
-class TestAllMcs:
-    """Tests for all_mcs convenience function."""
+        calls.clear()
+        assert len(all_mus(soft, solver="ace", verbose=-1)) == 3
+        assert limited_calls < len(calls)
+
+        calls.clear()
+        assert all_mus(soft, max_mus=0, solver="ace", verbose=-1) == []
+        assert calls == []
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
 
-    def test_all_mcs_simple(self):
-        """Test all_mcs on a simple conflict."""
-        clear()
+class TestIterMusMcs:
+    """Tests for the streaming iter_mus/iter_mcs generators."""
 
+    def test_iter_mus_yields_lazily(self):
+        """Test that iter_mus yields MUSes one at a time."""
         x = Var(dom=range(10))
 
-        c0 = x == 5
-        c1 = x == 7
+        soft = [x == 1, x == 2, x == 3]
 
-        soft = [c0, c1]
+        muses = iter_mus(soft, solver="ace", verbose=-1)
+        first = next(muses)
+        muses.close()
+
+        assert len(first) == 2
+        assert is_mus(first, solver="ace", verbose=-1)
+
+    def test_iter_mcs_matches_all_mcs(self):
+        """Test that iter_mcs and all_mcs find the same MCSes."""
+        x = Var(dom=range(10))
+
+        soft = [x == 1, x == 2, x == 3]
+
+        streamed = [frozenset(map(id, m)) for m in iter_mcs(soft, solver="ace", verbose=-1)]
+        collected = [frozenset(map(id, m)) for m in all_mcs(soft, solver="ace", verbose=-1)]
+
+        assert streamed == collected
+        assert len(streamed) == 3
+
+    def test_as_indices(self):
+        """Test that the collecting functions return indices on request."""
+        x = Var(dom=range(10))
+
+        soft = [x == 1, x >= 0, x == 2]
+
+        assert all_mus(soft, solver="ace", verbose=-1, as_indices=True) == [[0, 2]]
+        assert sorted(all_mcs(soft, solver="ace", verbose=-1, as_indices=True)) == [[0], [2]]
+
+
+class TestAllMusAndMcs:
+    """Tests for the single-pass all_mus_and_mcs function."""
+
+    def test_matches_separate_enumerations(self):
+        """Test that one pass finds the same results as all_mus and all_mcs."""
+        x = Var(dom=range(10))
+        y = Var(dom=range(10))
+
+        soft = [x == 1, x == 2, y >= 5, y <= 3]
+
+        def as_sets(subsets):
+            return {frozenset(map(id, s)) for s in subsets}
 
-        mcses = all_mcs(soft, solver="ace", verbose=-1)
+        muses, mcses = all_mus_and_mcs(soft, solver="ace", verbose=-1)
 
-        assert len(mcses) == 2
-        for mcs in mcses:
-            assert len(mcs) == 1
+        assert as_sets(muses) == as_sets(all_mus(soft, solver="ace", verbose=-1))
+        assert as_sets(mcses) == as_sets(all_mcs(soft, solver="ace", verbose=-1))
+        assert len(muses) == 2
+        assert len(mcses) == 4
 
-    def test_all_mcs_with_limit(self):
+
+class TestAllMcs:
+    """Tests for all_mcs convenience function."""
+
+    @pytest.mark.parametrize("n, k", [(3, 1), (3, 2), (5, 3)])
+    def test_all_mcs_with_limit(self, n, k):
         """Test all_mcs with max_mcs limit."""
-        clear()
+        x = Var(dom=range(10))
+
+        # Every pair conflicts, so each MCS keeps a single constraint
+        soft = [x == i for i in range(n)]
+
+        mcses = all_mcs(soft, max_mcs=k, solver="ace", verbose=-1)
+
+        assert len(mcses) == k
+        assert all(len(m) == n - 1 for m in mcses)
 
+
+class TestMarcoNaive:
+    """Tests for naive MARCO implementation."""
+
+    def test_no_repeated_checks(self, monkeypatch):
+        """Test that each subset is sent to the solver at most once per run."""
         x = Var(dom=range(10))
 
         c0 = x == 1
@@ -187,51 +358,60 @@ class TestAllMcs:
         c2 = x == 3
 
         soft = [c0, c1, c2]
+        checked = []
+        original_is_sat = _oracle.is_sat
 
-        mcses = all_mcs(soft, max_mcs=2, solver="ace", verbose=-1)
+        def counting_is_sat(subset, *args, **kwargs):
+            checked.append(frozenset(map(id, subset)))
+            return original_is_sat(subset, *args, **kwargs)
 
-        assert len(mcses) <= 2
-        assert len(mcses) >= 1
+        monkeypatch.setattr(_oracle, "is_sat", counting_is_sat)
+        results = list(marco_naive(soft, solver="ace", verbose=-1))
 
+        assert len(results) == 6
+        assert len(checked) == len(set(checked))
 
-class TestMarcoNaive:
-    """Tests for naive MARCO implementation."""
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
+class TestReify:
+    """Tests for the flags linked to soft constraints."""
 
-    def test_simple_conflict(self):
-        """Test marco_naive on a simple conflict."""
-        clear()
+    def test_reified_global_constraint(self):
+        """Test that the flag of a global constraint keeps its meaning in every check."""
+        x = VarArray(size=3, dom=range(2))
+        soft = [AllDifferent(x)]  # Never holds: three values in {0, 1}
+        reified = _oracle._reify(soft)
+        flags = reified[0]
 
-        x = Var(dom=range(10))
+        for _ in range(2):
+            sat, satisfied = _oracle._solve_with_model(
+                0, 0b1, soft, [], reified, "ace", -1
+            )
+            assert sat and satisfied == 0
 
-        c0 = x == 5
-        c1 = x == 7
+        # Forcing the flag gives no solution, in the second check too
+        sat, _ = _oracle._solve_with_model(0, 0b1, soft, [flags[0] == 1], reified, "ace", -1)
+        assert not sat
 
-        soft = [c0, c1]
+    def test_flags_left_out_of_model(self):
+        """Test that no flag stays declared in the caller's model after a run."""
+        from pycsp3.classes.main.variables import Variable
 
-        results = list(marco_naive(soft, solver="ace", verbose=-1))
+        x = VarArray(size=2, dom=range(10))
+        soft = [x[0] == 5, x[0] == 7, x[1] >= 3]
 
-        muses = [s for t, s in results if t == "MUS"]
-        mcses = [s for t, s in results if t == "MCS"]
+        list(iter_mus(soft, solver="ace", verbose=-1))
+        assert sorted(Variable.name2obj) == ["x", "x[0]", "x[1]"]
 
-        assert len(muses) == 1
-        assert len(mcses) == 2
+        assert len(all_mcs(soft, solver="ace", verbose=-1)) == 2
+        assert sorted(Variable.name2obj) == ["x", "x[0]", "x[1]"]
+        assert len(Variable.arrays) == 1
 
 
 class TestMarcoWithHard:
     """Tests for MARCO with hard constraints."""
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
-
     def test_hard_constraint_conflict(self):
         """Test MARCO when soft conflicts with hard."""
-        clear()
-
         x = VarArray(size=2, dom=range(10))
 
         hard = [x[0] >= 5]  # x[0] must be at least 5
@@ -240,57 +420,33 @@ class TestMarcoWithHard:
 
         soft = [c0, c1]
 
-        results = list(marco(soft, hard=hard, solver="ace", verbose=-1))
-
-        muses = [s for t, s in results if t == "MUS"]
-
-        # c0 alone is UNSAT with hard, so should be a MUS
-        assert len(muses) >= 1
-        # At least one MUS should contain only c0
-        sizes = [len(m) for m in muses]
-        assert 1 in sizes
+        # c0 alone is UNSAT with hard, so should be a MUS; the enumeration
+        # stops once it is found
+        for t, s in marco(soft, hard=hard, solver="ace", verbose=-1):
+            if t == "MUS" and len(s) == 1:
+                break
+        else:
+            pytest.fail("no MUS of size 1")
 
 
+@pytest.mark.shared_model
 class TestMarcoValidation:
     """Tests to validate MARCO results."""
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
-
-    def test_all_muses_valid(self):
-        """Test that all discovered MUSes are valid."""
-        clear()
-
-        x = Var(dom=range(10))
-
-        c0 = x == 1
-        c1 = x == 2
-        c2 = x == 3
-
-        soft = [c0, c1, c2]
-
-        for result_type, subset in marco(soft, solver="ace", verbose=-1):
-            if result_type == "MUS":
-                assert is_mus(subset, solver="ace", verbose=-1), \
-                    f"Invalid MUS: {subset}"
-
-    def test_all_mcses_valid(self):
-        """Test that all discovered MCSes are valid."""
-        clear()
-
-        x = Var(dom=range(10))
-
-        c0 = x == 1
-        c1 = x == 2
-        c2 = x == 3
-
-        soft = [c0, c1, c2]
-
-        for result_type, subset in marco(soft, solver="ace", verbose=-1):
-            if result_type == "MCS":
-                assert is_mcs(subset, soft, solver="ace", verbose=-1), \
-                    f"Invalid MCS: {subset}"
+    @pytest.mark.parametrize("kind", ["MUS", "MCS"])
+    def test_results_valid(self, three_way_conflict, kind):
+        """Test that all discovered MUSes and MCSes are valid."""
+        soft, results, session = three_way_conflict
+
+        # Checks already made by MARCO are answered by its session
+        with session:
+            for result_type, subset in results:
+                if result_type != kind:
+                    continue
+                if kind == "MUS":
+                    assert is_mus(subset, solver="ace", verbose=-1), f"Invalid MUS: {subset}"
+                else:
+                    assert is_mcs(subset, soft, solver="ace", verbose=-1), f"Invalid MCS: {subset}"
 
 
 if __name__ == "__main__":
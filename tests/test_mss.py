@@ -3,7 +3,7 @@ Tests for MSS (Maximal Satisfiable Subset) and MCS (Minimal Correction Set) algo
 """
 
 import pytest
-from pycsp3 import *
+from pycsp3 import AllDifferent, Var, VarArray
 from pycsp3_explain.explain.mss import (
     mss,
     mss_naive,
@@ -13,25 +13,41 @@ from pycsp3_explain.explain.mss import (
     mcs_from_mss,
     is_mcs,
 )
+from pycsp3_explain.explain.utils import make_assump_model
 from pycsp3_explain.solvers.wrapper import is_sat, is_unsat
+from tests.helpers import constraint_in_list, constraints_in_list
 
 
-def constraint_in_list(constraint, constraint_list):
-    """Check if constraint is in list using identity comparison."""
-    return any(c is constraint for c in constraint_list)
+class TestSimpleConflict:
+    """Tests of every MSS and MCS algorithm on the same simple conflict."""
+
+    @pytest.mark.parametrize("algorithm", [mss_naive, mss], ids=lambda algorithm: algorithm.__name__)
+    def test_mss_keeps_one_side(self, algorithm, simple_conflict):
+        """Test that the MSS keeps the free constraint and one side of the conflict."""
+        c0, c1, c2 = simple_conflict
+
+        result = algorithm(simple_conflict, solver="ace", verbose=-1)
+
+        assert len(result) == 2
+        assert constraint_in_list(c1, result)
+        assert constraint_in_list(c0, result) != constraint_in_list(c2, result)
+
+    @pytest.mark.parametrize("algorithm", [mcs_naive, mcs], ids=lambda algorithm: algorithm.__name__)
+    def test_mcs_removes_one_side(self, algorithm, simple_conflict):
+        """Test that the MCS removes one side of the conflict only."""
+        c0, c1, c2 = simple_conflict
+
+        result = algorithm(simple_conflict, solver="ace", verbose=-1)
+
+        assert len(result) == 1
+        assert constraint_in_list(c0, result) or constraint_in_list(c2, result)
 
 
 class TestMssBasic:
     """Basic tests for MSS algorithms."""
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
-
     def test_simple_sat(self):
         """Test MSS when all constraints are satisfiable."""
-        clear()
-
         x = VarArray(size=3, dom=range(10))
 
         c0 = x[0] >= 0
@@ -44,35 +60,10 @@ class TestMssBasic:
         result = mss_naive(soft, solver="ace", verbose=-1)
 
         assert len(result) == 3
-        assert constraint_in_list(c0, result)
-        assert constraint_in_list(c1, result)
-        assert constraint_in_list(c2, result)
-
-    def test_simple_conflict(self):
-        """Test MSS with a simple conflict."""
-        clear()
-
-        x = VarArray(size=3, dom=range(10))
-
-        c0 = x[0] == 5
-        c1 = x[1] >= 3
-        c2 = x[0] == 7  # Conflicts with c0
-
-        soft = [c0, c1, c2]
-
-        # MSS should be of size 2 (either {c0, c1} or {c1, c2})
-        result = mss_naive(soft, solver="ace", verbose=-1)
-
-        assert len(result) == 2
-        # c1 should be in MSS (doesn't conflict with anything)
-        assert constraint_in_list(c1, result)
-        # Either c0 or c2 should be in MSS (but not both)
-        assert constraint_in_list(c0, result) != constraint_in_list(c2, result)
+        assert constraints_in_list([c0, c1, c2], result)
 
     def test_mss_with_hard_constraints(self):
         """Test MSS with hard constraints."""
-        clear()
-
         x = VarArray(size=2, dom=range(10))
 
         hard = [x[0] >= 5]  # Hard: x[0] must be at least 5
@@ -89,8 +80,6 @@ class TestMssBasic:
 
     def test_single_unsat_constraint(self):
         """Test MSS when a single constraint is unsatisfiable alone."""
-        clear()
-
         x = Var(dom=range(5))
 
         c0 = x < 0  # UNSAT with domain [0,4]
@@ -105,8 +94,6 @@ class TestMssBasic:
 
     def test_three_way_conflict(self):
         """Test MSS with a three-way conflict."""
-        clear()
-
         x = Var(dom=range(10))
 
         # All pairs conflict
@@ -121,18 +108,67 @@ class TestMssBasic:
 
         assert len(result) == 1
 
+    def test_mss_parallel(self):
+        """Test that checking candidates in worker processes grows the serial MSS."""
+        x = VarArray(size=2, dom=range(10))
+        c0 = x[0] == 5
+        c1 = x[0] == 7
+        c2 = x[1] >= 3
+        c3 = x[0] + x[1] == 9
+
+        soft = [c0, c1, c2, c3]
+        serial = mss_naive(soft, solver="ace", verbose=-1)
+
+        parallel = mss_naive(soft, solver="ace", verbose=-1, n_workers=3)
+        assert [id(c) for c in parallel] == [id(c) for c in serial]
+        correction = mcs_naive(soft, solver="ace", verbose=-1, n_workers=3)
+        assert [id(c) for c in correction] == [id(c) for c in mcs_from_mss(serial, soft)]
+
+
+class TestMssPartition:
+    """Tests for MSS growing over variable-disjoint groups."""
+
+    def test_partition_by_variables(self):
+        """Test that constraints sharing no variable are split apart."""
+        from pycsp3_explain.explain.utils import _partition_by_variables
+
+        x = VarArray(size=4, dom=range(10))
+
+        soft = [x[0] == 1, x[2] == 3, x[1] >= 2, x[3] != 4]
+        hard = [x[0] != x[1], x[3] >= 1]
+
+        groups = _partition_by_variables(soft, hard)
+
+        # x[3] is only in soft[3] and hard[1]; hard[0] links x[0] and x[1]
+        assert groups == [([0, 2], [0]), ([1], []), ([3], [1])]
+
+    @pytest.mark.solver_runs
+    def test_sat_groups_checked_once(self):
+        """Test that a SAT group joins the MSS with one check."""
+        from pycsp3_explain.solvers.wrapper import Session
+
+        x = Var(dom=range(10))
+        y = VarArray(size=2, dom=range(10))
+
+        conflict = [x == 5, x == 7]
+        free = [y[0] >= 1, y[0] <= 8, y[1] >= 1, y[1] <= 8]
+        soft = conflict + free
+
+        with Session("ace") as session:
+            result = mss_naive(soft, solver="ace", verbose=-1)
+
+        assert len(result) == 5
+        assert is_mss(result, soft, solver="ace", verbose=-1)
+        # Whole set; the conflict group (its whole-group check answers the
+        # second candidate); one check per free group instead of two
+        assert session.solver_calls == 1 + 2 + 2
+
 
 class TestMssAssumptionBased:
     """Tests for assumption-based MSS algorithm."""
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
-
     def test_simple_sat(self):
         """Test assumption-based MSS when all constraints are satisfiable."""
-        clear()
-
         x = VarArray(size=3, dom=range(10))
 
         c0 = x[0] >= 0
@@ -144,26 +180,8 @@ class TestMssAssumptionBased:
 
         assert len(result) == 3
 
-    def test_simple_conflict(self):
-        """Test assumption-based MSS with a simple conflict."""
-        clear()
-
-        x = VarArray(size=3, dom=range(10))
-
-        c0 = x[0] == 5
-        c1 = x[1] >= 3
-        c2 = x[0] == 7
-
-        soft = [c0, c1, c2]
-        result = mss(soft, solver="ace", verbose=-1)
-
-        assert len(result) == 2
-        assert constraint_in_list(c1, result)
-
     def test_mss_with_hard_constraints(self):
         """Test assumption-based MSS with hard constraints."""
-        clear()
-
         x = VarArray(size=2, dom=range(10))
 
         hard = [x[0] >= 5]
@@ -176,18 +194,72 @@ class TestMssAssumptionBased:
         assert len(result) == 1
         assert constraint_in_list(c1, result)
 
+    @pytest.mark.solver_runs
+    def test_one_check_per_candidate(self):
+        """Test that a rejected constraint costs at most one more check than alone."""
+        from pycsp3_explain.solvers.wrapper import Session
+
+        x = VarArray(size=2, dom=range(10))
+
+        soft = [x[0] == 5, x[0] == 7, x[1] >= 3, x[1] == x[0]]
+
+        with Session("ace") as session:
+            result = mss(soft, solver="ace", verbose=-1)
+
+        assert is_mss(result, soft, solver="ace", verbose=-1)
+        # The whole set, one check per candidate, and the failed batch
+        # holding the rejected candidate
+        rejected = len(soft) - len(result)
+        assert session.solver_calls <= len(soft) + 1 + rejected
+
+    @pytest.mark.solver_runs
+    def test_fitting_candidates_share_checks(self):
+        """Test that candidates fitting together are added in batches."""
+        from pycsp3_explain.solvers.wrapper import Session
+
+        x = VarArray(size=16, dom=range(10))
+        y = Var(dom=range(10))
+
+        soft = [y == 1, y == 2] + [x[i] >= 1 for i in range(16)]
+
+        with Session("ace") as session:
+            result = mss(soft, solver="ace", verbose=-1)
+
+        assert len(result) == len(soft) - 1
+        assert is_mss(result, soft, solver="ace", verbose=-1)
+        # About half the checks of one per candidate (plus the whole set)
+        assert session.solver_calls <= len(soft) // 2
+
+    def test_guarded_global_constraint(self):
+        """Test that a guarded global constraint keeps its meaning."""
+        x = VarArray(size=3, dom=range(2))
+
+        c0 = AllDifferent(x)  # UNSAT alone: three values in {0, 1}
+        c1 = x[0] == 1
+        soft = [c0, c1]
+
+        result = mss(soft, solver="ace", verbose=-1)
+
+        assert len(result) == 1
+        assert constraint_in_list(c1, result)
+        assert is_mss(result, soft, solver="ace", verbose=-1)
+
+    def test_guards_built_twice_keep_definitions(self):
+        """Test that guarding a global constraint again defines its new auxiliary variable."""
+        x = VarArray(size=3, dom=range(2))
+        c0 = AllDifferent(x)
+
+        _, first, _, _ = make_assump_model([c0])
+        _, second, _, _ = make_assump_model([c0])
+
+        assert len(first) == len(second) == 1
+
 
 class TestIsMss:
     """Tests for MSS verification."""
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
-
     def test_is_mss_valid(self):
         """Test that a valid MSS is recognized."""
-        clear()
-
         x = Var(dom=range(10))
         c0 = x == 5
         c1 = x == 7
@@ -198,9 +270,10 @@ class TestIsMss:
 
         assert is_mss(subset, soft, solver="ace", verbose=-1)
 
+    @pytest.mark.solver_runs
     def test_is_mss_not_maximal(self):
         """Test that a non-maximal subset is rejected."""
-        clear()
+        from pycsp3_explain.solvers.wrapper import Session
 
         x = VarArray(size=2, dom=range(10))
         c0 = x[0] >= 0
@@ -210,12 +283,13 @@ class TestIsMss:
         # {c0} is SAT but not maximal (can add c1)
         subset = [c0]
 
-        assert is_mss(subset, soft, solver="ace", verbose=-1) is False
+        # c1 holds over the domain of x[1], so it is added without a solve
+        with Session("ace") as session:
+            assert is_mss(subset, soft, solver="ace", verbose=-1) is False
+        assert session.solver_calls == 0
 
     def test_is_mss_unsat(self):
         """Test that an UNSAT subset is rejected."""
-        clear()
-
         x = Var(dom=range(10))
         c0 = x == 5
         c1 = x == 7
@@ -226,18 +300,50 @@ class TestIsMss:
 
         assert is_mss(subset, soft, solver="ace", verbose=-1) is False
 
+    def test_is_mss_rebuilt_constraints(self):
+        """Test that a subset of equal but rebuilt constraints is matched against soft."""
+        x = Var(dom=range(10))
+        y = Var(dom=range(10))
+        soft = [x == 5, x == 7, y >= 1]
+
+        # Same constraints as soft[0] and soft[2], built again
+        subset = [x == 5, y >= 1]
+
+        assert is_mss(subset, soft, solver="ace", verbose=-1)
+        assert is_mcs(mcs_from_mss(subset, soft), soft, solver="ace", verbose=-1)
+        assert len(mcs_from_mss(subset, soft)) == 1
+
+    @pytest.mark.solver_runs
+    def test_is_mss_single_maximality_check(self):
+        """Test that all the extensions are checked with one solve."""
+        from pycsp3_explain.solvers.wrapper import Session
+
+        x = Var(dom=range(10))
+        soft = [x == 5, x == 1, x == 2, x == 3, x == 4]
+
+        with Session("ace") as session:
+            assert is_mss([soft[0]], soft, solver="ace", verbose=-1)
+
+        # The SAT check of the subset and one check for the four extensions
+        assert session.solver_calls == 2
+
+    def test_is_mss_leaves_model_unchanged(self):
+        """Test that the indicators of the maximality check are not kept in the model."""
+        from pycsp3.classes.main.variables import Variable
+
+        x = Var(dom=range(10))
+        soft = [x == 5, x == 1, x == 2]
+
+        assert is_mss([soft[0]], soft, solver="ace", verbose=-1)
+        assert is_mss([soft[1]], soft, solver="ace", verbose=-1)
+        assert list(Variable.name2obj) == ["x"]
+
 
 class TestMcsBasic:
     """Basic tests for MCS algorithms."""
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
-
     def test_sat_model_empty_mcs(self):
         """Test MCS when model is already SAT."""
-        clear()
-
         x = VarArray(size=2, dom=range(10))
 
         c0 = x[0] >= 0
@@ -249,27 +355,8 @@ class TestMcsBasic:
         # Model is SAT, no correction needed
         assert len(result) == 0
 
-    def test_simple_conflict(self):
-        """Test MCS with a simple conflict."""
-        clear()
-
-        x = VarArray(size=3, dom=range(10))
-
-        c0 = x[0] == 5
-        c1 = x[1] >= 3
-        c2 = x[0] == 7  # Conflicts with c0
-
-        soft = [c0, c1, c2]
-        result = mcs_naive(soft, solver="ace", verbose=-1)
-
-        # MCS should contain exactly one of {c0, c2}
-        assert len(result) == 1
-        assert constraint_in_list(c0, result) or constraint_in_list(c2, result)
-
     def test_mcs_from_mss_function(self):
         """Test mcs_from_mss helper function."""
-        clear()
-
         x = VarArray(size=3, dom=range(10))
 
         c0 = x[0] == 5
@@ -284,8 +371,8 @@ class TestMcsBasic:
         assert len(mcs_result) == len(soft) - len(mss_result)
 
         # Check that MSS and MCS are disjoint
-        mss_ids = set(id(c) for c in mss_result)
-        mcs_ids = set(id(c) for c in mcs_result)
+        mss_ids = set(map(id, mss_result))
+        mcs_ids = set(map(id, mcs_result))
         assert len(mss_ids & mcs_ids) == 0
 
         # Check that MSS + MCS = soft
@@ -295,14 +382,8 @@ class TestMcsBasic:
 class TestMcsAssumptionBased:
     """Tests for assumption-based MCS algorithm."""
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
-
     def test_sat_model_empty_mcs(self):
         """Test assumption-based MCS when model is already SAT."""
-        clear()
-
         x = VarArray(size=2, dom=range(10))
 
         c0 = x[0] >= 0
@@ -313,33 +394,32 @@ class TestMcsAssumptionBased:
 
         assert len(result) == 0
 
-    def test_simple_conflict(self):
-        """Test assumption-based MCS with a simple conflict."""
-        clear()
+    @pytest.mark.solver_runs
+    def test_mcs_checks_whole_set_once(self):
+        """mcs() does not repeat its UNSAT pre-check inside mss()."""
+        from pycsp3_explain.solvers.wrapper import Session
 
         x = VarArray(size=3, dom=range(10))
 
-        c0 = x[0] == 5
-        c1 = x[1] >= 3
-        c2 = x[0] == 7
+        soft = [x[0] == 5, x[0] == 7, x[1] >= 3, x[2] >= 3]
 
-        soft = [c0, c1, c2]
-        result = mcs(soft, solver="ace", verbose=-1)
+        with Session("ace") as session:
+            mss(soft, solver="ace", verbose=-1)
+        mss_calls = session.solver_calls
+
+        with Session("ace") as session:
+            result = mcs(soft, solver="ace", verbose=-1)
 
         assert len(result) == 1
+        # The pre-check replaces mss()'s own check of the whole set
+        assert session.solver_calls == mss_calls
 
 
 class TestIsMcs:
     """Tests for MCS verification."""
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
-
     def test_is_mcs_valid(self):
         """Test that a valid MCS is recognized."""
-        clear()
-
         x = Var(dom=range(10))
         c0 = x == 5
         c1 = x == 7
@@ -350,9 +430,10 @@ class TestIsMcs:
 
         assert is_mcs(subset, soft, solver="ace", verbose=-1)
 
+    @pytest.mark.solver_runs
     def test_is_mcs_not_minimal(self):
         """Test that a non-minimal correction set is rejected."""
-        clear()
+        from pycsp3_explain.solvers.wrapper import Session
 
         x = Var(dom=range(10))
         c0 = x == 5
@@ -363,12 +444,33 @@ class TestIsMcs:
         # {c0, c1} is not minimal - removing just c0 (or c2) suffices
         subset = [c0, c1]
 
-        assert is_mcs(subset, soft, solver="ace", verbose=-1) is False
+        # c1 holds over the domain of x, so it is kept without a solve
+        with Session("ace") as session:
+            assert is_mcs(subset, soft, solver="ace", verbose=-1) is False
+        assert session.solver_calls == 0
+
+    @pytest.mark.solver_runs
+    def test_is_mcs_tests_wide_constraints_first(self):
+        """Test that removals of constraints over more variables are tried first."""
+        from pycsp3_explain.solvers.wrapper import Session
+
+        x = Var(dom=range(10))
+        y = VarArray(size=2, dom=range(10))
+        c0 = x == 5
+        c1 = x == 7
+        c2 = y[0] + y[1] == 3  # Independent, over two variables
+
+        soft = [c0, c1, c2]
+        subset = [c0, c2]
+
+        with Session("ace") as session:
+            assert is_mcs(subset, soft, solver="ace", verbose=-1) is False
+
+        # The complement check, then putting c2 back already gives SAT
+        assert session.solver_calls == 2
 
     def test_is_mcs_complement_unsat(self):
         """Test that MCS with UNSAT complement is rejected."""
-        clear()
-
         x = Var(dom=range(10))
         c0 = x == 5
         c1 = x == 7
@@ -379,18 +481,26 @@ class TestIsMcs:
 
         assert is_mcs(subset, soft, solver="ace", verbose=-1) is False
 
+    def test_is_mcs_parallel(self):
+        """Test that checking minimality in worker processes gives the same verdicts."""
+        x = Var(dom=range(10))
+        c0 = x == 5
+        c1 = x >= 0
+        c2 = x == 7
+
+        soft = [c0, c1, c2]
+
+        assert is_mcs([c0], soft, solver="ace", verbose=-1, n_workers=2)
+        assert is_mcs([c0, c1], soft, solver="ace", verbose=-1, n_workers=2) is False
+        assert is_mss([c1, c2], soft, solver="ace", verbose=-1, n_workers=2)
+        assert is_mss([c1], soft, solver="ace", verbose=-1, n_workers=2) is False
+
 
 class TestMssMcsRelationship:
     """Tests for the relationship between MSS and MCS."""
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
-
     def test_mss_mcs_complement(self):
         """Test that MSS and MCS are complements."""
-        clear()
-
         x = VarArray(size=4, dom=range(10))
 
         c0 = x[0] == 5
@@ -404,17 +514,15 @@ class TestMssMcsRelationship:
         mcs_result = mcs_naive(soft, solver="ace", verbose=-1)
 
         # MSS + MCS should cover all soft constraints
-        mss_ids = set(id(c) for c in mss_result)
-        mcs_ids = set(id(c) for c in mcs_result)
-        soft_ids = set(id(c) for c in soft)
+        mss_ids = set(map(id, mss_result))
+        mcs_ids = set(map(id, mcs_result))
+        soft_ids = set(map(id, soft))
 
         assert mss_ids | mcs_ids == soft_ids
         assert len(mss_ids & mcs_ids) == 0
 
     def test_mcs_restores_sat(self):
         """Test that removing MCS from soft makes it SAT."""
-        clear()
-
         x = VarArray(size=3, dom=range(10))
 
         c0 = x[0] == 5
@@ -425,7 +533,7 @@ class TestMssMcsRelationship:
         mcs_result = mcs_naive(soft, solver="ace", verbose=-1)
 
         # Remove MCS constraints
-        mcs_ids = set(id(c) for c in mcs_result)
+        mcs_ids = set(map(id, mcs_result))
         remaining = [c for c in soft if id(c) not in mcs_ids]
 
         # Remaining should be SAT
@@ -435,10 +543,6 @@ class TestMssMcsRelationship:
 class TestEdgeCases:
     """Edge case tests."""
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
-
     def test_empty_soft_returns_empty(self):
         """Test that empty soft constraints returns empty MSS."""
         result = mss_naive([], solver="ace")
@@ -446,8 +550,6 @@ class TestEdgeCases:
 
     def test_all_unsat(self):
         """Test MSS when all constraints are individually UNSAT."""
-        clear()
-
         x = Var(dom=range(5))
 
         c0 = x < 0  # UNSAT
@@ -461,8 +563,6 @@ class TestEdgeCases:
 
     def test_nested_constraints(self):
         """Test MSS with nested constraint lists."""
-        clear()
-
         x = VarArray(size=3, dom=range(10))
 
         c0 = x[0] == 5
@@ -7,50 +7,32 @@ import sys
 import os
 
 
-from pycsp3 import *
-from pycsp3_explain.explain.mus import mus, mus_naive, quickxplain_naive, is_mus
+from pycsp3 import AllDifferent, Var, VarArray, satisfy
+from pycsp3_explain.explain.mus import mus, mus_naive, quickxplain_naive, is_mus, all_mus_naive
 from pycsp3_explain.solvers.wrapper import is_sat, is_unsat
+from tests.helpers import constraint_in_list, constraints_in_list
 
 
-def constraint_in_list(constraint, constraint_list):
-    """Check if constraint is in list using identity comparison."""
-    return any(c is constraint for c in constraint_list)
+class TestSimpleConflict:
+    """Tests of every MUS algorithm on the same simple conflict."""
 
+    @pytest.mark.parametrize("algorithm", [mus_naive, quickxplain_naive, mus], ids=lambda algorithm: algorithm.__name__)
+    def test_finds_the_conflict(self, algorithm, simple_conflict):
+        """Test that the MUS holds the two conflicting constraints only."""
+        c0, c1, c2 = simple_conflict
 
-class TestMusBasic:
-    """Basic tests for MUS algorithms."""
-
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
-
-    def test_simple_unsat(self):
-        """Test MUS on a simple unsatisfiable model."""
-        clear()
-
-        # Create variables
-        x = VarArray(size=3, dom=range(10))
+        result = algorithm(simple_conflict, solver="ace", verbose=-1)
 
-        # Create constraints - c0 and c2 conflict
-        c0 = x[0] == 5       # x[0] must be 5
-        c1 = x[1] >= 3       # x[1] at least 3 (independent)
-        c2 = x[0] == 7       # x[0] must be 7 (conflicts with c0)
+        assert len(result) == 2
+        assert constraints_in_list([c0, c2], result)
+        assert not constraint_in_list(c1, result)
 
-        soft = [c0, c1, c2]
 
-        # Find MUS
-        mus = mus_naive(soft, solver="ace", verbose=-1)
-
-        # MUS should contain exactly c0 and c2 (the conflicting constraints)
-        assert len(mus) == 2
-        assert constraint_in_list(c0, mus)
-        assert constraint_in_list(c2, mus)
-        assert not constraint_in_list(c1, mus)  # c1 is independent, not in MUS
+class TestMusBasic:
+    """Basic tests for MUS algorithms."""
 
     def test_mus_with_hard_constraints(self):
         """Test MUS with hard constraints."""
-        clear()
-
         x = VarArray(size=2, dom=range(10))
 
         hard = [x[0] >= 0]  # Always true, just for testing
@@ -61,13 +43,10 @@ class TestMusBasic:
         mus = mus_naive(soft, hard=hard, solver="ace", verbose=-1)
 
         assert len(mus) == 2
-        assert constraint_in_list(c0, mus)
-        assert constraint_in_list(c1, mus)
+        assert constraints_in_list([c0, c1], mus)
 
     def test_single_constraint_unsat(self):
         """Test MUS when a single constraint is unsatisfiable."""
-        clear()
-
         x = Var(dom=range(5))
 
         # x must be both less than 0 AND in range [0,4] - impossible
@@ -82,8 +61,6 @@ class TestMusBasic:
 
     def test_three_way_conflict(self):
         """Test MUS with a three-way conflict."""
-        clear()
-
         x = Var(dom=range(10))
 
         # These three constraints together are UNSAT
@@ -103,34 +80,53 @@ class TestMusBasic:
         # Should contain c1 (which conflicts with both c0 and c2)
         assert constraint_in_list(c1, mus)
 
+    @pytest.mark.solver_runs
+    def test_many_candidates_use_quickxplain(self):
+        """Test that a small conflict among many constraints needs fewer checks than deletion."""
+        from pycsp3_explain.solvers.wrapper import Session
 
-class TestQuickXplain:
-    """Tests for QuickXplain algorithm."""
+        x = VarArray(size=12, dom=range(10))
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
+        c0 = x[0] == 5
+        c1 = x[0] == 7
+        # x[0] == x[1] and x[0] != x[1] conflict too, over more variables
+        soft = [x[i] != x[i + 1] for i in range(11)] + [c0, x[11] >= 2, c1, x[0] == x[1]]
 
-    def test_quickxplain_simple(self):
-        """Test QuickXplain on a simple conflict."""
-        clear()
+        with Session("ace") as session:
+            mus = mus_naive(soft, solver="ace", verbose=-1)
 
-        x = VarArray(size=2, dom=range(10))
+        # The conflict over fewer variables is preferred
+        assert len(mus) == 2
+        assert constraints_in_list([c0, c1], mus)
+        # Deletion would check each of the 14 constraints after the UNSAT check
+        assert session.solver_calls < 1 + len(soft)
 
-        c0 = x[0] == 5
-        c1 = x[0] == 7  # Conflicts with c0
+    @pytest.mark.solver_runs
+    def test_deletion_on_unsat_group_only(self):
+        """Test that constraints sharing no variable with the conflict are not tested."""
+        from pycsp3_explain.solvers.wrapper import Session
 
-        soft = [c0, c1]
-        mus = quickxplain_naive(soft, solver="ace", verbose=-1)
+        x = Var(dom=range(10))
+        y = VarArray(size=2, dom=range(10))
+
+        c0 = x == 5
+        c1 = x == 7
+        soft = [c0, c1, y[0] >= 1, y[0] <= 8, y[1] >= 1, y[1] <= 8]
+
+        with Session("ace") as session:
+            mus = mus_naive(soft, solver="ace", verbose=-1)
 
         assert len(mus) == 2
-        assert constraint_in_list(c0, mus)
-        assert constraint_in_list(c1, mus)
+        assert constraints_in_list([c0, c1], mus)
+        # Whole set; the conflict group; one deletion per conflict constraint
+        assert session.solver_calls == 1 + 1 + 2
+
+
+class TestQuickXplain:
+    """Tests for QuickXplain algorithm."""
 
     def test_quickxplain_preference(self):
         """Test that QuickXplain respects constraint ordering."""
-        clear()
-
         x = Var(dom=range(10))
 
         # Multiple possible MUSes, QuickXplain should prefer earlier constraints
@@ -147,36 +143,33 @@ class TestQuickXplain:
         # Should prefer c0 (first constraint)
         assert constraint_in_list(c0, mus)
 
+    def test_quickxplain_many_constraints(self, monkeypatch):
+        """Test that the recursion stays shallow and checks stay few on long inputs."""
+        import importlib
+        mus_module = importlib.import_module("pycsp3_explain.explain.mus")
 
-class TestMusAssumptionBased:
-    """Tests for assumption-based MUS algorithm."""
+        x = VarArray(size=2000, dom=range(10))
+        soft = [x[i] >= 1 for i in range(2000)]
+        conflict = {id(soft[700]), id(soft[1500])}
+        calls = []
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
+        # Oracle in place of the solver: UNSAT exactly when both are present
+        def oracle_is_unsat(soft_list, hard_list=None, solver="ace", verbose=-1):
+            calls.append(1)
+            return conflict <= {id(c) for c in list(soft_list) + list(hard_list or [])}
 
-    def test_simple_unsat(self):
-        """Test assumption-based MUS on a simple unsatisfiable model."""
-        clear()
-
-        x = VarArray(size=3, dom=range(10))
+        monkeypatch.setattr(mus_module, "is_unsat", oracle_is_unsat)
+        mus = quickxplain_naive(soft, solver="ace", verbose=-1)
 
-        c0 = x[0] == 5
-        c1 = x[1] >= 3
-        c2 = x[0] == 7
+        assert set(map(id, mus)) == conflict
+        assert len(calls) <= 4 * 11 + 1
 
-        soft = [c0, c1, c2]
-        mus_set = mus(soft, solver="ace", verbose=-1)
 
-        assert len(mus_set) == 2
-        assert constraint_in_list(c0, mus_set)
-        assert constraint_in_list(c2, mus_set)
-        assert not constraint_in_list(c1, mus_set)
+class TestMusAssumptionBased:
+    """Tests for assumption-based MUS algorithm."""
 
     def test_mus_with_hard_constraints(self):
         """Test assumption-based MUS with hard constraints."""
-        clear()
-
         x = VarArray(size=2, dom=range(10))
 
         hard = [x[0] >= 0]
@@ -187,21 +180,83 @@ class TestMusAssumptionBased:
         mus_set = mus(soft, hard=hard, solver="ace", verbose=-1)
 
         assert len(mus_set) == 2
-        assert constraint_in_list(c0, mus_set)
-        assert constraint_in_list(c1, mus_set)
+        assert constraints_in_list([c0, c1], mus_set)
+
+    def test_core_with_entailed_constraint(self):
+        """Test that a constraint ACE drops as entailed does not shift the core."""
+        x = VarArray(size=3, dom=range(10))
+
+        # x[0] + x[1] >= 0 holds for the whole domain, and ACE drops it when loading
+        hard = [x[0] + x[1] >= 0]
+        c0 = x[1] == 1
+        c1 = x[1] > 2
+        soft = [x[1] + x[2] >= 0, x[2] == 4, x[2] <= x[1] + 8, c0, c1]
+        mus_set = mus(soft, hard=hard, solver="ace", verbose=-1)
+
+        assert len(mus_set) == 2
+        assert constraints_in_list([c0, c1], mus_set)
+
+    def test_reused_selector_model(self):
+        """Test that one selector model serves several mus/mss calls."""
+        from pycsp3_explain.explain.utils import post_with_selectors
+        from pycsp3_explain.explain.mss import mss
+
+        x = VarArray(size=3, dom=range(10))
+
+        c0 = x[0] == 5
+        c1 = x[1] >= 3
+        c2 = x[0] == 7
+
+        sels = post_with_selectors([c0, c1, c2])
+        mus_set = mus(sels, solver="ace", verbose=-1)
+        mss_set = mss(sels, solver="ace", verbose=-1)
+
+        assert len(mus_set) == 2
+        assert constraints_in_list([c0, c2], mus_set)
+        assert len(mss_set) == 2
+        assert constraint_in_list(c1, mss_set)
+
+
+class TestAllMusNaive:
+    """Tests for naive MUS enumeration."""
+
+    def test_finds_every_mus(self):
+        """Test that a MUS of size 1 does not end the enumeration."""
+        x = Var(dom=range(10))
+        y = Var(dom=range(10))
+        c0 = y >= 10
+        c1 = x == 5
+        c2 = x == 7
+        c3 = x >= 6
+
+        muses = all_mus_naive([c0, c1, c2, c3], solver="ace", verbose=-1)
+
+        found = {frozenset(map(id, m)) for m in muses}
+        assert found == {
+            frozenset([id(c0)]),
+            frozenset([id(c1), id(c2)]),
+            frozenset([id(c1), id(c3)]),
+        }
+
+    def test_max_mus(self):
+        """Test that enumeration stops after max_mus MUSes."""
+        x = Var(dom=range(10))
+        soft = [x == 5, x == 7, x >= 6]
+
+        assert len(all_mus_naive(soft, solver="ace", verbose=-1, max_mus=1)) == 1
+
+    def test_sat_model(self):
+        """Test that a SAT model has no MUS."""
+        x = Var(dom=range(10))
+
+        assert all_mus_naive([x >= 2, x <= 5], solver="ace", verbose=-1) == []
 
 
 class TestIsMus:
     """Tests for MUS verification."""
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
-
     def test_is_mus_valid(self):
         """Test that a valid MUS is recognized."""
-        clear()
-
         x = Var(dom=range(10))
         c0 = x == 5
         c1 = x == 7
@@ -209,9 +264,10 @@ class TestIsMus:
         subset = [c0, c1]
         assert is_mus(subset, solver="ace", verbose=-1)
 
+    @pytest.mark.solver_runs
     def test_is_mus_not_minimal(self):
         """Test that a non-minimal subset is rejected."""
-        clear()
+        from pycsp3_explain.solvers.wrapper import Session
 
         x = Var(dom=range(10))
         c0 = x == 5
@@ -221,18 +277,14 @@ class TestIsMus:
         # {c0, c1, c2} is UNSAT but not minimal
         subset = [c0, c1, c2]
 
-        # This should NOT be a MUS because c2 can be removed
-        # Actually this depends on implementation - c2 doesn't affect the conflict
-        # Let's check if it's recognized as not minimal
-        result = is_mus(subset, solver="ace", verbose=-1)
-        # If c2 is truly redundant, removing it still gives UNSAT
-        # so this should return False
+        # c2 holds over the domain of x, so it is removed without a solve
+        with Session("ace") as session:
+            result = is_mus(subset, solver="ace", verbose=-1)
         assert result is False
+        assert session.solver_calls == 0
 
     def test_is_mus_sat(self):
         """Test that a SAT subset is rejected."""
-        clear()
-
         x = Var(dom=range(10))
         c0 = x >= 5
         c1 = x <= 8
@@ -240,14 +292,26 @@ class TestIsMus:
         subset = [c0, c1]  # SAT (x can be 5,6,7,8)
         assert is_mus(subset, solver="ace", verbose=-1) is False
 
+    @pytest.mark.solver_runs
+    def test_is_mus_parallel(self):
+        """Test that checking minimality in worker processes gives the same verdicts."""
+        from pycsp3_explain.solvers.wrapper import Session
+
+        x = Var(dom=range(10))
+        c0 = x == 5
+        c1 = x == 7
+        c2 = x <= 8  # Redundant, but not over the whole domain of x
+
+        assert is_mus([c0, c1], solver="ace", verbose=-1, n_workers=2)
+        with Session("ace") as session:
+            assert is_mus([c0, c1, c2], solver="ace", verbose=-1, n_workers=2) is False
+        # Verdicts found by the workers are recorded in the session
+        assert session.solver_calls >= 2
+
 
 class TestEdgeCases:
     """Edge case tests."""
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
-
     def test_empty_soft_raises(self):
         """Test that empty soft constraints raises error."""
         with pytest.raises(ValueError):
@@ -255,8 +319,6 @@ class TestEdgeCases:
 
     def test_sat_model_raises(self):
         """Test that SAT model raises assertion error."""
-        clear()
-
         x = Var(dom=range(10))
         c0 = x >= 0  # Always SAT with domain [0,9]
 
@@ -265,8 +327,6 @@ class TestEdgeCases:
 
     def test_nested_constraints(self):
         """Test MUS with nested constraint lists."""
-        clear()
-
         x = VarArray(size=2, dom=range(10))
 
         c0 = x[0] == 5
@@ -280,44 +340,241 @@ class TestEdgeCases:
         # Should find {c0, c2}
         assert len(mus) == 2
 
+    def test_flatten_keeps_flat_constraints(self):
+        """Test that flattening a flat list again keeps the same objects."""
+        from pycsp3_explain.explain.utils import flatten_constraints
+
+        x = VarArray(size=2, dom=range(10))
+
+        flat = flatten_constraints([[x[0] == 5, AllDifferent(x)], x[1] >= 3])
+
+        assert len(flat) == 3
+        assert all(a is b for a, b in zip(flatten_constraints(flat), flat, strict=True))
+
+    def test_constraint_variables_in_order(self):
+        """Test that variables are listed once, in the order they appear."""
+        from pycsp3_explain.explain.utils import flatten_constraints, get_constraint_variables
+
+        x = VarArray(size=4, dom=range(10))
+
+        c0, c1 = flatten_constraints([AllDifferent(x[2], x[0], x[3]), x[1] + x[1] == x[0]])
+
+        assert [v.id for v in get_constraint_variables(c0)] == ["x[2]", "x[0]", "x[3]"]
+        assert [v.id for v in get_constraint_variables(c1)] == ["x[1]", "x[0]"]
+
+    def test_flattened_lists_are_not_flattened_again(self, monkeypatch):
+        """Test that checks reuse the lists flattened by the algorithm."""
+        import importlib
+        utils = importlib.import_module("pycsp3_explain.explain.utils")
+
+        x = VarArray(size=2, dom=range(10))
+
+        soft = utils.flatten_constraints([x[0] == 5, x[0] == 7, x[1] >= 3])
+        hard = utils.flatten_constraints([x[1] <= 8])
+
+        calls = []
+        flatten = utils._flatten
+
+        def counting_flatten(constraints):
+            calls.append(constraints)
+            return flatten(constraints)
+
+        monkeypatch.setattr(utils, "_flatten", counting_flatten)
+        flat = utils.flatten_constraints(soft)
+
+        assert is_unsat(soft, hard, solver="ace", verbose=-1)
+        assert flat == soft and flat is not soft
+        assert calls == []
+
+
+class TestExplainUnsat:
+    """Tests for the explain_unsat helper."""
+
+    @pytest.mark.solver_runs
+    def test_deletion_starts_from_core(self):
+        """Test that mus_naive only tests the constraints of ACE's core."""
+        from pycsp3_explain.explain.utils import explain_unsat
+        from pycsp3_explain.solvers.wrapper import Session
+
+        x = VarArray(size=4, dom=range(10))
+
+        c0 = x[0] == 5
+        c1 = x[0] == 7
+        soft = [x[1] != x[0], c0, x[2] != x[1], c1, x[3] != x[2], x[3] >= 1]
+
+        with Session("ace") as session:
+            mus = explain_unsat("mus_naive", soft=soft, solver="ace", verbose=-1)
+
+        assert len(mus) == 2
+        assert constraints_in_list([c0, c1], mus)
+        # The core run, the check of the core, then one deletion per core constraint
+        assert session.solver_calls == 1 + 1 + 2
+
+    def test_sat_model_rejected(self):
+        """Test that a SAT model is still rejected."""
+        from pycsp3_explain.explain.utils import explain_unsat
+
+        x = Var(dom=range(10))
+
+        with pytest.raises(ValueError):
+            explain_unsat("mus_naive", soft=[x >= 3], solver="ace", verbose=-1)
+
 
 class TestSolverWrapper:
     """Tests for the solver wrapper functions."""
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
+    @pytest.mark.parametrize("soft, hard", [
+        (lambda x: [x >= 5, x <= 8], lambda x: []),
+        (lambda x: [x == 5, x == 7], lambda x: []),
+        (lambda x: [x <= 5], lambda x: [x >= 0]),
+    ], ids=["sat", "unsat", "sat_with_hard"])
+    def test_is_sat_matches_enumeration(self, soft, hard):
+        """Test is_sat and is_unsat against an enumeration of the domain."""
+        from pycsp3_explain.solvers.wrapper import Session
+
+        x = Var(dom=range(10))
+
+        # Given an int, the same builders evaluate the constraints
+        expected = any(all(soft(v) + hard(v)) for v in range(10))
+
+        # is_unsat reads the verdict of is_sat from the session
+        constraints, hard_constraints = soft(x), hard(x)
+        with Session("ace"):
+            assert is_sat(constraints, hard=hard_constraints, solver="ace", verbose=-1) == expected
+            assert is_unsat(constraints, hard=hard_constraints, solver="ace", verbose=-1) != expected
 
-    def test_is_sat_simple(self):
-        """Test is_sat with a simple SAT model."""
-        clear()
+    def test_find_subset_stops_at_first_match(self):
+        """Test that find_subset takes no subset past the first one found."""
+        from pycsp3_explain.solvers.wrapper import find_subset
 
         x = Var(dom=range(10))
-        c0 = x >= 5
-        c1 = x <= 8
+        candidates = [[x == 5, x == 7], [x == 5], [x == 7]]
+        taken = []
+
+        def subsets():
+            for subset in candidates:
+                taken.append(subset)
+                yield subset
 
-        assert is_sat([c0, c1], solver="ace", verbose=-1)
+        assert find_subset(subsets(), sat=True, solver="ace", verbose=-1) == 1
+        assert len(taken) == 2
 
-    def test_is_unsat_simple(self):
-        """Test is_unsat with a simple UNSAT model."""
-        clear()
+    @pytest.mark.solver_runs
+    def test_solve_subsets_in_order(self):
+        """Test that solve_subsets returns every verdict, in order, with workers."""
+        from pycsp3_explain.solvers.wrapper import Session, SolveResult, solve_subsets
+
+        x = Var(dom=range(10))
+        subsets = [[x == 5, x == 7], [x == 5], [x >= 3, x <= 1], [x == 7]]
+        expected = [SolveResult.UNSAT, SolveResult.SAT, SolveResult.UNSAT, SolveResult.SAT]
+
+        with Session("ace") as session:
+            assert solve_subsets(subsets[:1], solver="ace", verbose=-1) == expected[:1]
+            assert solve_subsets(subsets, solver="ace", verbose=-1, n_workers=2) == expected
+
+        # The first subset is answered by the session
+        assert session.solver_calls == 4
+
+
+class TestConstraintTracker:
+    """Tests for integer tags of tracked constraints."""
+
+    def test_tags_follow_results(self):
+        """Constraints returned by an algorithm are found by their tag."""
+        from pycsp3_explain.explain.utils import ConstraintTracker
+
+        x = VarArray(size=2, dom=range(10))
+        c0 = x[1] >= 3
+        c1 = x[0] == 5
+        c2 = x[0] == 7
+        soft = [c0, c1, c2]
+
+        tracker = ConstraintTracker(soft)
+        result = mus_naive(soft, solver="ace", verbose=-1)
+
+        assert sorted(tracker.get_indices(result)) == [1, 2]
+        assert {tracker.tag(c) for c in result} == {1, 2}
+
+    def test_untagged_falls_back_to_id(self):
+        """Constraints never tracked are keyed by id()."""
+        from pycsp3_explain.explain.utils import ConstraintTracker
+
+        x = Var(dom=range(10))
+        c0 = x == 5
+        c1 = x == 7
+
+        tracker = ConstraintTracker([c0])
+        assert tracker.tag(c1) == id(c1)
+        assert tracker.get_index(c1) is None
+        assert tracker.get_indices([c1, c0]) == [0]
+
+    def test_trackers_keep_their_own_tags(self):
+        """A second tracker over the same constraints leaves the first one's tags as they were."""
+        from pycsp3_explain.explain.utils import ConstraintTracker
 
         x = Var(dom=range(10))
         c0 = x == 5
         c1 = x == 7
 
-        assert is_unsat([c0, c1], solver="ace", verbose=-1)
+        first = ConstraintTracker([c0, c1])
+        second = ConstraintTracker([c1, c0])
+        assert [first.tag(c0), first.tag(c1)] == [0, 1]
+        assert [second.tag(c0), second.tag(c1)] == [1, 0]
 
-    def test_is_sat_with_hard(self):
-        """Test is_sat with hard constraints."""
-        clear()
+    def test_subsets_by_index(self):
+        """Indices outside the soft constraints are skipped."""
+        from pycsp3_explain.explain.utils import ConstraintTracker
 
         x = Var(dom=range(10))
-        hard = [x >= 0]
-        soft = [x <= 5]
+        tracker = ConstraintTracker([x == 5, x == 7, x >= 3])
+
+        c0, c1, c2 = tracker.soft
+
+        assert tracker.get_constraint(1) is c1
+        assert tracker.get_constraint(-1) is None
+        assert tracker.get_constraint(3) is None
+        assert [id(c) for c in tracker.get_subset([2, 0, 5])] == [id(c2), id(c0)]
+        assert [id(c) for c in tracker.get_complement([1, -1, 7])] == [id(c0), id(c2)]
 
-        assert is_sat(soft, hard=hard, solver="ace", verbose=-1)
+    def test_subsets_by_mask(self):
+        """Subsets given as bitmasks match subsets given as indices."""
+        from pycsp3_explain.explain.utils import ConstraintTracker
 
+        x = Var(dom=range(10))
+
+        tracker = ConstraintTracker([x == 5, x == 7, x >= 3])
+        c0, c1, c2 = tracker.soft
+
+        mask = tracker.get_mask([2, 0, 5])
+        assert mask == 0b101
+        assert [id(c) for c in tracker.get_subset_mask(mask)] == [id(c0), id(c2)]
+        assert tracker.get_complement_mask(mask) == 0b010
+        assert [id(c) for c in tracker.get_subset_mask(tracker.get_complement_mask(mask) | 1 << 8)] == [id(c1)]
+        assert tracker.full_mask == 0b111
+
+
+
+class TestPycsp3Scope:
+    """Tests for running a block on an empty PyCSP3 model."""
+
+    def test_scope_restores_outer_model(self):
+        """Models built in a scope are discarded, the outer one is kept."""
+        from pycsp3.classes.entities import CtrEntities, VarEntities
+        from pycsp3_explain.explain.utils import pycsp3_scope
+
+        x = VarArray(size=2, dom=range(10))
+        satisfy(x[0] == 5)
+        outer_vars = len(VarEntities.items)
+        outer_ctrs = len(CtrEntities.items)
+
+        with pycsp3_scope():
+            assert VarEntities.items == []
+            y = VarArray(size=2, dom=range(3))
+            assert mus_naive([y[0] == 1, y[0] == 2], solver="ace", verbose=-1)
+
+        assert len(VarEntities.items) == outer_vars
+        assert len(CtrEntities.items) == outer_ctrs
+        assert is_unsat([x[0] == 7], hard=[x[0] == 5], solver="ace", verbose=-1)
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
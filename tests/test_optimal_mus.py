@@ -3,7 +3,7 @@ Tests for optimal MUS algorithms (smus, optimal_mus, ocus).
 """
 
 import pytest
-from pycsp3 import *
+from pycsp3 import Var, VarArray
 from pycsp3_explain.explain.mus import (
     optimal_mus,
     optimal_mus_naive,
@@ -13,44 +13,56 @@ from pycsp3_explain.explain.mus import (
     is_mus,
     OCUSException,
 )
-from pycsp3_explain.solvers.wrapper import is_unsat
+from pycsp3_explain.solvers.wrapper import Session, is_unsat
+from tests.helpers import constraint_in_list, constraints_in_list
 
 
-def constraint_in_list(constraint, constraint_list):
-    """Check if constraint is in list using identity comparison."""
-    return any(c is constraint for c in constraint_list)
+@pytest.fixture(autouse=True)
+def ace_session():
+    """
+    Run each test in one Session, shared by the algorithm and the checks of
+    its result.
 
+    A JVM cannot be kept between ACE runs, but the checks the algorithm
+    made are kept: is_mus(result) on the MUS it returns is then mostly
+    answered without a solver run. Tests opening their own Session count
+    the runs of that session only.
+    """
+    with Session("ace") as session:
+        yield session
 
-class TestSmus:
-    """Tests for smallest MUS (SMUS) algorithm."""
-
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
 
-    def test_simple_conflict(self):
-        """Test SMUS on a simple conflict."""
-        clear()
+@pytest.fixture
+def x():
+    """A variable with domain 0..9, the one most tests of the module build on."""
+    # PyCSP3 names a variable after the target it is assigned to
+    x = Var(dom=range(10))
+    return x
 
-        x = Var(dom=range(10))
 
-        c0 = x == 5
-        c1 = x == 7
+class TestSimpleConflict:
+    """Tests of every optimal MUS algorithm on the same simple conflict."""
 
-        soft = [c0, c1]
+    @pytest.mark.parametrize("find_mus", [
+        smus,
+        lambda soft, **kwargs: optimal_mus(soft, weights=[1, 10, 100], **kwargs),
+        ocus_naive,
+    ], ids=["smus", "optimal_mus", "ocus_naive"])
+    def test_finds_the_conflict(self, find_mus, simple_conflict):
+        """Test that the two conflicting constraints form the MUS, whatever the weights."""
+        c0, _, c2 = simple_conflict
 
-        result = smus(soft, solver="ace", verbose=-1)
+        result = find_mus(simple_conflict, solver="ace", verbose=-1)
 
-        # Both constraints are needed for the MUS
-        assert len(result) == 2
+        assert set(map(id, result)) == {id(c0), id(c2)}
         assert is_mus(result, solver="ace", verbose=-1)
 
-    def test_finds_smallest(self):
-        """Test that SMUS finds the smallest MUS."""
-        clear()
 
-        x = Var(dom=range(10))
+class TestSmus:
+    """Tests for smallest MUS (SMUS) algorithm."""
 
+    def test_finds_smallest(self, x):
+        """Test that SMUS finds the smallest MUS."""
         # c0 and c3 conflict (both equal to different values)
         # c1 and c2 don't add to the conflict
         c0 = x == 5       # Conflicts with c3
@@ -64,13 +76,10 @@ class TestSmus:
 
         # Smallest MUS should be {c0, c3}
         assert len(result) == 2
-        assert constraint_in_list(c0, result)
-        assert constraint_in_list(c3, result)
+        assert constraints_in_list([c0, c3], result)
 
     def test_single_constraint_mus(self):
         """Test SMUS when single constraint is UNSAT."""
-        clear()
-
         x = Var(dom=range(5))
 
         c0 = x < 0  # UNSAT by itself
@@ -84,38 +93,27 @@ class TestSmus:
         assert len(result) == 1
         assert constraint_in_list(c0, result)
 
+    @pytest.mark.solver_runs
+    def test_refuted_constraint_needs_no_solver(self, x):
+        """Test that a constraint its domain refutes is returned without a solver run."""
+        soft = [x == 5, x == 7, x < 0]
 
-class TestOptimalMus:
-    """Tests for weighted optimal MUS."""
-
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
+        with Session("ace") as session:
+            result = smus(soft, solver="ace", verbose=-1)
 
-    def test_weighted_simple(self):
-        """Test optimal_mus with weights."""
-        clear()
+        assert [id(c) for c in result] == [id(soft[2])]
+        assert session.solver_calls == 0
 
-        x = Var(dom=range(10))
+        # Heavier than {x == 5, x == 7}, x < 0 is not the optimal MUS
+        weighted = optimal_mus(soft, weights=[1, 1, 3], solver="ace", verbose=-1)
+        assert set(map(id, weighted)) == {id(soft[0]), id(soft[1])}
 
-        c0 = x == 1
-        c1 = x == 2
-
-        soft = [c0, c1]
-        # Both constraints are in all MUSes, weights don't change result
-        weights = [1, 10]
-
-        result = optimal_mus(soft, weights=weights, solver="ace", verbose=-1)
 
-        assert len(result) == 2
-        assert is_mus(result, solver="ace", verbose=-1)
+class TestOptimalMus:
+    """Tests for weighted optimal MUS."""
 
-    def test_weighted_prefers_lower_weight(self):
+    def test_weighted_prefers_lower_weight(self, x):
         """Test that optimal_mus prefers lower weight constraints."""
-        clear()
-
-        x = Var(dom=range(10))
-
         # Multiple MUSes possible: {c0,c1}, {c0,c2}, {c1,c2}
         c0 = x == 1  # weight 1
         c1 = x == 2  # weight 10
@@ -128,57 +126,55 @@ class TestOptimalMus:
 
         # Should find MUS with lowest weight: {c0, c1} (weight 11)
         assert len(result) == 2
-        assert constraint_in_list(c0, result)
-        assert constraint_in_list(c1, result)
-
-    def test_equal_weights_same_as_smus(self):
-        """Test that equal weights gives same result as SMUS."""
-        clear()
+        assert constraints_in_list([c0, c1], result)
 
-        x = Var(dom=range(10))
+    def test_uniform_weights_delegate_to_smus(self, monkeypatch, x):
+        """Test that uniform weights are solved as SMUS, in a single smus() run."""
+        import importlib
+        mus_module = importlib.import_module("pycsp3_explain.explain.mus")
 
         c0 = x == 5
         c1 = x == 7
         c2 = x >= 0
 
         soft = [c0, c1, c2]
+        calls = []
+        original_smus = mus_module.smus
 
-        smus_result = smus(soft, solver="ace", verbose=-1)
-        optimal_result = optimal_mus(soft, weights=[1, 1, 1], solver="ace", verbose=-1)
-
-        # Should find same size MUS
-        assert len(smus_result) == len(optimal_result)
+        def recording_smus(*args, **kwargs):
+            calls.append(args)
+            return original_smus(*args, **kwargs)
 
+        monkeypatch.setattr(mus_module, "smus", recording_smus)
+        result = optimal_mus(soft, weights=[3, 3, 3], solver="ace", verbose=-1)
 
-class TestOcusNaive:
-    """Tests for OCUS naive implementation."""
-
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
+        assert len(calls) == 1
+        assert len(result) == 2
+        assert is_mus(result, solver="ace", verbose=-1)
 
-    def test_simple_conflict(self):
-        """Test ocus_naive on simple conflict."""
-        clear()
+    @pytest.mark.solver_runs
+    def test_session_answers_repeated_weights(self, x):
+        """Test that repeating a weight scheme in a session needs no solver call."""
+        c0 = x == 1
+        c1 = x == 2
+        c2 = x == 3
 
-        x = Var(dom=range(10))
+        soft = [c0, c1, c2]
 
-        c0 = x == 5
-        c1 = x == 7
+        with Session("ace") as session:
+            first = optimal_mus(soft, weights=[1, 10, 100], solver="ace", verbose=-1)
+            calls = session.solver_calls
+            repeated = optimal_mus(soft, weights=[1, 10, 100], solver="ace", verbose=-1)
 
-        soft = [c0, c1]
+        assert session.solver_calls == calls
+        assert [id(c) for c in repeated] == [id(c) for c in first]
 
-        result = ocus_naive(soft, solver="ace", verbose=-1)
 
-        assert len(result) == 2
-        assert is_mus(result, solver="ace", verbose=-1)
+class TestOcusNaive:
+    """Tests for OCUS naive implementation."""
 
-    def test_with_weights(self):
+    def test_with_weights(self, x):
         """Test ocus_naive with weights."""
-        clear()
-
-        x = Var(dom=range(10))
-
         c0 = x == 1
         c1 = x == 2
         c2 = x == 3
@@ -196,16 +192,8 @@ class TestOcusNaive:
 class TestOcus:
     """Tests for OCUS with subset constraints."""
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
-
-    def test_subset_constraint(self):
+    def test_subset_constraint(self, x):
         """Test ocus honors a required constraint index."""
-        clear()
-
-        x = Var(dom=range(10))
-
         c0 = x == 1
         c1 = x == 2
         c2 = x >= 0
@@ -226,54 +214,84 @@ class TestOcus:
             subset_predicate=subset_predicate,
         )
 
-        result_indices = {i for i, c in enumerate(soft) if constraint_in_list(c, result)}
+        result_ids = set(map(id, result))
+        result_indices = {i for i, c in enumerate(soft) if id(c) in result_ids}
 
         assert len(result) == 3
         assert subset_predicate(result_indices)
         assert is_unsat(result, solver="ace", verbose=-1)
 
+    @pytest.mark.solver_runs
+    def test_session_shares_correction_sets(self, x):
+        """Test that a new weight scheme in a session starts from known correction sets."""
+        c0 = x == 1
+        c1 = x == 2
+        c2 = x >= 0
+
+        soft = [c0, c1, c2]
+
+        def subset_constraints(select):
+            return [select[2] == 1]
+
+        with Session("ace") as session:
+            first = ocus(soft, weights=[1, 10, 1], solver="ace", verbose=-1,
+                         subset_constraints=subset_constraints)
+            first_calls = session.solver_calls
+            known = len(session.correction_sets(soft, [], "ace"))
+
+            second = ocus(soft, weights=[10, 1, 1], solver="ace", verbose=-1,
+                          subset_constraints=subset_constraints)
+
+        assert known > 0
+        assert session.solver_calls - first_calls < first_calls
+        assert len(first) == len(second) == 3
+        assert is_unsat(second, solver="ace", verbose=-1)
+
 
 class TestMssOpt:
     """Tests for weighted MSS optimization."""
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
-
-    def test_weighted_mss(self):
-        """Test mss_opt with weights."""
-        clear()
+    @pytest.mark.solver_runs
+    def test_weighted_mss_follows_cores(self, x):
+        """Test that mss_opt drops core members instead of testing each constraint."""
         from pycsp3_explain.explain.mss import mss_opt, is_mss
+        from pycsp3_explain.solvers.wrapper import Session
 
-        x = Var(dom=range(10))
+        y = VarArray(size=8, dom=range(10))
 
-        c0 = x == 1      # Conflicts with c1 and c2
-        c1 = x == 2      # Conflicts with c0 and c2
-        c2 = x == 3      # Conflicts with c0 and c1
-
-        soft = [c0, c1, c2]
-        weights = [100, 10, 1]  # c0 has highest weight
+        c0 = x == 1
+        c1 = x == 2
+        soft = [c0, c1] + [y[i] >= 1 for i in range(8)]
+        weights = [100, 1] + [5] * 8
 
-        result = mss_opt(soft, weights=weights, solver="ace", verbose=-1)
+        with Session("ace") as session:
+            result = mss_opt(soft, weights=weights, solver="ace", verbose=-1)
 
-        # Result should be a valid MSS (exactly one constraint since all conflict)
-        assert len(result) == 1
+        assert any(c is c0 for c in result)
+        assert not any(c is c1 for c in result)
         assert is_mss(result, soft, solver="ace", verbose=-1)
+        # One core, then an extraction finding no core in what remains, which
+        # is then known SAT; adding c1 back gives the full set, known UNSAT
+        assert session.solver_calls == 2
 
+    def test_core_of_hard_constraints(self, x):
+        """Test that a core holding no soft constraint is not a dead end."""
+        from pycsp3_explain.explain.mss import mss_opt
 
-class TestMcsOpt:
-    """Tests for weighted MCS optimization."""
+        y = Var(dom=range(10))
+
+        soft = [y == 1, y == 2]
+        hard = [x == 1, x == 2]  # UNSAT without any soft constraint
+
+        assert mss_opt(soft, hard, solver="ace", verbose=-1) == []
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
 
-    def test_weighted_mcs(self):
-        """Test mcs_opt with weights."""
-        clear()
-        from pycsp3_explain.explain.mss import mcs_opt, is_mcs
+class TestMcsOpt:
+    """Tests for weighted MCS optimization."""
 
-        x = Var(dom=range(10))
+    def test_weighted_mss_mcs_duality(self, x):
+        """Test mcs_opt with weights, and the MSS it is the complement of."""
+        from pycsp3_explain.explain.mss import mcs_opt, is_mss, is_mcs
 
         c0 = x == 1      # Conflicts with c1 and c2
         c1 = x == 2      # Conflicts with c0 and c2
@@ -282,45 +300,32 @@ class TestMcsOpt:
         soft = [c0, c1, c2]
         weights = [100, 10, 1]  # c0 has highest weight
 
+        # mcs_opt returns the complement of the mss_opt result, so one
+        # optimization checks both sides
         result = mcs_opt(soft, weights=weights, solver="ace", verbose=-1)
+        result_ids = set(map(id, result))
+        mss_result = [c for c in soft if id(c) not in result_ids]
 
-        # MCS should be complement of MSS (exactly 2 constraints since MSS has 1)
+        # The MSS keeps the heaviest constraint alone (all conflict), the MCS
+        # holds the other two
+        assert [id(c) for c in mss_result] == [id(c0)]
         assert len(result) == 2
+        assert is_mss(mss_result, soft, solver="ace", verbose=-1)
         assert is_mcs(result, soft, solver="ace", verbose=-1)
 
 
 class TestEdgeCases:
     """Edge cases for optimal MUS algorithms."""
 
-    def setup_method(self):
-        """Clear PyCSP3 state before each test."""
-        clear()
-
-    def test_empty_soft_raises(self):
-        """Test that empty soft raises error."""
-        with pytest.raises(ValueError):
-            smus([], solver="ace")
-
-    def test_sat_model_raises(self):
-        """Test that SAT model raises assertion error."""
-        clear()
-
-        x = Var(dom=range(10))
-        c0 = x >= 0
-
-        with pytest.raises(AssertionError):
-            smus([c0], solver="ace")
-
-    def test_weights_length_mismatch(self):
-        """Test that mismatched weights length raises error."""
-        clear()
-
-        x = Var(dom=range(10))
-        c0 = x == 5
-        c1 = x == 7
-
-        with pytest.raises(ValueError):
-            optimal_mus([c0, c1], weights=[1], solver="ace")
+    @pytest.mark.parametrize("call, error", [
+        (lambda x: smus([], solver="ace"), ValueError),
+        (lambda x: smus([x >= 0], solver="ace"), AssertionError),
+        (lambda x: optimal_mus([x == 5, x == 7], weights=[1], solver="ace"), ValueError),
+    ], ids=["empty_soft", "sat_model", "weights_length_mismatch"])
+    def test_raises(self, call, error, x):
+        """Test that invalid inputs are rejected before any search."""
+        with pytest.raises(error):
+            call(x)
 
 
 if __name__ == "__main__":
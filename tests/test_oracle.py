@@ -0,0 +1,135 @@
+"""
+Tests for the subset checks shared by the explanation algorithms.
+"""
+
+import pytest
+from pycsp3 import Var
+from pycsp3_explain.explain import _oracle
+
+
+class TestMapSolver:
+    """Tests for the bitmask map of explored subsets."""
+
+    def test_blocked_regions(self):
+        """Test that supersets of MUSes and subsets of MSSes are never seeds."""
+        map_solver = _oracle._MapSolver(3)
+        assert map_solver.next_seed() == 0b111
+
+        assert map_solver.block_mus(0b011)
+        assert not map_solver.block_mus(0b011)
+        assert map_solver.block_mss(0b101)
+
+        seed = map_solver.next_seed()
+        assert seed is not None
+        assert seed & 0b011 != 0b011
+        assert seed & ~0b101 != 0
+
+        map_solver.block_mss(0b110)
+        assert map_solver.next_seed() is None
+        assert _oracle._from_mask(0b101) == {0, 2}
+        assert _oracle._to_mask({0, 2}) == 0b101
+
+    def test_map_formula_solved_exactly(self):
+        """Seeds are maximal, and found exactly when some subset is left unexplored."""
+        import random
+
+        rng = random.Random(0)
+        n = 6
+        for _ in range(200):
+            map_solver = _oracle._MapSolver(n)
+            for _ in range(rng.randint(0, 8)):
+                mask = rng.randint(1, (1 << n) - 1)
+                if rng.random() < 0.5:
+                    map_solver.block_mus(mask)
+                else:
+                    map_solver.block_mss(mask)
+            free = [m for m in range(1 << n)
+                    if not map_solver.is_superset_of_mus(m) and not map_solver.is_subset_of_mss(m)]
+
+            seed = map_solver.next_seed()
+            if free:
+                assert seed in free
+                # Seeds are maximal: adding any constraint leaves the free region
+                assert all(seed | (1 << i) not in free for i in range(n) if not seed >> i & 1)
+                rest = set(free) - {seed}
+                other = map_solver.next_seed(avoid={seed})
+                assert (other in rest) if rest else other is None
+            else:
+                assert seed is None
+
+
+class TestChecker:
+    """Tests for the subset checks of a run."""
+
+    def test_sat_core_is_not_trusted(self):
+        """Test that a core found SAT after shrinking gives way to its subset."""
+        x = Var(dom=range(10))
+        soft = [x == 1, x == 2, x >= 0]
+        checker = _oracle._Checker(soft, [], "ace", -1, use_cores=True, use_models=False)
+
+        # As if ACE had reported {x == 1, x >= 0} as the core of all three
+        checker.verdicts.record(0b111, False)
+        checker.unconfirmed[0b101] = 0b111
+
+        assert checker.shrink(0b101) == 0b011
+        assert checker.verdicts.get(0b101) is True
+        assert checker.unconfirmed == {}
+
+
+class TestVerdicts:
+    """Tests for the monotone memo of checked subsets."""
+
+    def test_monotone_lookup(self):
+        """Test that subsets of SAT sets and supersets of UNSAT sets are known."""
+        verdicts = _oracle._Verdicts()
+        assert verdicts.get(0b0110) is None
+
+        verdicts.record(0b0110, True)
+        verdicts.record(0b1001, False)
+        assert verdicts.get(0b0100) is True
+        assert verdicts.get(0b0000) is True
+        assert verdicts.get(0b1011) is False
+        assert verdicts.get(0b0011) is None
+
+        # Sets implied by a new verdict are not kept
+        verdicts.record(0b0111, True)
+        verdicts.record(0b1000, False)
+        assert verdicts.sat == [0b0111]
+        assert verdicts.unsat == [0b1000]
+        assert verdicts.get(0b0011) is True
+        assert verdicts.get(0b1010) is False
+
+
+class TestGrowToMss:
+    """Tests for growing SAT seeds to MSSes."""
+
+    def test_maximal_seed_needs_no_check(self):
+        """Test that a seed of the map grows without any satisfiability check."""
+        def no_check(mask):
+            raise AssertionError("unexpected check")
+
+        map_solver = _oracle._MapSolver(4)
+        map_solver.block_mus(0b0011)
+        map_solver.block_mus(0b1100)
+        seed = map_solver.next_seed()
+        mss = _oracle._grow_to_mss(
+            seed, map_solver.full, no_check,
+            known_unsat=map_solver.is_superset_of_mus, satisfied=no_check,
+        )
+        assert mss == seed
+
+    def test_solution_adds_satisfied_constraints(self):
+        """Test that constraints satisfied by a solution join without their own check."""
+        calls = []
+
+        def satisfied(mask, rest):
+            calls.append(mask)
+            return rest  # The solution satisfies everything else
+
+        mss = _oracle._grow_to_mss(0b0001, 0b1111, None, satisfied=satisfied)
+        assert mss == 0b1111
+        assert calls == [0b0011]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])